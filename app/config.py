@@ -1,5 +1,6 @@
 import json
 import secrets
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
@@ -8,6 +9,12 @@ _INSECURE_DEFAULT = "your-secret-key-change-in-production"
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./dating_app.db"
+    DB_AUTO_MIGRATE: bool = True  # apply pending Alembic migrations at startup
+    DB_ASYNC: bool = False  # serve hot routes from an asyncio engine (aiosqlite / asyncpg)
+    ASYNC_DATABASE_URL: str = ""  # defaults to DATABASE_URL with the async driver swapped in
+    DATABASE_REPLICA_URLS: str = "[]"  # JSON list of read replica URLs for read-only endpoints
+    REPLICA_HEALTH_CHECK_INTERVAL: float = 10.0  # seconds between health probes of each replica
+    READ_YOUR_WRITES_SECONDS: float = 5.0  # after a write, the user reads from the primary this long
     SECRET_KEY: str = ""
     OPENAI_API_KEY: str = ""
     CORS_ORIGINS: str = '["http://localhost:3000","http://localhost:8081","http://localhost:19006"]'
@@ -15,6 +22,73 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
     MAX_PASSWORD_LENGTH: int = 72  # bcrypt limit
     REDIS_URL: str = ""  # e.g. "redis://localhost:6379/0"
+    REDIS_MAX_CONNECTIONS: int = 50  # per process, for each of the sync and asyncio pools
+
+    # Background jobs
+    JOB_BACKEND: Literal["inline", "memory", "sqlite", "redis"] = "memory"  # sqlite/redis survive restarts
+    JOB_SQLITE_PATH: str = "./jobs.db"
+    JOB_IN_PROCESS_WORKER: bool = True  # drain the queue inside the API process; else run `python -m app.jobs`
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BACKOFF: float = 2.0  # seconds before the first retry, doubled for each later one
+    JOB_IDEMPOTENCY_TTL: int = 24 * 3600  # seconds an idempotency key suppresses duplicates
+    JOB_VISIBILITY_TIMEOUT: int = 300  # seconds before a job leased by a dead worker is handed out again
+    JOB_POLL_INTERVAL: float = 1.0  # seconds an idle worker waits between polls
+
+    # Photo processing
+    IMAGE_WORKERS: int = 2  # processes rendering photo variants; 0 renders on the request thread
+    IMAGE_TIMEOUT: float = 30.0  # seconds an upload waits for its variants
+
+    # Response compression
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller bodies are sent uncompressed
+    COMPRESSION_CONTENT_TYPES: str = '["application/json","text/plain","text/html","text/css","application/javascript"]'
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI: bool = True  # preferred over gzip when the brotli package is installed
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; higher levels cost more CPU than they save on JSON
+
+    # Public profile cards (discover, match list), cached per process
+    PROFILE_CARD_CACHE_SIZE: int = 10_000
+
+    # Discover candidate snapshot (single node): filter and score in memory with NumPy
+    DISCOVER_SNAPSHOT: bool = False
+    DISCOVER_SNAPSHOT_REBUILD_SECONDS: float = 300.0  # full rebuild; picks up other processes' writes
+
+    # Discover ranking: weights of the blended signals (see ranking_service)
+    DISCOVER_RANK_COMPATIBILITY: float = 1.0
+    DISCOVER_RANK_DISTANCE: float = 0.0
+    DISCOVER_RANK_COMPLETENESS: float = 0.0
+    DISCOVER_RANK_ACTIVITY: float = 0.0
+    DISCOVER_ACTIVITY_HALF_LIFE_HOURS: float = 72.0
+    ACTIVITY_RESOLUTION_SECONDS: int = 300  # last_active_at is written at most this often per user
+    DISCOVER_COUNT_TTL_SECONDS: float = 60.0  # per-viewer cache of counted/estimated discover totals
+    DISCOVER_COUNT_CACHE_SIZE: int = 10_000
+
+    # Photo storage
+    STORAGE_BACKEND: Literal["local", "s3"] = "local"
+    STORAGE_PUBLIC_URL: str = ""  # CDN base URL for photo links; default signed API links (local) or pre-signed (s3)
+    S3_BUCKET: str = ""
+    S3_ENDPOINT_URL: str = ""  # for S3-compatible stores such as MinIO
+    S3_REGION: str = ""
+    S3_PRESIGN_EXPIRES: int = 3600  # seconds a pre-signed photo URL stays valid
+    PHOTO_CACHE_MAX_AGE: int = 30 * 24 * 3600  # seconds clients keep photos served by the API
+    PHOTO_SENDFILE_HEADER: Literal["", "X-Accel-Redirect", "X-Sendfile"] = ""  # let the proxy send the file
+    PHOTO_SENDFILE_PREFIX: str = "/protected-uploads"  # nginx internal location aliasing uploads/
+    PHOTO_URL_TTL: int = 3600  # signed API photo links stay valid one to two windows of this many seconds
+    PHOTO_LEGACY_UPLOADS: bool = True  # redirect old /uploads/<key> links to signed photo links
+
+    # Connection pool (PostgreSQL and other server databases)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 disables recycling
+
+    # SQLite tuning (applied as PRAGMAs on every connection)
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # bytes; 0 disables memory-mapped I/O
+    SQLITE_TEMP_STORE: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
 
     @property
     def cors_origins_list(self) -> list[str]:
@@ -26,6 +100,26 @@ class Settings(BaseSettings):
         except (json.JSONDecodeError, TypeError):
             return []
 
+    @property
+    def compression_content_types_list(self) -> list[str]:
+        try:
+            types = json.loads(self.COMPRESSION_CONTENT_TYPES)
+            if isinstance(types, list):
+                return [str(t) for t in types]
+            return []
+        except (json.JSONDecodeError, TypeError):
+            return []
+
+    @property
+    def replica_urls_list(self) -> list[str]:
+        try:
+            urls = json.loads(self.DATABASE_REPLICA_URLS)
+            if isinstance(urls, list):
+                return [str(u) for u in urls]
+            return []
+        except (json.JSONDecodeError, TypeError):
+            return []
+
     model_config = {"env_file": ".env", "extra": "ignore"}
 
 
@@ -1,25 +1,280 @@
-from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+import asyncio
+import itertools
+import logging
+import threading
+import time
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
 
 from app.config import settings
 
-connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
-    connect_args["check_same_thread"] = False
+logger = logging.getLogger(__name__)
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def engine_options(url: str) -> dict:
+    """``create_engine`` keyword arguments for ``url`` from the tuning profile in Settings.
+
+    Pool sizing only applies to server databases; SQLite gets its locking
+    behaviour from the pragmas in ``sqlite_pragmas`` instead.
+    """
+    if _is_sqlite(url):
+        return {
+            "connect_args": {
+                "check_same_thread": False,
+                # sqlite3's own lock wait, kept in step with PRAGMA busy_timeout
+                "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            },
+        }
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
 
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
+def sqlite_pragmas() -> list[str]:
+    """Per-connection PRAGMAs for SQLite, in the order they must be applied."""
+    return [
+        "PRAGMA foreign_keys=ON",
+        "PRAGMA journal_mode=WAL",
+        # NORMAL is durable across application crashes in WAL mode and avoids
+        # an fsync on every commit; only a power loss can drop the last commits.
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}",  # negative = KiB, not pages
+        f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}",
+        f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}",
+    ]
+
+
+def configure_sqlite(engine: Engine, pragmas: list[str] | None = None) -> None:
+    """Apply ``pragmas`` (default: ``sqlite_pragmas()``) to every new connection of ``engine``."""
+    statements = sqlite_pragmas() if pragmas is None else pragmas
 
-# Enable WAL mode and foreign keys for SQLite
-if settings.DATABASE_URL.startswith("sqlite"):
     @event.listens_for(engine, "connect")
     def set_sqlite_pragma(dbapi_connection, connection_record):
         cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.execute("PRAGMA journal_mode=WAL")
+        for statement in statements:
+            cursor.execute(statement)
         cursor.close()
 
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+
+if _is_sqlite(settings.DATABASE_URL):
+    configure_sqlite(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto its asyncio driver (aiosqlite / asyncpg)."""
+    scheme, sep, rest = url.partition("://")
+    driverless = scheme.split("+", 1)[0]
+    if driverless == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if driverless in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+
+# Optional asyncio engine.  Hot routes run their ORM code through
+# ``session.run_sync`` so the same models and query code serve both paths;
+# when DB_ASYNC is off they run on the sync engine in the threadpool instead.
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    _async_url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(_async_url, **engine_options(_async_url))
+    if _is_sqlite(_async_url):
+        configure_sqlite(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
+
+def _create_replica_engine(url: str) -> Engine:
+    replica = create_engine(url, **engine_options(url))
+    if _is_sqlite(url):
+        configure_sqlite(replica)
+    return replica
+
+
+class ReplicaSet:
+    """Round-robin over read replicas, skipping ones that fail a health check.
+
+    Each replica is probed with ``SELECT 1`` at most once per
+    ``check_interval`` seconds, on the request that happens to pick it; a
+    failed replica is skipped until its next probe succeeds.  ``apick`` runs
+    due probes in a worker thread, so the event loop never blocks on one.
+    """
+
+    def __init__(self, engines: list[Engine], check_interval: float):
+        self.engines = engines
+        self.check_interval = check_interval
+        self._healthy = [True] * len(engines)
+        self._next_check = [0.0] * len(engines)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def pick(self) -> int | None:
+        """Index of the next healthy replica, or None when every replica is down."""
+        count = len(self.engines)
+        if not count:
+            return None
+        start = next(self._counter)
+        for step in range(count):
+            index = (start + step) % count
+            if self._claim_probe(index):
+                self._probe(index)
+            if self._healthy[index]:
+                return index
+        return None
+
+    async def apick(self) -> int | None:
+        """``pick`` for async code: the blocking probe runs in a worker thread."""
+        count = len(self.engines)
+        if not count:
+            return None
+        start = next(self._counter)
+        for step in range(count):
+            index = (start + step) % count
+            if self._claim_probe(index):
+                await asyncio.to_thread(self._probe, index)
+            if self._healthy[index]:
+                return index
+        return None
+
+    def _claim_probe(self, index: int) -> bool:
+        """Whether a probe of ``index`` is due; claims it so concurrent requests keep the cached verdict."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_check[index]:
+                return False
+            self._next_check[index] = now + self.check_interval
+            return True
+
+    def _probe(self, index: int) -> None:
+        try:
+            with self.engines[index].connect() as conn:
+                conn.execute(text("SELECT 1"))
+            healthy = True
+        except SQLAlchemyError:
+            healthy = False
+        if healthy != self._healthy[index]:
+            if healthy:
+                logger.info("Read replica %d is healthy again", index)
+            else:
+                logger.warning("Read replica %d failed its health check; reading from the others", index)
+        self._healthy[index] = healthy
+
+
+replicas = ReplicaSet(
+    [_create_replica_engine(url) for url in settings.replica_urls_list],
+    settings.REPLICA_HEALTH_CHECK_INTERVAL,
+)
+
+# Read-your-writes: a user who just committed a write reads from the primary
+# until replicas have had READ_YOUR_WRITES_SECONDS to catch up.  The pins are
+# per process, so multi-worker deployments want sticky routing per user.
+_MAX_PINS = 10_000  # expired pins are pruned once the map grows past this
+_primary_pins: dict[str, float] = {}
+_pins_lock = threading.Lock()
+
+
+def pin_to_primary(user_id: str) -> None:
+    now = time.monotonic()
+    with _pins_lock:
+        if len(_primary_pins) > _MAX_PINS:
+            for uid in [uid for uid, until in _primary_pins.items() if until <= now]:
+                del _primary_pins[uid]
+        _primary_pins[user_id] = now + settings.READ_YOUR_WRITES_SECONDS
+
+
+def pinned_to_primary(user_id: str | None) -> bool:
+    if user_id is None:
+        return False
+    until = _primary_pins.get(user_id)
+    return until is not None and time.monotonic() < until
+
+
+def reset_primary_pins() -> None:
+    with _pins_lock:
+        _primary_pins.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _note_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_statement_write(orm_execute_state):
+    # Core-style update()/delete()/insert() run through the session bypass the flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        session = orm_execute_state.session
+        if session.info.get("read_only"):
+            raise RuntimeError("Attempted to write through a read-only session")
+        session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_writer(session):
+    # ``user_id`` is set by authentication, so only request sessions pin
+    if session.info.pop("wrote", False) and session.info.get("user_id"):
+        pin_to_primary(session.info["user_id"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session):
+    session.info.pop("wrote", None)
+
+
+@event.listens_for(Session, "before_flush")
+def _reject_read_only_writes(session, flush_context, instances):
+    if session.info.get("read_only") and (session.new or session.dirty or session.deleted):
+        raise RuntimeError("Attempted to write through a read-only session")
+
+
+def read_session(user_id: str | None = None) -> Session:
+    """Read-only session on a replica, or on the primary when none is usable or ``user_id`` just wrote."""
+    index = None if pinned_to_primary(user_id) else replicas.pick()
+    db = SessionLocal() if index is None else SessionLocal(bind=replicas.engines[index])
+    db.info["read_only"] = True
+    return db
+
+
+async_replica_engines = []
+
+if settings.DB_ASYNC:
+    for _url in settings.replica_urls_list:
+        _async_replica_url = async_database_url(_url)
+        _async_replica = create_async_engine(_async_replica_url, **engine_options(_async_replica_url))
+        if _is_sqlite(_async_replica_url):
+            configure_sqlite(_async_replica.sync_engine)
+        async_replica_engines.append(_async_replica)
+
+
+async def async_read_session(user_id: str | None = None):
+    """``read_session`` for the asyncio engine; health checks are shared with the sync replica set."""
+    index = None if pinned_to_primary(user_id) else await replicas.apick()
+    if index is None:
+        db = AsyncSessionLocal()
+    else:
+        db = AsyncSessionLocal(bind=async_replica_engines[index])
+    db.info["read_only"] = True
+    return db
+
+
 class Base(DeclarativeBase):
     pass
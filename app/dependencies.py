@@ -1,13 +1,16 @@
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.database import SessionLocal
+from app.database import AsyncSessionLocal, SessionLocal, async_read_session, read_session
 from app.models.user import User
 from app.models.block import BlockedUser
 from app.services.auth_service import decode_access_token
 
 security = HTTPBearer()
+# For routes that also accept another proof of access, such as a signed link
+optional_security = HTTPBearer(auto_error=False)
 
 ACTIVE_EXEMPT_PATHS = {"/api/v1/account/reactivate", "/api/v1/account/status", "/api/v1/account"}
 
@@ -20,12 +23,71 @@ def get_db():
         db.close()
 
 
-def get_current_user(
-    request: Request,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    token = credentials.credentials
+class ThreadedSession:
+    """Sync ``Session`` behind the ``AsyncSession.run_sync`` interface.
+
+    Used by async routes when DB_ASYNC is off: ``run_sync`` runs the ORM code
+    in the threadpool, exactly where a sync route would have run it.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+
+async def get_async_db():
+    """Session for async routes: an ``AsyncSession`` when DB_ASYNC is on, else a ``ThreadedSession``.
+
+    Either way, route code calls ``await db.run_sync(fn, ...)`` with a plain
+    sync ``fn(session, ...)``, so both paths share models and queries.
+    """
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield ThreadedSession(db)
+        finally:
+            await run_in_threadpool(db.close)
+    else:
+        async with AsyncSessionLocal() as session:
+            yield session
+
+
+def _token_user_id(credentials: HTTPAuthorizationCredentials | None) -> str | None:
+    if credentials is None:
+        return None
+    payload = decode_access_token(credentials.credentials)
+    return payload["sub"] if payload else None
+
+
+def get_read_db(credentials: HTTPAuthorizationCredentials | None = Depends(optional_security)):
+    """Read-only session for pure read endpoints: a replica, unless the caller wrote recently.
+
+    Flushing anything through it raises, so writes can only go to the primary.
+    """
+    db = read_session(_token_user_id(credentials))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(credentials: HTTPAuthorizationCredentials | None = Depends(optional_security)):
+    """``get_read_db`` for async routes, with the same ``run_sync`` interface as ``get_async_db``."""
+    user_id = _token_user_id(credentials)
+    if AsyncSessionLocal is None:
+        db = read_session(user_id)
+        try:
+            yield ThreadedSession(db)
+        finally:
+            await run_in_threadpool(db.close)
+    else:
+        async with await async_read_session(user_id) as session:
+            yield session
+
+
+def _authenticate(db: Session, token: str, path: str) -> User:
     payload = decode_access_token(token)
     if payload is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
@@ -41,11 +103,101 @@ def get_current_user(
         invalidated_ts = inv.timestamp() if inv.tzinfo else inv.replace(tzinfo=timezone.utc).timestamp()
         if iat <= invalidated_ts:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
-    if not user.is_active and request.url.path not in ACTIVE_EXEMPT_PATHS:
+    if user.purge_requested_at is not None:
+        # Deletion is under way: not even reactivation is allowed
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account is being deleted")
+    if not user.is_active and path not in ACTIVE_EXEMPT_PATHS:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account is deactivated")
+    # Lets a commit on this session pin the user to the primary (read-your-writes)
+    db.info["user_id"] = user.id
+    return user
+
+
+def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> User:
+    return _authenticate(db, credentials.credentials, request.url.path)
+
+
+async def get_current_user_async(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db=Depends(get_async_db),
+) -> User:
+    """``get_current_user`` for async routes; the user is bound to the route's ``get_async_db`` session.
+
+    Only touch the returned user's attributes inside ``db.run_sync``: with an
+    ``AsyncSession`` lazy loads are not allowed outside it.
+    """
+    return await db.run_sync(_authenticate, credentials.credentials, request.url.path)
+
+
+def _authenticate_detached(db: Session, token: str, path: str) -> User:
+    """``_authenticate``, then hand ``db``'s connection back; the user keeps its loaded columns."""
+    user = _authenticate(db, token, path)
+    db.expunge(user)
+    db.rollback()
     return user
 
 
+def _adopt(db: Session, user: User) -> User:
+    """Copy a user authenticated on another session into ``db`` without querying it again."""
+    return db.merge(user, load=False)
+
+
+def get_current_reader(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    primary: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
+) -> User:
+    """``get_current_user`` for read routes, bound to the route's ``get_read_db`` session.
+
+    The token is checked against the primary, so a new account works at once
+    and a deactivation or revocation applies at once, whatever the replica lag.
+    """
+    return _adopt(db, _authenticate_detached(primary, credentials.credentials, request.url.path))
+
+
+def get_optional_reader(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_security),
+    primary: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
+) -> User | None:
+    """``get_current_reader``, or None when no token is sent; an invalid token still fails."""
+    if credentials is None:
+        return None
+    return _adopt(db, _authenticate_detached(primary, credentials.credentials, request.url.path))
+
+
+async def get_current_reader_async(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    primary=Depends(get_async_db),
+    db=Depends(get_async_read_db),
+) -> User:
+    """``get_current_reader`` for async routes, bound to the route's ``get_async_read_db`` session."""
+    user = await primary.run_sync(_authenticate_detached, credentials.credentials, request.url.path)
+    return await db.run_sync(_adopt, user)
+
+
+def rate_limit_user(limiter, user_dependency=get_current_user):
+    """Build a dependency that charges ``limiter`` for the authenticated user.
+
+    The dependency is async, so an asyncio Redis limiter awaits its round trip
+    on the event loop instead of tying up a threadpool worker.  It can be used
+    on sync and async routes alike; pass the route's own user dependency so
+    authentication runs only once per request.
+    """
+    async def _check_rate_limit(current_user: User = Depends(user_dependency)) -> None:
+        await limiter.acheck(current_user.id)
+
+    return _check_rate_limit
+
+
 def check_block(db: Session, user1_id: str, user2_id: str, detail: str = "Cannot interact with blocked user") -> None:
     """Raise 403 if a block exists in either direction between the two users."""
     block = db.query(BlockedUser).filter(
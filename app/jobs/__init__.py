@@ -0,0 +1,4 @@
+"""Background jobs: routers ``enqueue`` work and respond; a worker runs it with retries."""
+from app.jobs.queue import InlineQueue, Job, JobQueue, MemoryQueue, enqueue, get_queue, job, set_queue  # noqa: F401
+
+import app.jobs.tasks  # noqa: E402, F401  -- registers the handlers
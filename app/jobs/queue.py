@@ -0,0 +1,265 @@
+"""Job registry, ``enqueue`` and the in-process queue backends.
+
+Handlers are plain sync functions registered with ``@job("name")`` and called
+with JSON-serializable keyword arguments.  A failing job is retried with
+exponential backoff up to its ``max_attempts`` and then dropped with an error
+log.  An ``idempotency_key`` makes ``enqueue`` a no-op if a job with the same
+key was already accepted within ``JOB_IDEMPOTENCY_TTL`` seconds.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Callable
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class JobSpec:
+    fn: Callable
+    max_attempts: int
+
+
+HANDLERS: dict[str, JobSpec] = {}
+
+
+def job(name: str, *, max_attempts: int | None = None):
+    """Register the decorated function as the handler for jobs called ``name``."""
+    def decorator(fn):
+        if name in HANDLERS:
+            raise ValueError(f"Job {name!r} is already registered")
+        HANDLERS[name] = JobSpec(fn, max_attempts or settings.JOB_MAX_ATTEMPTS)
+        fn.job_name = name
+        return fn
+    return decorator
+
+
+@dataclass(slots=True)
+class Job:
+    name: str
+    kwargs: dict
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    attempts: int = 0
+    idempotency_key: str | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "kwargs": self.kwargs,
+            "attempts": self.attempts,
+            "idempotency_key": self.idempotency_key,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Job":
+        return cls(**data)
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff before attempt ``attempts + 1``: JOB_RETRY_BACKOFF, doubled per failure."""
+    return settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1)
+
+
+class JobQueue(ABC):
+    """Storage interface shared by the backends; ``run_job`` drives it."""
+
+    runs_inline = False
+
+    @abstractmethod
+    def push(self, job: Job, run_at: float) -> bool:
+        """Store ``job`` to run at ``run_at`` (``time.time()``); False if its idempotency key was seen."""
+
+    @abstractmethod
+    def reserve(self) -> Job | None:
+        """Take the next due job, or None.  It is leased to the caller until acked or retried."""
+
+    @abstractmethod
+    def ack(self, job: Job) -> None:
+        """Drop ``job`` after it ran successfully."""
+
+    @abstractmethod
+    def retry(self, job: Job, run_at: float, error: str) -> None:
+        """Run ``job`` again at ``run_at`` after a failed attempt."""
+
+    @abstractmethod
+    def bury(self, job: Job, error: str) -> None:
+        """Give up on ``job`` after its last attempt."""
+
+    def set_listener(self, listener: Callable[[], None] | None) -> None:
+        """Called after each push, so an idle in-process worker can wake up early."""
+        self._listener = listener
+
+    def _notify(self) -> None:
+        listener = getattr(self, "_listener", None)
+        if listener is not None:
+            listener()
+
+
+def run_job(queue: JobQueue, job: Job) -> bool:
+    """Run one reserved job and settle it on ``queue``; returns True on success."""
+    spec = HANDLERS.get(job.name)
+    if spec is None:
+        logger.error("No handler registered for job %s (%s)", job.name, job.id)
+        queue.bury(job, "unknown job")
+        return False
+    if job.attempts >= spec.max_attempts:
+        # Only reachable through runs that ended with an expired lease: the job likely kills its worker
+        logger.error("Job %s (%s) lost its lease after %d attempts", job.name, job.id, job.attempts)
+        queue.bury(job, "lease expired")
+        return False
+    job.attempts += 1
+    try:
+        spec.fn(**job.kwargs)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        if job.attempts >= spec.max_attempts:
+            logger.exception("Job %s (%s) failed permanently after %d attempts", job.name, job.id, job.attempts)
+            queue.bury(job, error)
+        else:
+            delay = retry_delay(job.attempts)
+            logger.warning("Job %s (%s) failed (%s); retry %d in %.1fs", job.name, job.id, error, job.attempts, delay)
+            queue.retry(job, time.time() + delay, error)
+        return False
+    queue.ack(job)
+    return True
+
+
+class _IdempotencyKeys:
+    """Keys accepted in the last JOB_IDEMPOTENCY_TTL seconds (in-process backends)."""
+
+    def __init__(self):
+        self._expiry: dict[str, float] = {}
+
+    def claim(self, key: str | None, now: float) -> bool:
+        if key is None:
+            return True
+        if len(self._expiry) > 10_000:
+            self._expiry = {k: t for k, t in self._expiry.items() if t > now}
+        if self._expiry.get(key, 0.0) > now:
+            return False
+        self._expiry[key] = now + settings.JOB_IDEMPOTENCY_TTL
+        return True
+
+
+class InlineQueue(JobQueue):
+    """Runs each job, retries included, synchronously inside ``enqueue``.  For tests and scripts."""
+
+    runs_inline = True
+
+    def __init__(self):
+        self._keys = _IdempotencyKeys()
+        self.buried: list[tuple[Job, str]] = []
+
+    def push(self, job: Job, run_at: float) -> bool:
+        if not self._keys.claim(job.idempotency_key, time.time()):
+            return False
+        # run_job buries the job on its last failed attempt
+        while not run_job(self, job):
+            if self.buried and self.buried[-1][0] is job:
+                break
+        return True
+
+    def reserve(self) -> Job | None:
+        return None
+
+    def ack(self, job: Job) -> None:
+        pass
+
+    def retry(self, job: Job, run_at: float, error: str) -> None:
+        pass  # push() loops straight into the next attempt
+
+    def bury(self, job: Job, error: str) -> None:
+        self.buried.append((job, error))
+
+
+class MemoryQueue(JobQueue):
+    """Process-local queue drained by the in-process asyncio worker.  Jobs are lost on restart."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heap: list[tuple[float, int, Job]] = []
+        self._seq = itertools.count()
+        self._keys = _IdempotencyKeys()
+
+    def push(self, job: Job, run_at: float) -> bool:
+        with self._lock:
+            if not self._keys.claim(job.idempotency_key, time.time()):
+                return False
+            heapq.heappush(self._heap, (run_at, next(self._seq), job))
+        self._notify()
+        return True
+
+    def reserve(self) -> Job | None:
+        with self._lock:
+            if self._heap and self._heap[0][0] <= time.time():
+                return heapq.heappop(self._heap)[2]
+        return None
+
+    def ack(self, job: Job) -> None:
+        pass
+
+    def retry(self, job: Job, run_at: float, error: str) -> None:
+        with self._lock:
+            heapq.heappush(self._heap, (run_at, next(self._seq), job))
+
+    def bury(self, job: Job, error: str) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+_queue: JobQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def create_queue(backend: str | None = None) -> JobQueue:
+    backend = backend or settings.JOB_BACKEND
+    if backend == "inline":
+        return InlineQueue()
+    if backend == "memory":
+        return MemoryQueue()
+    if backend == "sqlite":
+        from app.jobs.sqlite_queue import SQLiteQueue
+        return SQLiteQueue(settings.JOB_SQLITE_PATH)
+    if backend == "redis":
+        from app.jobs.redis_queue import RedisQueue
+        return RedisQueue.from_url(settings.REDIS_URL)
+    raise ValueError(f"Unknown JOB_BACKEND {backend!r}")
+
+
+def get_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = create_queue()
+    return _queue
+
+
+def set_queue(queue: JobQueue | None) -> None:
+    """Replace the process-wide queue (None: recreate from settings on next use)."""
+    global _queue
+    _queue = queue
+
+
+def enqueue(name: str | Callable, /, *, idempotency_key: str | None = None, delay: float = 0.0, **kwargs) -> str | None:
+    """Schedule job ``name`` with ``kwargs``; returns the job id, or None if deduplicated.
+
+    Call it after committing whatever the job will read.
+    """
+    name = getattr(name, "job_name", name)
+    if name not in HANDLERS:
+        raise ValueError(f"Unknown job {name!r}")
+    new_job = Job(name=name, kwargs=kwargs, idempotency_key=idempotency_key)
+    if not get_queue().push(new_job, time.time() + delay):
+        return None
+    return new_job.id
@@ -0,0 +1,106 @@
+"""Durable job queue on Redis, shared by every API process and worker.
+
+Keys (under ``prefix``):
+  ``ready``    sorted set of job ids scored by when they are due
+  ``running``  sorted set of leased job ids scored by lease expiry
+  ``data``     hash of job id -> JSON job
+  ``key:<k>``  idempotency key markers, expiring after JOB_IDEMPOTENCY_TTL
+  ``dead``     list of buried jobs (newest first, capped)
+
+Reserving is a Lua script, so a job is handed to exactly one worker; leases
+that expire (the worker died) are moved back to ``ready`` on the next reserve,
+with the lost run counted as an attempt.
+"""
+import json
+import time
+
+from app.config import settings
+from app.jobs.queue import Job, JobQueue
+
+_DEAD_LETTER_LIMIT = 1000
+
+# KEYS: ready, running, data   ARGV: now, lease_until
+_RESERVE_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], id)
+    local payload = redis.call('HGET', KEYS[3], id)
+    if payload then
+        local job = cjson.decode(payload)
+        job['attempts'] = (job['attempts'] or 0) + 1
+        redis.call('HSET', KEYS[3], id, cjson.encode(job))
+    end
+    redis.call('ZADD', KEYS[1], ARGV[1], id)
+end
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, 1)
+if #ids == 0 then
+    return false
+end
+redis.call('ZREM', KEYS[1], ids[1])
+redis.call('ZADD', KEYS[2], ARGV[2], ids[1])
+return redis.call('HGET', KEYS[3], ids[1])
+"""
+
+
+class RedisQueue(JobQueue):
+    def __init__(self, client, prefix: str = "jobs"):
+        self._redis = client
+        self._ready = f"{prefix}:ready"
+        self._running = f"{prefix}:running"
+        self._data = f"{prefix}:data"
+        self._dead = f"{prefix}:dead"
+        self._key_prefix = f"{prefix}:key:"
+        self._reserve = client.register_script(_RESERVE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisQueue":
+        if not url:
+            raise ValueError("JOB_BACKEND=redis requires REDIS_URL")
+        import redis
+
+        return cls(redis.from_url(url, decode_responses=True, max_connections=settings.REDIS_MAX_CONNECTIONS))
+
+    def push(self, job: Job, run_at: float) -> bool:
+        if job.idempotency_key is not None:
+            claimed = self._redis.set(
+                self._key_prefix + job.idempotency_key, job.id, nx=True, ex=settings.JOB_IDEMPOTENCY_TTL,
+            )
+            if not claimed:
+                return False
+        pipe = self._redis.pipeline()
+        pipe.hset(self._data, job.id, json.dumps(job.to_dict()))
+        pipe.zadd(self._ready, {job.id: run_at})
+        pipe.execute()
+        self._notify()
+        return True
+
+    def reserve(self) -> Job | None:
+        now = time.time()
+        payload = self._reserve(
+            keys=[self._ready, self._running, self._data],
+            args=[now, now + settings.JOB_VISIBILITY_TIMEOUT],
+        )
+        if not payload:
+            return None
+        return Job.from_dict(json.loads(payload))
+
+    def ack(self, job: Job) -> None:
+        pipe = self._redis.pipeline()
+        pipe.zrem(self._running, job.id)
+        pipe.hdel(self._data, job.id)
+        pipe.execute()
+
+    def retry(self, job: Job, run_at: float, error: str) -> None:
+        pipe = self._redis.pipeline()
+        pipe.hset(self._data, job.id, json.dumps(job.to_dict()))
+        pipe.zrem(self._running, job.id)
+        pipe.zadd(self._ready, {job.id: run_at})
+        pipe.execute()
+
+    def bury(self, job: Job, error: str) -> None:
+        pipe = self._redis.pipeline()
+        pipe.zrem(self._running, job.id)
+        pipe.hdel(self._data, job.id)
+        pipe.lpush(self._dead, json.dumps({**job.to_dict(), "error": error, "failed_at": time.time()}))
+        pipe.ltrim(self._dead, 0, _DEAD_LETTER_LIMIT - 1)
+        pipe.execute()
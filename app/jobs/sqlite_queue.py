@@ -0,0 +1,131 @@
+"""Durable job queue in its own SQLite file.
+
+Kept apart from the application database so job churn never competes with
+request writes for SQLite's single writer lock.  Reserving a job is one
+``UPDATE ... RETURNING`` statement, so several worker processes can share the
+file.  A job leased by a worker that dies is handed out again once its
+``JOB_VISIBILITY_TIMEOUT`` lapses, with the lost run counted as an attempt so
+a job that keeps killing its worker is eventually buried.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+from app.config import settings
+from app.jobs.queue import Job, JobQueue
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    kwargs TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    idempotency_key TEXT UNIQUE,
+    status TEXT NOT NULL DEFAULT 'queued',  -- queued | running | done | dead
+    run_at REAL NOT NULL,
+    leased_until REAL,
+    last_error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_due ON jobs (status, run_at);
+"""
+
+# An expired lease means the previous run never settled: count it as an attempt
+_RESERVE = """
+UPDATE jobs SET attempts = attempts + (status = 'running'), status = 'running', leased_until = :lease,
+    updated_at = :now
+WHERE id = (
+    SELECT id FROM jobs
+    WHERE (status = 'queued' AND run_at <= :now)
+       OR (status = 'running' AND leased_until <= :now)
+    ORDER BY run_at
+    LIMIT 1
+)
+RETURNING id, name, kwargs, attempts, idempotency_key
+"""
+
+
+class SQLiteQueue(JobQueue):
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._acks = 0
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: every statement commits on its own
+            conn = sqlite3.connect(self.path, timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def push(self, job: Job, run_at: float) -> bool:
+        now = time.time()
+        conn = self._connect()
+        if job.idempotency_key is not None:
+            # Free keys whose retention has lapsed so they can be used again
+            conn.execute(
+                "DELETE FROM jobs WHERE idempotency_key = ? AND status IN ('done', 'dead') AND updated_at <= ?",
+                (job.idempotency_key, now - settings.JOB_IDEMPOTENCY_TTL),
+            )
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO jobs (id, name, kwargs, attempts, idempotency_key, run_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job.id, job.name, json.dumps(job.kwargs), job.attempts, job.idempotency_key, run_at, now),
+        )
+        if cursor.rowcount == 0:
+            return False
+        self._notify()
+        return True
+
+    def reserve(self) -> Job | None:
+        now = time.time()
+        row = self._connect().execute(
+            _RESERVE, {"now": now, "lease": now + settings.JOB_VISIBILITY_TIMEOUT},
+        ).fetchone()
+        if row is None:
+            return None
+        job_id, name, kwargs, attempts, key = row
+        return Job(name=name, kwargs=json.loads(kwargs), id=job_id, attempts=attempts, idempotency_key=key)
+
+    def ack(self, job: Job) -> None:
+        now = time.time()
+        conn = self._connect()
+        if job.idempotency_key is None:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job.id,))
+        else:
+            # Keep the row while it still guards its idempotency key
+            conn.execute(
+                "UPDATE jobs SET status = 'done', attempts = ?, leased_until = NULL, updated_at = ? WHERE id = ?",
+                (job.attempts, now, job.id),
+            )
+        self._acks += 1
+        if self._acks % 100 == 0:
+            self.prune(now)
+
+    def retry(self, job: Job, run_at: float, error: str) -> None:
+        self._connect().execute(
+            "UPDATE jobs SET status = 'queued', attempts = ?, run_at = ?, leased_until = NULL,"
+            " last_error = ?, updated_at = ? WHERE id = ?",
+            (job.attempts, run_at, error, time.time(), job.id),
+        )
+
+    def bury(self, job: Job, error: str) -> None:
+        self._connect().execute(
+            "UPDATE jobs SET status = 'dead', attempts = ?, leased_until = NULL, last_error = ?, updated_at = ?"
+            " WHERE id = ?",
+            (job.attempts, error, time.time(), job.id),
+        )
+
+    def prune(self, now: float | None = None) -> None:
+        """Drop finished jobs older than the idempotency retention window."""
+        cutoff = (now or time.time()) - settings.JOB_IDEMPOTENCY_TTL
+        self._connect().execute("DELETE FROM jobs WHERE status IN ('done', 'dead') AND updated_at <= ?", (cutoff,))
+
+    def counts(self) -> dict[str, int]:
+        return dict(self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
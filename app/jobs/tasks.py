@@ -0,0 +1,76 @@
+"""Job handlers.  Each opens its own session: jobs run outside any request."""
+import logging
+
+from app import database
+from app.jobs.queue import enqueue, job
+from app.models.match import Match
+from app.models.profile import UserProfile
+from app.services import account_service, photo_service
+from app.services.matching_service import calculate_compatibility
+from app.services.version_service import bump_matches_version
+from app.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+
+@job("remove_upload")
+def remove_upload(file_path: str) -> None:
+    """Delete one stored file (``file_path`` as stored on ``UserPhoto``)."""
+    get_storage().delete(file_path)
+
+
+@job("remove_user_uploads")
+def remove_user_uploads(user_id: str) -> None:
+    account_service.remove_user_uploads(user_id)
+
+
+@job("purge_account")
+def purge_account(user_id: str) -> None:
+    with database.SessionLocal() as db:
+        released = account_service.purge_account(db, user_id)
+    account_service.remove_user_uploads(user_id)
+    for digest in released:
+        enqueue("collect_blob", digest=digest, delay=photo_service.COLLECT_DELAY)
+    logger.info("Account purge finished: %s", user_id)
+
+
+def resume_account_purges() -> int:
+    """Enqueue the purge of every account still awaiting one; returns how many.
+
+    Run at startup: a process-local queue drops the jobs of deletions
+    scheduled before a restart, and the idempotency key makes this a no-op
+    for purges a durable queue still holds.
+    """
+    with database.SessionLocal() as db:
+        user_ids = account_service.pending_purges(db)
+    for user_id in user_ids:
+        enqueue("purge_account", user_id=user_id, idempotency_key=f"purge_account:{user_id}")
+    if user_ids:
+        logger.info("Resumed %d pending account purges", len(user_ids))
+    return len(user_ids)
+
+
+@job("collect_blob")
+def collect_blob(digest: str) -> None:
+    """Remove a photo blob's files once no photo references it."""
+    with database.SessionLocal() as db:
+        if photo_service.collect_blob(db, digest):
+            db.commit()
+            logger.info("Collected photo blob %s", digest)
+
+
+@job("score_match")
+def score_match(match_id: str) -> None:
+    """Fill in ``Match.compatibility_score`` for a match created without one."""
+    with database.SessionLocal() as db:
+        match = db.get(Match, match_id)
+        if match is None or match.compatibility_score is not None:
+            return  # unmatched since, or already scored
+        profiles = {
+            p.user_id: p
+            for p in db.query(UserProfile).filter(UserProfile.user_id.in_([match.user1_id, match.user2_id]))
+        }
+        score = calculate_compatibility(profiles.get(match.user1_id), profiles.get(match.user2_id))
+        match.compatibility_score = round(score, 4)
+        bump_matches_version(db, match.user1_id, match.user2_id)
+        db.commit()
@@ -0,0 +1,105 @@
+"""Workers that drain a ``JobQueue``: an asyncio task in the API process, or the CLI.
+
+    python -m app.jobs                      # run until SIGINT/SIGTERM
+    python -m app.jobs --burst              # exit once no job is due
+    python -m app.jobs --concurrency 4
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import threading
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.jobs.queue import JobQueue, get_queue, run_job
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncWorker:
+    """Drains a queue on the event loop of the API process (``JOB_IN_PROCESS_WORKER``).
+
+    Handlers are sync (they use the ORM), so each job runs in the threadpool.
+    Pushes from this process wake the worker instead of waiting for the poll.
+    """
+
+    def __init__(self, queue: JobQueue, poll_interval: float | None = None):
+        self.queue = queue
+        self.poll_interval = poll_interval or settings.JOB_POLL_INTERVAL
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self.queue.set_listener(lambda: loop.call_soon_threadsafe(self._wakeup.set))
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Finish the job in progress, then exit.  Queued jobs stay queued."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+        self.queue.set_listener(None)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            job = await run_in_threadpool(self.queue.reserve)
+            if job is not None:
+                await run_in_threadpool(run_job, self.queue, job)
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+def run_worker(queue: JobQueue, stop: threading.Event, poll_interval: float | None = None, burst: bool = False) -> int:
+    """Blocking worker loop for the CLI; returns the number of jobs processed."""
+    poll_interval = poll_interval or settings.JOB_POLL_INTERVAL
+    processed = 0
+    while not stop.is_set():
+        job = queue.reserve()
+        if job is None:
+            if burst:
+                break
+            stop.wait(poll_interval)
+            continue
+        run_job(queue, job)
+        processed += 1
+    return processed
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.jobs", description="Run background job workers.")
+    parser.add_argument("--concurrency", type=int, default=1, help="worker threads (default: 1)")
+    parser.add_argument("--burst", action="store_true", help="exit when no job is due")
+    parser.add_argument("--poll-interval", type=float, default=None, help="seconds between polls when idle")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    import app.jobs.tasks  # noqa: F401  -- registers the handlers
+
+    if settings.JOB_BACKEND in ("inline", "memory"):
+        parser.error(f"JOB_BACKEND={settings.JOB_BACKEND} is process-local; use sqlite or redis for a separate worker")
+    queue = get_queue()
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    logger.info("Job worker started: backend=%s concurrency=%d", settings.JOB_BACKEND, args.concurrency)
+    threads = [
+        threading.Thread(target=run_worker, args=(queue, stop, args.poll_interval, args.burst), daemon=True)
+        for _ in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        while thread.is_alive():
+            thread.join(0.5)
+    logger.info("Job worker stopped")
@@ -3,12 +3,19 @@ from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
 from app.config import settings
-from app.database import engine, Base
-from app.models import User, UserPhoto, UserProfile, ConversationMessage, ConversationState, Like, Match, DirectMessage, BlockedUser  # noqa: F401
+from app.database import engine
+from app.jobs import get_queue
+from app.jobs.tasks import resume_account_purges
+from app.jobs.worker import AsyncWorker
+from app.migrate import upgrade_database
+from app.utils.compression import CompressionMiddleware
+from app.utils.images import shutdown_image_pool
+from app.models import User, UserPhoto, PhotoBlob, UserProfile, ConversationMessage, ConversationState, Like, Match, DirectMessage, BlockedUser  # noqa: F401
+from app.utils.rate_limiter import close_async_redis, most_restrictive, rate_limit_headers, track_rate_limits
 
 logger = logging.getLogger(__name__)
 
@@ -18,13 +25,25 @@ async def lifespan(app: FastAPI):
     import os
     if not os.environ.get("SECRET_KEY"):
         logger.warning("SECRET_KEY not set via environment. A random key was generated — tokens will not survive restarts.")
-    Base.metadata.create_all(bind=engine)
+    if settings.DB_AUTO_MIGRATE:
+        upgrade_database(engine)
     uploads_dir = Path("uploads")
     uploads_dir.mkdir(exist_ok=True)
+    worker = None
+    queue = get_queue()
+    if settings.JOB_IN_PROCESS_WORKER and not queue.runs_inline:
+        worker = AsyncWorker(queue)
+        worker.start()
+    # Deletions whose purge job did not survive the last shutdown
+    resume_account_purges()
     yield
+    if worker is not None:
+        await worker.stop()
+    shutdown_image_pool()
+    await close_async_redis()
 
 
-app = FastAPI(title="AI Dating App", version="1.0.0", lifespan=lifespan)
+app = FastAPI(title="AI Dating App", version="1.0.0", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -34,6 +53,16 @@ app.add_middleware(
     allow_headers=["Authorization", "Content-Type"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        content_types=settings.compression_content_types_list,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        use_brotli=settings.COMPRESSION_BROTLI,
+    )
+
 
 @app.middleware("http")
 async def security_headers(request, call_next):
@@ -44,12 +73,23 @@ async def security_headers(request, call_next):
     response.headers["X-XSS-Protection"] = "1; mode=block"
     return response
 
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
-from app.routers import auth, profile, chat, discover, matches, messages, block, account  # noqa: E402
+@app.middleware("http")
+async def rate_limit_response_headers(request, call_next):
+    """Advertise the quota of the most restrictive limiter the request was checked against."""
+    with track_rate_limits() as results:
+        response = await call_next(request)
+    result = most_restrictive(results)
+    if result is not None:
+        response.headers.update(rate_limit_headers(result))
+    return response
+
+from app.routers import auth, profile, photos, chat, discover, matches, messages, block, account  # noqa: E402
 
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(profile.router, prefix="/api/v1/profile", tags=["profile"])
+app.include_router(photos.router, prefix="/api/v1/photos", tags=["photos"])
+app.include_router(photos.legacy_router)
 app.include_router(chat.router, prefix="/api/v1/chat", tags=["chat"])
 app.include_router(discover.router, prefix="/api/v1/discover", tags=["discover"])
 app.include_router(matches.router, prefix="/api/v1/matches", tags=["matches"])
@@ -0,0 +1,44 @@
+"""Apply Alembic migrations from the application (startup or ``python -m app.migrate``)."""
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_REVISION = "0001"
+
+
+def alembic_config() -> Config:
+    cfg = Config(str(ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(ROOT / "migrations"))
+    # Leave the application's logging configuration alone
+    cfg.attributes["configure_logger"] = False
+    return cfg
+
+
+def upgrade_database(bind: Engine, revision: str = "head") -> None:
+    """Upgrade ``bind`` to ``revision``.
+
+    Databases created by ``create_all`` before migrations existed have the
+    baseline tables but no ``alembic_version``; they are stamped at the
+    baseline first so only the later migrations run against them.
+    """
+    cfg = alembic_config()
+    with bind.connect() as connection:
+        cfg.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        # End the inspection's implicit transaction so Alembic manages its own
+        # (migrations that build indexes concurrently need to step outside it)
+        connection.commit()
+        if "alembic_version" not in tables and "users" in tables:
+            command.stamp(cfg, BASELINE_REVISION)
+        command.upgrade(cfg, revision)
+        connection.commit()
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    upgrade_database(engine)
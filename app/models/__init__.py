@@ -1,4 +1,4 @@
-from app.models.user import User, UserPhoto
+from app.models.user import User, UserPhoto, PhotoBlob
 from app.models.profile import UserProfile
 from app.models.conversation import ConversationMessage, ConversationState
 from app.models.match import Like, Match
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import String, Boolean, Float, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import String, Boolean, Float, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -9,7 +9,11 @@ from app.database import Base
 
 class Like(Base):
     __tablename__ = "likes"
-    __table_args__ = (UniqueConstraint("liker_id", "liked_id"),)
+    __table_args__ = (
+        UniqueConstraint("liker_id", "liked_id"),
+        # Covers the duplicate and mutual-like checks without touching the table
+        Index("ix_likes_liker_liked_pass", "liker_id", "liked_id", "is_pass"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     liker_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False, index=True)
@@ -20,7 +24,12 @@ class Like(Base):
 
 class Match(Base):
     __tablename__ = "matches"
-    __table_args__ = (UniqueConstraint("user1_id", "user2_id"),)
+    __table_args__ = (
+        UniqueConstraint("user1_id", "user2_id"),
+        # Match list: either side of the pair, newest first
+        Index("ix_matches_user1_created", "user1_id", "created_at"),
+        Index("ix_matches_user2_created", "user2_id", "created_at"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user1_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False, index=True)
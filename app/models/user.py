@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import String, Boolean, Integer, Float, Date, Text, DateTime, ForeignKey
+from sqlalchemy import String, Boolean, Integer, Float, Date, Text, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -9,6 +9,16 @@ from app.database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Discover scans discoverable users newest first; the partial index
+        # holds only those rows, so the scan stops at the LIMIT.
+        Index(
+            "ix_users_discoverable_created",
+            "created_at",
+            sqlite_where=text("is_active = 1 AND profile_setup_complete = 1"),
+            postgresql_where=text("is_active AND profile_setup_complete"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
@@ -46,7 +56,16 @@ class User(Base):
     hidden_fields: Mapped[str | None] = mapped_column(Text, nullable=True)  # JSON array of field names
     profile_setup_complete: Mapped[bool] = mapped_column(Boolean, default=False)
     token_invalidated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Deletion scheduled; the row stays locked out until purge_account removes it (see account_service)
+    purge_requested_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Bumped whenever the public profile card changes (see card_service)
+    profile_version: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    # Bumped whenever the match list or the onboarding chat changes (see version_service)
+    matches_version: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    chat_version: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    # Login, swipes and messages; a discover ranking signal (see account_service.record_activity)
+    last_active_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
@@ -56,10 +75,13 @@ class User(Base):
 
 class UserPhoto(Base):
     __tablename__ = "user_photos"
+    __table_args__ = (Index("ix_user_photos_user_order", "user_id", "order_index"),)
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False)
     file_path: Mapped[str] = mapped_column(String(500), nullable=False)
+    variants: Mapped[str | None] = mapped_column(Text, nullable=True)  # JSON object: variant -> file path
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)  # PhotoBlob key
     is_primary: Mapped[bool] = mapped_column(Boolean, default=False)
     order_index: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -67,5 +89,16 @@ class UserPhoto(Base):
     user: Mapped["User"] = relationship("User", back_populates="photos")
 
 
+class PhotoBlob(Base):
+    """Stored files for one upload's content, shared by every photo with the same bytes."""
+    __tablename__ = "photo_blobs"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)  # sha256 of the uploaded bytes
+    file_path: Mapped[str] = mapped_column(String(500), nullable=False)
+    variants: Mapped[str | None] = mapped_column(Text, nullable=True)  # JSON object: variant -> file path
+    refcount: Mapped[int] = mapped_column(Integer, default=0)  # UserPhoto rows pointing here
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
 # Avoid circular import — forward ref resolved by SQLAlchemy
 from app.models.profile import UserProfile  # noqa: E402, F401
@@ -1,17 +1,14 @@
 import logging
-from pathlib import Path
-from shutil import rmtree
 
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
 
 from app.dependencies import get_db, get_current_user
+from app.jobs import enqueue
 from app.models.user import User
-from app.models.match import Like, Match
-from app.models.message import DirectMessage
-from app.models.block import BlockedUser
-from app.models.conversation import ConversationMessage, ConversationState
 from app.schemas.account import AccountStatusResponse
+from app.services import account_service, photo_service
+from app.services.snapshot_service import note_user_changed
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -23,6 +20,7 @@ def deactivate_account(
     db: Session = Depends(get_db),
 ):
     current_user.is_active = False
+    note_user_changed(db, current_user.id)
     db.commit()
     db.refresh(current_user)
     logger.info("Account deactivated: %s", current_user.email)
@@ -35,6 +33,7 @@ def reactivate_account(
     db: Session = Depends(get_db),
 ):
     current_user.is_active = True
+    note_user_changed(db, current_user.id)
     db.commit()
     db.refresh(current_user)
     logger.info("Account reactivated: %s", current_user.email)
@@ -54,29 +53,19 @@ def delete_account(
     uid = current_user.id
     email = current_user.email  # Capture before delete (avoids DetachedInstanceError)
 
-    # Delete messages in matches involving this user
-    match_ids = [
-        m.id for m in db.query(Match.id).filter(
-            (Match.user1_id == uid) | (Match.user2_id == uid)
-        ).all()
-    ]
-    if match_ids:
-        db.query(DirectMessage).filter(DirectMessage.match_id.in_(match_ids)).delete(synchronize_session="fetch")
+    if account_service.count_messages(db, uid) > account_service.DELETE_CHUNK_SIZE:
+        # Large history: revoke access now and purge in chunks after the response
+        account_service.revoke_account(db, current_user)
+        db.commit()
+        enqueue("purge_account", user_id=uid, idempotency_key=f"purge_account:{uid}")
+        logger.info("Account deletion scheduled: %s", email)
+        return
 
-    # Delete matches, likes, blocks, conversations
-    db.query(Match).filter((Match.user1_id == uid) | (Match.user2_id == uid)).delete(synchronize_session="fetch")
-    db.query(Like).filter((Like.liker_id == uid) | (Like.liked_id == uid)).delete(synchronize_session="fetch")
-    db.query(BlockedUser).filter((BlockedUser.blocker_id == uid) | (BlockedUser.blocked_id == uid)).delete(synchronize_session="fetch")
-    db.query(ConversationMessage).filter(ConversationMessage.user_id == uid).delete(synchronize_session="fetch")
-    db.query(ConversationState).filter(ConversationState.user_id == uid).delete(synchronize_session="fetch")
-
-    # Delete uploaded photos from disk
-    uploads_dir = Path("uploads") / uid
-    if uploads_dir.exists():
-        rmtree(uploads_dir, ignore_errors=True)
-
-    # Delete user (cascades to photos and profile via relationship)
-    db.delete(current_user)
+    released = account_service.delete_user_rows(db, uid)
     db.commit()
+    # Uploaded photos are removed from disk by background jobs
+    enqueue("remove_user_uploads", user_id=uid)
+    for digest in released:
+        enqueue("collect_blob", digest=digest, delay=photo_service.COLLECT_DELAY)
 
     logger.info("Account permanently deleted: %s", email)
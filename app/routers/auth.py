@@ -6,8 +6,9 @@ from sqlalchemy.orm import Session
 from app.dependencies import get_db
 from app.models.user import User
 from app.schemas.auth import SignupRequest, LoginRequest, TokenResponse
+from app.services import account_service
 from app.services.auth_service import hash_password, verify_password, create_access_token
-from app.utils.rate_limiter import auth_rate_limiter, auth_ip_rate_limiter
+from app.utils.rate_limiter import auth_rate_limiter, auth_ip_rate_limiter, check_rate_limits
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -23,8 +24,7 @@ def _get_client_ip(request: Request) -> str:
 @router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 def signup(request: SignupRequest, raw_request: Request = None, db: Session = Depends(get_db)):
     client_ip = _get_client_ip(raw_request) if raw_request else "unknown"
-    auth_ip_rate_limiter.check(client_ip)
-    auth_rate_limiter.check(request.email.lower())
+    check_rate_limits((auth_ip_rate_limiter, client_ip), (auth_rate_limiter, request.email.lower()))
     email = request.email.lower()
 
     # Always hash to prevent timing-based email enumeration
@@ -49,8 +49,7 @@ def signup(request: SignupRequest, raw_request: Request = None, db: Session = De
 @router.post("/login", response_model=TokenResponse)
 def login(request: LoginRequest, raw_request: Request = None, db: Session = Depends(get_db)):
     client_ip = _get_client_ip(raw_request) if raw_request else "unknown"
-    auth_ip_rate_limiter.check(client_ip)
-    auth_rate_limiter.check(request.email.lower())
+    check_rate_limits((auth_ip_rate_limiter, client_ip), (auth_rate_limiter, request.email.lower()))
     user = db.query(User).filter(User.email == request.email.lower()).first()
     if not user:
         # Run hash anyway to prevent timing-based user enumeration
@@ -60,7 +59,11 @@ def login(request: LoginRequest, raw_request: Request = None, db: Session = Depe
     if not verify_password(request.password, user.hashed_password):
         logger.warning("Failed login attempt for email: %s", request.email)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
+    if user.purge_requested_at is not None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account is being deleted")
 
+    account_service.record_activity(db, user)
+    db.commit()
     logger.info("User login: %s (active=%s)", user.email, user.is_active)
     token = create_access_token(user.id)
     return TokenResponse(access_token=token, user_id=user.id, is_active=user.is_active)
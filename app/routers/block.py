@@ -9,6 +9,7 @@ from app.models.match import Like, Match
 from app.models.message import DirectMessage
 from app.models.block import BlockedUser
 from app.schemas.block import BlockRequest, BlockResponse, BlockedUserResponse, BlockedUserListResponse
+from app.services.version_service import bump_matches_version
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -51,6 +52,7 @@ def block_user(
     if match:
         db.query(DirectMessage).filter(DirectMessage.match_id == match.id).delete()
         db.delete(match)
+        bump_matches_version(db, user1, user2)
         auto_unmatched = True
 
     db.commit()
@@ -1,13 +1,14 @@
 import json
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db, get_current_user
+from app.dependencies import get_db, get_read_db, get_current_user, get_current_reader
 from app.models.user import User
 from app.models.profile import UserProfile
 from app.schemas.chat import ChatRequest, ChatResponse, ChatMessageResponse, ChatStatusResponse
 from app.services.chat_service import process_message, get_conversation_history, get_or_create_state
+from app.utils.conditional import not_modified, user_etag, validator_headers
 
 from app.utils.rate_limiter import chat_rate_limiter
 
@@ -62,20 +63,33 @@ def get_chat_intro(
 
 @router.get("/history", response_model=list[ChatMessageResponse])
 def get_chat_history(
+    request: Request,
+    response: Response,
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_reader),
+    db: Session = Depends(get_read_db),
 ):
+    etag = user_etag("chat-history", current_user.id, current_user.chat_version)
+    if cached := not_modified(request, etag):
+        return cached
+    response.headers.update(validator_headers(etag))
     messages = get_conversation_history(db, current_user.id, limit=limit, offset=offset)
     return [ChatMessageResponse.model_validate(m) for m in messages]
 
 
 @router.get("/status", response_model=ChatStatusResponse)
 def get_chat_status(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
+    # Completeness and the setup flags change with the profile, not the chat
+    etag = user_etag("chat-status", current_user.id, current_user.chat_version, current_user.profile_version)
+    if cached := not_modified(request, etag):
+        return cached
+    response.headers.update(validator_headers(etag))
     state = get_or_create_state(db, current_user.id)
     try:
         topics_completed = json.loads(state.topics_completed) if state.topics_completed else []
@@ -1,22 +1,71 @@
 import math
-from datetime import date
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import or_, and_
-from sqlalchemy.orm import Session, subqueryload
+from sqlalchemy import and_, exists, func, or_, select, union
+from sqlalchemy.orm import Session
 
-from app.dependencies import get_db, get_current_user
+from app.config import settings
+from app.dependencies import get_async_read_db, get_current_reader_async
 from app.models.user import User
 from app.models.conversation import ConversationState
 from app.models.match import Like, Match
+from app.models.profile import UserProfile
 from app.models.block import BlockedUser
-from app.schemas.discover import DiscoverResponse
-from app.services.matching_service import calculate_compatibility
+from app.schemas.discover import DiscoverResponse, DiscoverView
+from app.services.matching_service import DIMENSION_WEIGHTS, compatibility_from_tokens, dimension_tokens, profile_tokens
 from app.services.chat_service import ONBOARDING_COMPLETED
-from app.utils.profile_builder import build_discover_user, _safe_json_loads, haversine_km
+from app.services.card_service import card_summaries, public_cards
+from app.services.count_service import count_cache, estimate_total
+from app.services.ranking_service import ScoredCandidate, rank_weights, top_candidates
+from app.services.snapshot_service import NO_CODE, NO_DATE, SnapshotColumns, get_snapshot_columns
+from app.utils.profile_builder import build_card_response, build_summary_response, _safe_json_loads, haversine_km
+from app.utils.responses import PrebuiltResponse
 
 router = APIRouter()
 
+# What the over-fetched candidates are filtered, scored and ranked on.  Everything
+# else (hashed_password, the free-text profile fields, photos, ...) is loaded
+# only for the page that is returned.
+_FILTER_COLUMNS = (
+    User.id, User.gender, User.gender_preference, User.latitude, User.longitude, User.height_inches, User.religion,
+)
+_SCORING_COLUMNS = tuple(getattr(UserProfile, dimension) for dimension in DIMENSION_WEIGHTS)
+_RANKING_COLUMNS = (UserProfile.profile_completeness, func.coalesce(User.last_active_at, User.created_at))
+
+
+@dataclass(slots=True)
+class _Candidates:
+    """The over-fetch window as columns: entry ``i`` of every list is candidate ``i``."""
+    ids: tuple[str, ...]
+    genders: tuple[str | None, ...]
+    gender_preferences: tuple[str | None, ...]
+    latitudes: tuple[float | None, ...]
+    longitudes: tuple[float | None, ...]
+    heights: tuple[int | None, ...]
+    religions: tuple[str | None, ...]
+    completeness: tuple[float | None, ...]
+    last_active: tuple[datetime | None, ...]  # created_at until the first activity
+    dimensions: dict[str, tuple[str | None, ...]]  # raw profile column per scored dimension
+
+    @classmethod
+    def from_rows(cls, rows: list) -> "_Candidates":
+        n_columns = len(_FILTER_COLUMNS) + len(_RANKING_COLUMNS) + len(_SCORING_COLUMNS)
+        columns = list(zip(*rows)) if rows else [()] * n_columns
+        ranking_start = len(_FILTER_COLUMNS)
+        scoring_start = ranking_start + len(_RANKING_COLUMNS)
+        return cls(
+            *columns[:ranking_start], *columns[ranking_start:scoring_start],
+            dimensions=dict(zip(DIMENSION_WEIGHTS, columns[scoring_start:])),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def tokens(self, i: int) -> dict[str, set[str]]:
+        return dimension_tokens({dimension: column[i] for dimension, column in self.dimensions.items()})
+
 
 def _calculate_age(dob: date) -> int:
     today = date.today()
@@ -30,37 +79,61 @@ def _safe_date(year: int, month: int, day: int) -> date:
     return date(year, month, min(day, max_day))
 
 
+def _bounding_box(current_user: User) -> tuple[float, float, float, float] | None:
+    """Latitude and longitude bounds around the user's max distance, or None without GPS."""
+    if current_user.latitude is None or current_user.longitude is None:
+        return None
+    max_km = current_user.max_distance_km or 50
+    lat_delta = max_km / 111.0
+    cos_lat = math.cos(math.radians(current_user.latitude))
+    lon_delta = max_km / (111.0 * max(cos_lat, 0.01))
+    return (
+        current_user.latitude - lat_delta, current_user.latitude + lat_delta,
+        current_user.longitude - lon_delta, current_user.longitude + lon_delta,
+    )
+
+
+def _age_bounds(current_user: User) -> tuple[date, date, int] | None:
+    """``(min_dob_cutoff, max_dob, my_age)``: candidates born after the first and by the second are in range."""
+    if not current_user.date_of_birth:
+        return None
+    today = date.today()
+    max_dob = _safe_date(today.year - current_user.age_range_min, today.month, today.day)
+    min_dob_cutoff = _safe_date(today.year - current_user.age_range_max - 1, today.month, today.day)
+    return min_dob_cutoff, max_dob, _calculate_age(current_user.date_of_birth)
+
+
 @router.get("", response_model=DiscoverResponse)
-def discover(
+async def discover(
     limit: int = Query(10, ge=1, le=50),
     offset: int = Query(0, ge=0),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    view: DiscoverView = Query("full", description="`card`: id, name, birth date, primary photo, score and distance only"),
+    current_user: User = Depends(get_current_reader_async),
+    db=Depends(get_async_read_db),
 ):
-    # Check onboarding status
-    state = db.query(ConversationState).filter(ConversationState.user_id == current_user.id).first()
-    if not state or state.onboarding_status != ONBOARDING_COMPLETED:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Complete onboarding chat before discovering users",
-        )
+    return PrebuiltResponse(await db.run_sync(_discover, current_user, limit, offset, view))
 
-    # ── SQL-level filtering ──────────────────────────────────────────────
-    q = (
-        db.query(User)
-        .options(subqueryload(User.profile), subqueryload(User.photos))
-        .filter(
-            User.id != current_user.id,
-            User.is_active == True,  # noqa: E712
-            User.profile_setup_complete == True,  # noqa: E712
-        )
+
+def _candidate_query(db: Session, current_user: User):
+    """SQL-level discover filters, newest users first.
+
+    Kept as its own function so tests can EXPLAIN exactly what discover runs.
+    """
+    q = db.query(User).filter(
+        User.id != current_user.id,
+        User.is_active == True,  # noqa: E712
+        User.profile_setup_complete == True,  # noqa: E712
     )
 
-    # Must have completed onboarding
-    q = q.filter(User.id.in_(
-        db.query(ConversationState.user_id)
-        .filter(ConversationState.onboarding_status == ONBOARDING_COMPLETED)
-    ))
+    # Must have completed onboarding.  A correlated EXISTS probes
+    # conversation_state by its unique user_id instead of reading the whole
+    # table into an IN list, so the scan can follow ix_users_discoverable_created.
+    q = q.filter(
+        exists().where(
+            ConversationState.user_id == User.id,
+            ConversationState.onboarding_status == ONBOARDING_COMPLETED,
+        )
+    )
 
     # Exclude liked / passed
     q = q.filter(~User.id.in_(
@@ -80,29 +153,24 @@ def discover(
     )
 
     # Rough bounding-box pre-filter for distance (if current user has GPS)
-    if current_user.latitude is not None and current_user.longitude is not None:
-        max_km = current_user.max_distance_km or 50
-        lat_delta = max_km / 111.0
-        cos_lat = math.cos(math.radians(current_user.latitude))
-        lon_delta = max_km / (111.0 * max(cos_lat, 0.01))
+    box = _bounding_box(current_user)
+    if box:
+        lat_min, lat_max, lon_min, lon_max = box
         q = q.filter(or_(
             User.latitude.is_(None),
             and_(
-                User.latitude >= current_user.latitude - lat_delta,
-                User.latitude <= current_user.latitude + lat_delta,
-                User.longitude >= current_user.longitude - lon_delta,
-                User.longitude <= current_user.longitude + lon_delta,
+                User.latitude >= lat_min,
+                User.latitude <= lat_max,
+                User.longitude >= lon_min,
+                User.longitude <= lon_max,
             ),
         ))
 
     # Bidirectional age-range
-    if current_user.date_of_birth:
-        my_age = _calculate_age(current_user.date_of_birth)
-        today = date.today()
-
+    ages = _age_bounds(current_user)
+    if ages:
         # Candidate's DOB must put their age inside my [min, max]
-        max_dob = _safe_date(today.year - current_user.age_range_min, today.month, today.day)
-        min_dob_cutoff = _safe_date(today.year - current_user.age_range_max - 1, today.month, today.day)
+        min_dob_cutoff, max_dob, my_age = ages
         q = q.filter(or_(
             User.date_of_birth.is_(None),
             and_(User.date_of_birth > min_dob_cutoff, User.date_of_birth <= max_dob),
@@ -111,55 +179,315 @@ def discover(
         # My age must be inside candidate's [min, max]
         q = q.filter(User.age_range_min <= my_age, User.age_range_max >= my_age)
 
-    # Deterministic ordering + SQL-level limit to avoid loading the entire table.
-    # Over-fetch to account for Python-level gender + distance + height/religion filtering.
-    sql_limit = (offset + limit) * 5 + 50
-    candidates = q.order_by(User.created_at.desc()).limit(sql_limit).all()
+    return q.order_by(User.created_at.desc())
+
+
+def _scoring_query(db: Session, current_user: User):
+    """The candidate query projected to filter and scoring columns: plain tuples, no ORM objects."""
+    return (
+        _candidate_query(db, current_user)
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)
+        .with_entities(*_FILTER_COLUMNS, *_RANKING_COLUMNS, *_SCORING_COLUMNS)
+    )
+
+
+def _load_candidates(db: Session, current_user: User, sql_limit: int) -> _Candidates:
+    """Phase one: the over-fetch window, in one query, as compact columns."""
+    return _Candidates.from_rows(_scoring_query(db, current_user).limit(sql_limit).all())
+
+
+def _page_users(db: Session, page: list[tuple[str, float, float | None]], view: DiscoverView) -> list:
+    """Phase two: response entries for the ranked page of ``(user_id, compatibility, distance)``.
+
+    Full user rows are loaded for these users only; photos and profiles come
+    with the cards, and only for cards that are not cached.
+    """
+    if not page:
+        return []
+    by_id = {u.id: u for u in db.query(User).filter(User.id.in_([user_id for user_id, _, _ in page]))}
+    # A candidate deleted since phase one is dropped from the page
+    page = [(by_id[user_id], s, d) for user_id, s, d in page if user_id in by_id]
+    users = [c for c, _, _ in page]
+    if view == "card":
+        summaries = card_summaries(db, users)
+        return [build_summary_response(summaries[c.id], s, d) for c, s, d in page]
+    cards = public_cards(db, users)
+    return [build_card_response(cards[c.id], s, d) for c, s, d in page]
+
+
+def _sql_scores(db: Session, current_user: User, sql_limit: int, user_tokens: dict) -> tuple[list[ScoredCandidate], int]:
+    """The over-fetch window candidates that pass every filter, newest first, and the window size before filtering."""
+    candidates = _load_candidates(db, current_user, sql_limit)
 
     # ── Python-level gender-preference filter (requires JSON parsing) ────
     user_gender_pref = _safe_json_loads(current_user.gender_preference)
     user_religion_pref = _safe_json_loads(current_user.religion_preference)
-
     has_gps = (current_user.latitude is not None and current_user.longitude is not None)
 
-    scored: list[tuple[User, float, float | None]] = []
-    for c in candidates:
-        if user_gender_pref and c.gender and c.gender not in user_gender_pref:
+    scored: list[ScoredCandidate] = []
+    for i in range(len(candidates)):
+        gender = candidates.genders[i]
+        if user_gender_pref and gender and gender not in user_gender_pref:
             continue
-        c_pref = _safe_json_loads(c.gender_preference)
+        c_pref = _safe_json_loads(candidates.gender_preferences[i])
         if c_pref and current_user.gender and current_user.gender not in c_pref:
             continue
 
         # Distance filtering (precise haversine after SQL bounding-box)
         distance = None
-        if has_gps and c.latitude is not None and c.longitude is not None:
+        latitude, longitude = candidates.latitudes[i], candidates.longitudes[i]
+        if has_gps and latitude is not None and longitude is not None:
             distance = haversine_km(
                 current_user.latitude, current_user.longitude,
-                c.latitude, c.longitude,
+                latitude, longitude,
             )
             max_km = current_user.max_distance_km or 50
             if distance > max_km:
                 continue
 
         # Height preference filter
+        height = candidates.heights[i]
         if (current_user.height_pref_min is not None
                 and current_user.height_pref_max is not None
-                and c.height_inches is not None):
-            if c.height_inches < current_user.height_pref_min or c.height_inches > current_user.height_pref_max:
+                and height is not None):
+            if height < current_user.height_pref_min or height > current_user.height_pref_max:
                 continue
 
         # Religion preference filter
         if user_religion_pref and len(user_religion_pref) > 0:
-            if not c.religion or c.religion not in user_religion_pref:
+            religion = candidates.religions[i]
+            if not religion or religion not in user_religion_pref:
                 continue
 
-        score = calculate_compatibility(current_user.profile, c.profile)
-        scored.append((c, score, distance))
+        score = compatibility_from_tokens(user_tokens, candidates.tokens(i))
+        scored.append(ScoredCandidate(
+            candidates.ids[i], score, distance, candidates.completeness[i], candidates.last_active[i],
+        ))
+    return scored, len(candidates)
 
-    # Sort by compatibility and paginate
-    scored.sort(key=lambda x: x[1], reverse=True)
-    total = len(scored)
-    page = scored[offset:offset + limit]
 
-    users = [build_discover_user(c, s, d) for c, s, d in page]
-    return DiscoverResponse(users=users, total=total, limit=limit, offset=offset)
+def _python_filters_apply(current_user: User) -> bool:
+    """Whether any filter of ``_sql_scores`` beyond ``_candidate_query`` can reject a candidate."""
+    return bool(
+        _safe_json_loads(current_user.gender_preference)
+        or current_user.gender
+        or (current_user.latitude is not None and current_user.longitude is not None)
+        or (current_user.height_pref_min is not None and current_user.height_pref_max is not None)
+        or _safe_json_loads(current_user.religion_preference)
+    )
+
+
+def _sql_total(db: Session, current_user: User, passed: int, window: int, sql_limit: int) -> tuple[int, bool]:
+    """``(total, exact)`` for the SQL path, where ``passed`` of a ``window`` of candidates passed every filter."""
+    if window < sql_limit:
+        return passed, True  # the window holds every candidate
+    cached = count_cache.get(current_user.id, current_user.profile_version)
+    if cached is None:
+        population = _candidate_query(db, current_user).order_by(None).with_entities(func.count(User.id)).scalar()
+        if _python_filters_apply(current_user):
+            cached = estimate_total(population, window, passed), False
+        else:
+            cached = population, True
+        count_cache.put(current_user.id, current_user.profile_version, *cached)
+    total, exact = cached
+    # A cached total may predate candidates that are in this window
+    return max(total, passed), exact
+
+
+def _excluded_ids(user_id: str):
+    """Users ``user_id`` liked or passed, is matched with or is on either side of a block with."""
+    return union(
+        select(Like.liked_id).where(Like.liker_id == user_id),
+        select(Match.user2_id).where(Match.user1_id == user_id),
+        select(Match.user1_id).where(Match.user2_id == user_id),
+        select(BlockedUser.blocked_id).where(BlockedUser.blocker_id == user_id),
+        select(BlockedUser.blocker_id).where(BlockedUser.blocked_id == user_id),
+    )
+
+
+def _snapshot_scores(
+    db: Session, current_user: User, columns: SnapshotColumns, k: int, user_tokens: dict, now: datetime,
+) -> tuple[list[ScoredCandidate], int]:
+    """``_sql_scores`` as masks over the candidate snapshot, without its newest-first window.
+
+    Every candidate past the filters is scored and ranked in NumPy, so the
+    best ones are found however old their accounts are.  Only the shortlist
+    that can make ``top_candidates``' top ``k`` becomes ``ScoredCandidate``
+    tuples, newest first; ``top_candidates`` then orders it exactly as it
+    would order everyone.  Also returns the number of candidates past every filter.
+    """
+    import numpy as np
+
+    # ── The filters of _candidate_query ──────────────────────────────────
+    mask = np.ones(len(columns), dtype=bool)
+    mask[columns.slots_of([current_user.id, *db.scalars(_excluded_ids(current_user.id))])] = False
+    box = _bounding_box(current_user)
+    if box:
+        lat_min, lat_max, lon_min, lon_max = box
+        latitude, longitude = columns.latitude, columns.longitude
+        mask &= np.isnan(latitude) | (
+            (latitude >= lat_min) & (latitude <= lat_max) & (longitude >= lon_min) & (longitude <= lon_max)
+        )
+    ages = _age_bounds(current_user)
+    if ages:
+        min_dob_cutoff, max_dob, my_age = ages
+        dob = columns.dob
+        mask &= (dob == NO_DATE) | ((dob > min_dob_cutoff.toordinal()) & (dob <= max_dob.toordinal()))
+        mask &= (columns.age_min <= my_age) & (columns.age_max >= my_age)
+    eligible = columns.order[mask[columns.order]]  # newest first
+
+    # ── The Python-level filters of _sql_scores, over every eligible user ─
+    keep = np.ones(len(eligible), dtype=bool)
+    vocabularies = columns.vocabularies
+    user_gender_pref = _safe_json_loads(current_user.gender_preference)
+    if user_gender_pref:
+        gender = columns.gender[eligible]
+        keep &= (gender == NO_CODE) | np.isin(gender, columns.codes_of(vocabularies.genders, user_gender_pref))
+    if current_user.gender:
+        code = vocabularies.genders.codes.get(current_user.gender)
+        accepts = columns.any_gender[eligible]
+        if code is not None:
+            accepts = accepts | ((columns.preference[eligible] >> np.uint64(code)) & np.uint64(1)).astype(bool)
+        keep &= accepts
+
+    distance = np.full(len(eligible), np.nan)
+    if current_user.latitude is not None and current_user.longitude is not None:
+        latitude, longitude = columns.latitude[eligible], columns.longitude[eligible]
+        distance = _haversine_km(current_user.latitude, current_user.longitude, latitude, longitude)
+        keep &= np.isnan(distance) | (distance <= (current_user.max_distance_km or 50))
+
+    if current_user.height_pref_min is not None and current_user.height_pref_max is not None:
+        height = columns.height[eligible]
+        keep &= (height < 0) | ((height >= current_user.height_pref_min) & (height <= current_user.height_pref_max))
+
+    user_religion_pref = _safe_json_loads(current_user.religion_preference)
+    if user_religion_pref:
+        keep &= np.isin(columns.religion[eligible], columns.codes_of(vocabularies.religions, user_religion_pref))
+
+    candidates, distance = eligible[keep], distance[keep]
+    total = len(candidates)
+
+    # ── compatibility_from_tokens, summed in the same order ──────────────
+    weighted = np.zeros(total)
+    total_weight = np.zeros(total)
+    for dimension, weight in DIMENSION_WEIGHTS.items():
+        mine = user_tokens.get(dimension)
+        if not mine:
+            continue
+        theirs = columns.token_counts[dimension][candidates]
+        shared = np.bitwise_count(columns.tokens[dimension][candidates] & columns.token_row(dimension, mine)).sum(axis=1)
+        present = theirs > 0
+        similarity = np.divide(shared, len(mine) + theirs - shared, out=np.zeros(total), where=present)
+        weighted += np.where(present, similarity * weight, 0.0)
+        total_weight += np.where(present, weight, 0.0)
+    scores = np.divide(weighted, total_weight, out=np.zeros(total), where=total_weight > 0)
+    completeness = columns.completeness[candidates]
+
+    # ── rank_key over the whole vector, then the shortlist ───────────────
+    if total > k:
+        ranks = _snapshot_ranks(
+            current_user.max_distance_km or 50, scores, distance, completeness, columns.seconds_inactive(candidates, now),
+        )
+        shortlist = _shortlist(ranks, k)
+        candidates, scores, distance, completeness = (
+            candidates[shortlist], scores[shortlist], distance[shortlist], completeness[shortlist],
+        )
+
+    slots = candidates.tolist()
+    scored = [
+        ScoredCandidate(columns.ids[slot], score, None if math.isnan(d) else d, None if math.isnan(c) else c, active)
+        for slot, score, d, c, active in zip(
+            slots, scores.tolist(), distance.tolist(), completeness.tolist(), columns.last_active_at(slots),
+        )
+    ]
+    return scored, total
+
+
+# Ranks that NumPy and rank_key's math.fsum may round apart; the shortlist keeps both sides of it
+_RANK_TOLERANCE = 1e-9
+
+
+def _snapshot_ranks(max_km: float, compatibility, distance, completeness, inactive):
+    """``rank_key`` under ``rank_weights()``, over arrays of each signal's input (``inactive`` in seconds)."""
+    import numpy as np
+
+    weights = rank_weights()
+    terms = []
+    if weights["compatibility"]:
+        terms.append((weights["compatibility"], compatibility))
+    if weights["distance"]:
+        terms.append((weights["distance"], np.where(np.isnan(distance), 0.5, np.maximum(0.0, 1 - distance / max_km))))
+    if weights["completeness"]:
+        terms.append((weights["completeness"], np.nan_to_num(completeness)))
+    if weights["activity"]:
+        half_life = settings.DISCOVER_ACTIVITY_HALF_LIFE_HOURS * 3600
+        terms.append((weights["activity"], 0.5 ** (np.maximum(inactive, 0.0) / half_life)))
+
+    if len(terms) == 1 and terms[0][0] > 0:
+        return terms[0][1]
+    return sum((weight * signal for weight, signal in terms), np.zeros(len(compatibility)))
+
+
+def _shortlist(ranks, k: int):
+    """Indices, in order, of every rank that can be among the ``k`` largest.
+
+    All ranks clearly above the ``k``-th largest, plus the first ``k`` within
+    ``_RANK_TOLERANCE`` of it: ``top_candidates`` breaks ties by order, so
+    later ones never make the cut.
+    """
+    import numpy as np
+
+    threshold = np.partition(ranks, len(ranks) - k)[len(ranks) - k]
+    picked = ranks > threshold + _RANK_TOLERANCE
+    tied = np.flatnonzero(~picked & (ranks >= threshold - _RANK_TOLERANCE))
+    picked[tied[:k]] = True
+    return np.flatnonzero(picked)
+
+
+def _haversine_km(lat1: float, lon1: float, lat2, lon2):
+    """``haversine_km`` from one point to arrays of points."""
+    import numpy as np
+
+    dlat = np.radians(lat2 - lat1)
+    dlon = np.radians(lon2 - lon1)
+    a = (np.sin(dlat / 2) ** 2
+         + math.cos(math.radians(lat1)) * np.cos(np.radians(lat2))
+         * np.sin(dlon / 2) ** 2)
+    return 6371.0 * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def _discover(db: Session, current_user: User, limit: int, offset: int, view: DiscoverView = "full") -> DiscoverResponse:
+    # Check onboarding status
+    state = db.query(ConversationState).filter(ConversationState.user_id == current_user.id).first()
+    if not state or state.onboarding_status != ONBOARDING_COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Complete onboarding chat before discovering users",
+        )
+
+    # Parsed once, not once per candidate
+    user_tokens = profile_tokens(current_user.profile)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    columns = get_snapshot_columns(db)
+    if columns is not None:
+        # Every candidate is scored, so no window: the cost is linear in the
+        # snapshot, and vectorized that stays well under the SQL path's
+        scored, total = _snapshot_scores(db, current_user, columns, offset + limit, user_tokens, now)
+        # Counted over the snapshot, which trails other processes' writes by up
+        # to DISCOVER_SNAPSHOT_REBUILD_SECONDS
+        total_exact = False
+    else:
+        # Deterministic ordering + SQL-level limit to avoid loading the entire table.
+        # Over-fetch to account for Python-level gender + distance + height/religion filtering.
+        sql_limit = (offset + limit) * 5 + 50
+        scored, window = _sql_scores(db, current_user, sql_limit, user_tokens)
+        total, total_exact = _sql_total(db, current_user, len(scored), window, sql_limit)
+
+    # Rank, ordering only as many candidates as the page needs
+    ranked = top_candidates(scored, offset + limit, rank_weights(), current_user.max_distance_km or 50, now)
+    page = [(c.user_id, c.compatibility, c.distance) for c in ranked[offset:]]
+
+    users = _page_users(db, page, view)
+    return DiscoverResponse.model_construct(
+        users=users, total=total, total_exact=total_exact, limit=limit, offset=offset,
+    )
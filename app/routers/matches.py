@@ -1,17 +1,25 @@
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 
-from app.dependencies import get_db, get_current_user, check_block
+from app.dependencies import (
+    get_db, get_read_db, get_current_user, get_current_reader, get_async_db, get_current_user_async, check_block,
+)
 from app.models.user import User
-from app.models.profile import UserProfile
 from app.models.match import Like, Match
 from app.models.message import DirectMessage
+from app.schemas.discover import DiscoverView
 from app.schemas.match import LikeRequest, LikeResponse, PassRequest, PassResponse, MatchResponse, MatchListResponse
-from app.services.matching_service import calculate_compatibility
-from app.utils.profile_builder import build_discover_user
+from app.jobs import enqueue
+from app.services.account_service import record_activity
+from app.services.card_service import card_summaries, public_cards
+from app.services.version_service import bump_matches_version
+from app.utils.conditional import not_modified, user_etag, validator_headers
+from app.utils.profile_builder import build_card_response, build_summary_response
+from app.utils.responses import PrebuiltResponse
+from app.utils.signed_urls import link_window
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +27,15 @@ router = APIRouter()
 
 
 @router.post("/like", response_model=LikeResponse)
-def like_user(
+async def like_user(
     request: LikeRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db=Depends(get_async_db),
 ):
+    return await db.run_sync(_like_user, current_user, request)
+
+
+def _like_user(db: Session, current_user: User, request: LikeRequest) -> LikeResponse:
     if request.liked_user_id == current_user.id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot like yourself")
 
@@ -59,6 +71,7 @@ def like_user(
 
     match_id = None
     is_match = False
+    created = False
 
     if mutual:
         user1 = min(current_user.id, request.liked_user_id)
@@ -69,16 +82,15 @@ def like_user(
         ).first()
 
         if not existing_match:
-            my_profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
-            their_profile = db.query(UserProfile).filter(UserProfile.user_id == request.liked_user_id).first()
-            score = calculate_compatibility(my_profile, their_profile)
-
-            match = Match(user1_id=user1, user2_id=user2, compatibility_score=round(score, 4))
+            # Scored by the score_match job once committed
+            match = Match(user1_id=user1, user2_id=user2)
             db.add(match)
             try:
                 db.flush()
+                bump_matches_version(db, user1, user2)
                 match_id = match.id
                 is_match = True
+                created = True
             except IntegrityError:
                 # Concurrent mutual like already created the match — fetch it
                 db.rollback()
@@ -96,16 +108,23 @@ def like_user(
             match_id = existing_match.id
             is_match = True
 
+    record_activity(db, current_user)
     db.commit()
+    if created:
+        enqueue("score_match", match_id=match_id, idempotency_key=f"score_match:{match_id}")
     return LikeResponse(liked_user_id=request.liked_user_id, is_match=is_match, match_id=match_id)
 
 
 @router.post("/pass", response_model=PassResponse)
-def pass_user(
+async def pass_user(
     request: PassRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db=Depends(get_async_db),
 ):
+    return await db.run_sync(_pass_user, current_user, request)
+
+
+def _pass_user(db: Session, current_user: User, request: PassRequest) -> PassResponse:
     if request.passed_user_id == current_user.id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot pass yourself")
 
@@ -126,6 +145,7 @@ def pass_user(
     like = Like(liker_id=current_user.id, liked_id=request.passed_user_id, is_pass=True)
     db.add(like)
     try:
+        record_activity(db, current_user)  # may flush the like
         db.commit()
     except IntegrityError:
         db.rollback()
@@ -136,11 +156,18 @@ def pass_user(
 
 @router.get("", response_model=MatchListResponse)
 def list_matches(
+    request: Request,
     limit: int = Query(20, ge=1, le=50),
     offset: int = Query(0, ge=0),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    view: DiscoverView = Query("full", description="`card`: id, name, birth date, primary photo and score only"),
+    current_user: User = Depends(get_current_reader),
+    db: Session = Depends(get_read_db),
 ):
+    # The link window: the photo links in the body expire with it
+    etag = user_etag("matches", current_user.id, current_user.matches_version, link_window())
+    if cached := not_modified(request, etag):
+        return cached
+
     query = db.query(Match).filter(
         (Match.user1_id == current_user.id) | (Match.user2_id == current_user.id)
     ).order_by(Match.created_at.desc())
@@ -148,21 +175,24 @@ def list_matches(
     total = query.count()
     matches_page = query.offset(offset).limit(limit).all()
 
-    # Batch-load all other users with photos/profiles in one query to avoid N+1
+    # Batch-load the other users in one query; cards come from the cache,
+    # which loads photos/profiles only for users whose card changed.  The
+    # card view never loads profiles, and of the photos only the primary one.
+    if view == "card":
+        load_cards, build_other_user = card_summaries, build_summary_response
+    else:
+        load_cards, build_other_user = public_cards, build_card_response
     other_ids = [
         m.user2_id if m.user1_id == current_user.id else m.user1_id
         for m in matches_page
     ]
     if other_ids:
-        others = (
-            db.query(User)
-            .options(joinedload(User.photos), joinedload(User.profile))
-            .filter(User.id.in_(other_ids))
-            .all()
-        )
+        others = db.query(User).filter(User.id.in_(other_ids)).all()
         others_by_id = {u.id: u for u in others}
+        cards = load_cards(db, others)
     else:
         others_by_id = {}
+        cards = {}
 
     results = []
     for m in matches_page:
@@ -170,14 +200,17 @@ def list_matches(
         other_user = others_by_id.get(other_id)
         if other_user:
             score = m.compatibility_score or 0.0
-            results.append(MatchResponse(
+            results.append(MatchResponse.model_construct(
                 id=m.id,
-                other_user=build_discover_user(other_user, score),
+                other_user=build_other_user(cards[other_id], score),
                 compatibility_score=m.compatibility_score,
                 created_at=m.created_at,
             ))
 
-    return MatchListResponse(matches=results, total=total, limit=limit, offset=offset)
+    return PrebuiltResponse(
+        MatchListResponse.model_construct(matches=results, total=total, limit=limit, offset=offset),
+        headers=validator_headers(etag),
+    )
 
 
 @router.delete("/{match_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -203,4 +236,5 @@ def unmatch(
     ).update({Like.is_pass: True}, synchronize_session="fetch")
 
     db.delete(match)
+    bump_matches_version(db, match.user1_id, match.user2_id)
     db.commit()
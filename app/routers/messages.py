@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db, get_current_user, check_block
+from app.dependencies import get_async_db, get_async_read_db, get_current_reader_async, get_current_user_async, check_block, rate_limit_user
 from app.models.user import User
 from app.models.match import Match
 from app.models.message import DirectMessage
 from app.schemas.message import SendMessageRequest, MessageResponse
+from app.services.account_service import record_activity
 from app.utils.rate_limiter import message_rate_limiter
 
 router = APIRouter()
@@ -23,13 +24,17 @@ def _validate_match_membership(db: Session, match_id: str, user_id: str) -> Matc
 
 
 @router.get("/{match_id}/messages", response_model=list[MessageResponse])
-def get_messages(
+async def get_messages(
     match_id: str,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_reader_async),
+    db=Depends(get_async_read_db),
 ):
+    return await db.run_sync(_get_messages, current_user, match_id, limit, offset)
+
+
+def _get_messages(db: Session, current_user: User, match_id: str, limit: int, offset: int) -> list[MessageResponse]:
     match = _validate_match_membership(db, match_id, current_user.id)
 
     other_id = match.user2_id if match.user1_id == current_user.id else match.user1_id
@@ -46,14 +51,22 @@ def get_messages(
     return [MessageResponse.model_validate(m) for m in messages]
 
 
-@router.post("/{match_id}/messages", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
-def send_message(
+@router.post(
+    "/{match_id}/messages",
+    response_model=MessageResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit_user(message_rate_limiter, get_current_user_async))],
+)
+async def send_message(
     match_id: str,
     request: SendMessageRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db=Depends(get_async_db),
 ):
-    message_rate_limiter.check(current_user.id)
+    return await db.run_sync(_send_message, current_user, match_id, request)
+
+
+def _send_message(db: Session, current_user: User, match_id: str, request: SendMessageRequest) -> MessageResponse:
     match = _validate_match_membership(db, match_id, current_user.id)
 
     # Check block between the two users in the match
@@ -66,6 +79,7 @@ def send_message(
         content=request.content,
     )
     db.add(message)
+    record_activity(db, current_user)
     db.commit()
     db.refresh(message)
 
@@ -0,0 +1,213 @@
+import json
+import mimetypes
+import os
+import re
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse, RedirectResponse, Response, StreamingResponse
+from sqlalchemy import and_, exists, false, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.dependencies import get_read_db, get_optional_reader
+from app.models.block import BlockedUser
+from app.models.user import User, UserPhoto
+from app.storage import get_storage
+from app.utils.conditional import etag_matches
+from app.utils.images import VARIANTS
+from app.utils.signed_urls import photo_link_query, verify_photo_link
+
+router = APIRouter()
+# Mounted at the root, where the /uploads static files used to be
+legacy_router = APIRouter()
+
+_RANGE_CHUNK_SIZE = 64 * 1024
+
+
+def _not_modified(request: Request, etag: str, last_modified) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Takes precedence over If-Modified-Since when both are sent
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+class _RangeNotSatisfiable(Exception):
+    pass
+
+
+def _byte_range(range_header: str, size: int) -> tuple[int, int] | None:
+    """First and last byte of a single ``bytes=`` range, or None to ignore the header.
+
+    Raises ``_RangeNotSatisfiable`` for a range starting past the end of the file.
+    """
+    unit, _, spec = range_header.partition("=")
+    start, sep, end = spec.strip().partition("-")
+    if unit.strip() != "bytes" or not sep or "," in spec:
+        return None  # multipart ranges are not worth it for photos
+    try:
+        if start:
+            first = int(start)
+            last = int(end) if end else size - 1
+            if end and last < first:
+                return None
+            last = min(last, size - 1)
+        else:
+            suffix = int(end)  # "bytes=-N": the last N bytes
+            if suffix == 0:
+                raise _RangeNotSatisfiable
+            first, last = max(size - suffix, 0), size - 1
+    except ValueError:
+        return None
+    if first >= size:
+        raise _RangeNotSatisfiable
+    return first, last
+
+
+def _file_slice(path, first: int, last: int):
+    with open(path, "rb") as f:
+        f.seek(first)
+        remaining = last - first + 1
+        while remaining:
+            chunk = f.read(min(_RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+@router.get("/{photo_id}/{variant}")
+def get_photo(
+    photo_id: str,
+    variant: str,
+    request: Request,
+    exp: int | None = None,
+    sig: str | None = None,
+    current_user: User | None = Depends(get_optional_reader),
+    db: Session = Depends(get_read_db),
+):
+    """Serve a photo through a signed link or to a signed-in user who may see it.
+
+    The links in API responses are signed (``app.utils.signed_urls``) so
+    image tags work without an ``Authorization`` header; a bearer token works
+    too.  Photos of deleted or deactivated accounts answer 404, and so do
+    photos of users on either side of a block with the requester.  Files are
+    immutable per photo and variant, so clients cache them for
+    ``PHOTO_CACHE_MAX_AGE`` and revalidate with the ETag or ``Last-Modified``.
+    """
+    if current_user is None and not verify_photo_link(photo_id, variant, exp, sig):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired photo link",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if variant not in VARIANTS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Photo not found")
+
+    if current_user is None:
+        blocked = false().label("blocked")
+    else:
+        blocked = exists().where(or_(
+            and_(BlockedUser.blocker_id == current_user.id, BlockedUser.blocked_id == UserPhoto.user_id),
+            and_(BlockedUser.blocker_id == UserPhoto.user_id, BlockedUser.blocked_id == current_user.id),
+        )).label("blocked")
+    row = (
+        db.query(UserPhoto.user_id, UserPhoto.file_path, UserPhoto.variants, UserPhoto.content_hash,
+                 UserPhoto.created_at, User.is_active, blocked)
+        .join(User, User.id == UserPhoto.user_id)
+        .filter(UserPhoto.id == photo_id)
+        .first()
+    )
+    is_owner = row is not None and current_user is not None and row.user_id == current_user.id
+    if row is None or (not is_owner and (not row.is_active or row.blocked)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Photo not found")
+
+    key = json.loads(row.variants or "{}").get(variant, row.file_path)
+    etag = f'"{row.content_hash or photo_id}_{variant}"'
+    last_modified = row.created_at.replace(tzinfo=timezone.utc)
+    headers = {
+        "Cache-Control": f"private, max-age={settings.PHOTO_CACHE_MAX_AGE}",
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    storage = get_storage()
+    path = storage.local_path(key)
+    if path is None:
+        # Remote storage: hand the client a (pre-signed) URL to fetch the bytes from
+        return RedirectResponse(storage.url(key), status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+    media_type = mimetypes.guess_type(key)[0]
+
+    if settings.PHOTO_SENDFILE_HEADER:
+        # The front proxy sends the file itself with sendfile(2)
+        if settings.PHOTO_SENDFILE_HEADER == "X-Accel-Redirect":
+            headers["X-Accel-Redirect"] = f"{settings.PHOTO_SENDFILE_PREFIX.rstrip('/')}/{key}"
+        else:
+            headers[settings.PHOTO_SENDFILE_HEADER] = str(path)
+        return Response(headers=headers, media_type=media_type)
+
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Photo not found")
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = _byte_range(range_header, stat_result.st_size)
+        except _RangeNotSatisfiable:
+            headers["Content-Range"] = f"bytes */{stat_result.st_size}"
+            return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+        if byte_range is not None:
+            first, last = byte_range
+            headers["Content-Range"] = f"bytes {first}-{last}/{stat_result.st_size}"
+            headers["Content-Length"] = str(last - first + 1)
+            return StreamingResponse(
+                _file_slice(path, first, last),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                headers=headers,
+                media_type=media_type,
+            )
+    return FileResponse(path, headers=headers, stat_result=stat_result, media_type=media_type)
+
+
+_BLOB_KEY = re.compile(r"blobs/[0-9a-f]{2}/(?P<hash>[0-9a-f]{64})_(?P<variant>\w+)\.webp")
+
+
+@legacy_router.get("/uploads/{key:path}", include_in_schema=False)
+def legacy_upload(key: str, db: Session = Depends(get_read_db)):
+    """Redirect an old ``/uploads/<key>`` link to a signed link for the same photo.
+
+    For app versions that still build photo URLs from ``file_path``; turned
+    off with ``PHOTO_LEGACY_UPLOADS``.  Like the static mount it replaces, it
+    needs no token, but it only resolves photos of active accounts.
+    """
+    if not settings.PHOTO_LEGACY_UPLOADS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    query = db.query(UserPhoto.id).join(User, User.id == UserPhoto.user_id).filter(User.is_active.is_(True))
+    match = _BLOB_KEY.fullmatch(key)
+    if match and match["variant"] in VARIANTS:
+        variant = match["variant"]
+        row = query.filter(UserPhoto.content_hash == match["hash"]).first()
+    else:
+        variant = "full"
+        row = query.filter(UserPhoto.file_path == key).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Photo not found")
+    return RedirectResponse(
+        f"/api/v1/photos/{row.id}/{variant}?{photo_link_query(row.id, variant)}",
+        status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+    )
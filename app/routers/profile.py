@@ -1,17 +1,22 @@
 import json
-import uuid
 from datetime import date
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db, get_current_user
+from app.dependencies import get_db, get_current_user, get_current_reader
+from app.jobs import enqueue
 from app.models.user import User, UserPhoto
 from app.models.profile import UserProfile
 from app.schemas.user import ProfileSetupRequest, UserUpdate, ProfileUpdate, UserResponse, PhotoResponse, ProfileDataResponse
-from app.utils.profile_builder import build_user_response, build_profile_data
+from app.services import card_service, photo_service
+from app.utils.conditional import not_modified, user_etag, validator_headers
+from app.utils.images import ImageDecodeError, ImageProcessingUnavailable
+from app.utils.profile_builder import build_photo, build_user_response, build_profile_data
+from app.utils.signed_urls import link_window
+from app.utils.uploads import ReceivedFile, receive_file
 
 router = APIRouter()
 
@@ -19,9 +24,25 @@ MAX_PHOTOS = 6
 MAX_PHOTO_SIZE = 5 * 1024 * 1024  # 5 MB
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
 
+# Magic bytes of accepted formats; WebP is a RIFF container checked separately
+IMAGE_SIGNATURES = (
+    b"\xff\xd8\xff",       # JPEG
+    b"\x89PNG\r\n\x1a\n",  # PNG
+    b"GIF87a",
+    b"GIF89a",
+)
+
 
 @router.get("/me", response_model=UserResponse)
-def get_my_profile(current_user: User = Depends(get_current_user)):
+def get_my_profile(request: Request, response: Response, current_user: User = Depends(get_current_reader)):
+    # updated_at covers account fields that do not show on the public card;
+    # the link window, the expiry of the photo links in the body
+    etag = user_etag(
+        "me", current_user.id, current_user.profile_version, current_user.updated_at.timestamp(), link_window(),
+    )
+    if cached := not_modified(request, etag):
+        return cached
+    response.headers.update(validator_headers(etag))
     return build_user_response(current_user)
 
 
@@ -76,6 +97,7 @@ def setup_profile(
     current_user.hidden_fields = json.dumps(data.hidden_fields)
     current_user.profile_setup_complete = True
 
+    card_service.bump_profile_version(db, current_user.id)
     db.commit()
     db.refresh(current_user)
     return build_user_response(current_user)
@@ -177,6 +199,7 @@ def update_my_profile(
             detail="height_pref_min must not exceed height_pref_max",
         )
 
+    card_service.bump_profile_version(db, current_user.id)
     db.commit()
     db.refresh(current_user)
     return build_user_response(current_user)
@@ -212,6 +235,7 @@ def update_my_profile_details(
     filled = sum(1 for f in fields if getattr(profile, f, None) is not None)
     profile.profile_completeness = filled / len(fields)
 
+    card_service.bump_profile_version(db, current_user.id)
     db.commit()
     db.refresh(profile)
     # Refresh the user relationship so build_profile_data sees the updated profile
@@ -219,61 +243,86 @@ def update_my_profile_details(
     return build_profile_data(current_user)
 
 
-@router.post("/me/photos", response_model=PhotoResponse, status_code=status.HTTP_201_CREATED)
-def upload_photo(
-    file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    photo_count = db.query(UserPhoto).filter(UserPhoto.user_id == current_user.id).count()
-    if photo_count >= MAX_PHOTOS:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Maximum {MAX_PHOTOS} photos allowed")
+def _is_image_header(head: bytes) -> bool:
+    if any(head.startswith(sig) for sig in IMAGE_SIGNATURES):
+        return True
+    # WebP: RIFF container with WEBP chunk at offset 8
+    return head[:4] == b"RIFF" and head[8:12] == b"WEBP"
 
-    # Validate content type
-    if not file.content_type or not file.content_type.startswith("image/"):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be an image")
 
-    # Validate extension
-    ext = Path(file.filename).suffix.lower() if file.filename else ""
+def _accept_photo(filename: str, content_type: str) -> Path:
+    """Staging path for an upload whose part headers name an image; raises 400 otherwise."""
+    if not content_type.startswith("image/"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be an image")
+    ext = Path(filename).suffix.lower()
     if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be an image")
+    # Staged under a random name, then stored by content hash
+    return photo_service.staging_path(ext)
 
-    # Read in chunks and enforce size limit early
-    chunks = []
-    bytes_read = 0
-    while True:
-        chunk = file.file.read(1024 * 1024)  # 1 MB chunks
-        if not chunk:
-            break
-        bytes_read += len(chunk)
-        if bytes_read > MAX_PHOTO_SIZE:
-            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File exceeds 5 MB limit")
-        chunks.append(chunk)
-    content = b"".join(chunks)
-
-    # Verify actual image content via magic bytes
-    IMAGE_SIGNATURES = {
-        b"\xff\xd8\xff": ".jpg",       # JPEG
-        b"\x89PNG\r\n\x1a\n": ".png",  # PNG
-        b"GIF87a": ".gif",             # GIF87a
-        b"GIF89a": ".gif",             # GIF89a
-    }
-    is_valid_image = any(content.startswith(sig) for sig in IMAGE_SIGNATURES)
-    # WebP: RIFF container with WEBP chunk at offset 8
-    if not is_valid_image and content[:4] == b"RIFF" and content[8:12] == b"WEBP":
-        is_valid_image = True
-    if not is_valid_image:
+
+def _check_image_head(head: bytes) -> None:
+    if not _is_image_header(head):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File content is not a valid image")
 
-    # Sanitize filename
-    filename = f"{uuid.uuid4().hex}{ext}"
-    user_dir = Path("uploads") / current_user.id
-    user_dir.mkdir(parents=True, exist_ok=True)
-    file_path = user_dir / filename
 
-    file_path.write_bytes(content)
+def _photo_count(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> int:
+    """The user's photo count, checked against MAX_PHOTOS before the upload body is read."""
+    photo_count = db.query(UserPhoto).filter(UserPhoto.user_id == current_user.id).count()
+    if photo_count >= MAX_PHOTOS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Maximum {MAX_PHOTOS} photos allowed")
+    return photo_count
 
-    relative_path = f"{current_user.id}/{filename}"
+
+async def _receive_photo(request: Request) -> ReceivedFile:
+    """Stream the ``file`` field to the staging directory, checking type, magic bytes and size as it arrives."""
+    return await receive_file(
+        request, "file",
+        max_size=MAX_PHOTO_SIZE,
+        too_large="File exceeds 5 MB limit",
+        accept=_accept_photo,
+        check_head=_check_image_head,
+    )
+
+
+# The body is read by _receive_photo, not declared as a parameter, so describe it here
+_PHOTO_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                },
+            },
+        },
+    },
+}
+
+
+@router.post(
+    "/me/photos", response_model=PhotoResponse, status_code=status.HTTP_201_CREATED,
+    openapi_extra=_PHOTO_UPLOAD_BODY,
+)
+def upload_photo(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    photo_count: int = Depends(_photo_count),
+    upload: ReceivedFile = Depends(_receive_photo),
+):
+    # Resized, metadata-free WebP variants replace the original upload
+    try:
+        blob = photo_service.store_upload(db, upload.path, upload.sha256, upload.path.suffix)
+    except ImageDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File content is not a valid image")
+    except ImageProcessingUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Photo processing is busy, please try again",
+            headers={"Retry-After": "5"},
+        )
     is_primary = photo_count == 0
 
     max_index = db.query(func.max(UserPhoto.order_index)).filter(
@@ -283,14 +332,17 @@ def upload_photo(
 
     photo = UserPhoto(
         user_id=current_user.id,
-        file_path=relative_path,
+        file_path=blob.file_path,
+        variants=blob.variants,
+        content_hash=upload.sha256,
         is_primary=is_primary,
         order_index=next_index,
     )
     db.add(photo)
+    card_service.bump_profile_version(db, current_user.id)
     db.commit()
     db.refresh(photo)
-    return PhotoResponse.model_validate(photo)
+    return build_photo(photo)
 
 
 @router.delete("/me/photos/{photo_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -306,11 +358,13 @@ def delete_photo(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Photo not found")
 
     was_primary = photo.is_primary
-
-    uploads_root = Path("uploads").resolve()
-    file_path = (uploads_root / photo.file_path).resolve()
-    if file_path.is_relative_to(uploads_root) and file_path.exists():
-        file_path.unlink()
+    digest = photo.content_hash
+    if digest is None:
+        # Uploaded before content-addressed storage: the files are the photo's own
+        file_paths = {photo.file_path, *json.loads(photo.variants or "{}").values()}
+    else:
+        file_paths = set()
+        unreferenced = photo_service.release_blob(db, digest)
 
     db.delete(photo)
 
@@ -325,4 +379,9 @@ def delete_photo(
         if next_photo:
             next_photo.is_primary = True
 
+    card_service.bump_profile_version(db, current_user.id)
     db.commit()
+    for file_path in sorted(file_paths):
+        enqueue("remove_upload", file_path=file_path, idempotency_key=f"remove_upload:{file_path}")
+    if digest is not None and unreferenced:
+        enqueue("collect_blob", digest=digest, delay=photo_service.COLLECT_DELAY)
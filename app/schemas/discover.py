@@ -1,4 +1,6 @@
 from datetime import date, datetime
+from typing import Literal
+
 from pydantic import BaseModel
 
 from app.schemas.user import PhotoResponse, ProfileDataResponse
@@ -34,8 +36,23 @@ class DiscoverUserResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+# ``view=`` of discover and the match list: the whole profile, or a card
+DiscoverView = Literal["full", "card"]
+
+
+class DiscoverCardResponse(BaseModel):
+    """``view=card``: enough for a swipe card or a match-list row."""
+    id: str
+    display_name: str | None = None
+    date_of_birth: date | None = None
+    distance_km: float | None = None
+    primary_photo: PhotoResponse | None = None
+    compatibility_score: float = 0.0
+
+
 class DiscoverResponse(BaseModel):
-    users: list[DiscoverUserResponse]
+    users: list[DiscoverUserResponse] | list[DiscoverCardResponse]
     total: int
+    total_exact: bool = True  # false: ``total`` is estimated (from a sample, or a lagging snapshot)
     limit: int
     offset: int
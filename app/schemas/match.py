@@ -1,7 +1,7 @@
 from datetime import datetime
 from pydantic import BaseModel
 
-from app.schemas.discover import DiscoverUserResponse
+from app.schemas.discover import DiscoverCardResponse, DiscoverUserResponse
 
 
 class LikeRequest(BaseModel):
@@ -24,7 +24,7 @@ class PassResponse(BaseModel):
 
 class MatchResponse(BaseModel):
     id: str
-    other_user: DiscoverUserResponse
+    other_user: DiscoverUserResponse | DiscoverCardResponse
     compatibility_score: float | None = None
     created_at: datetime
 
@@ -112,12 +112,13 @@ class ProfileUpdate(BaseModel):
 class PhotoResponse(BaseModel):
     id: str
     file_path: str
+    url: str  # full-size variant (the original for photos uploaded before variants existed)
+    medium_url: str
+    thumbnail_url: str  # ~320px, for cards and lists
     is_primary: bool
     order_index: int
     created_at: datetime
 
-    model_config = {"from_attributes": True}
-
 
 class ProfileDataResponse(BaseModel):
     bio: str | None = None
@@ -0,0 +1,131 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.config import settings
+
+from app.models.user import User, UserPhoto
+from app.models.profile import UserProfile
+from app.models.match import Like, Match
+from app.models.message import DirectMessage
+from app.models.block import BlockedUser
+from app.models.conversation import ConversationMessage, ConversationState
+from app.services.photo_service import release_user_blobs
+from app.services.snapshot_service import note_user_changed
+from app.services.version_service import bump_match_partners
+from app.storage import get_storage
+
+# Accounts with more direct messages than this are purged in the background,
+# one committed chunk at a time, so neither the request nor any single
+# transaction grows with the size of the history.
+DELETE_CHUNK_SIZE = 5000
+
+
+def _match_ids(user_id: str):
+    return select(Match.id).where(or_(Match.user1_id == user_id, Match.user2_id == user_id))
+
+
+def count_messages(db: Session, user_id: str) -> int:
+    return db.scalar(
+        select(func.count()).select_from(DirectMessage).where(DirectMessage.match_id.in_(_match_ids(user_id)))
+    )
+
+
+def delete_messages_chunk(db: Session, user_id: str, chunk_size: int) -> int:
+    """Delete up to ``chunk_size`` messages from the user's matches; returns the number deleted."""
+    chunk = (
+        select(DirectMessage.id)
+        .where(DirectMessage.match_id.in_(_match_ids(user_id)))
+        .limit(chunk_size)
+    )
+    result = db.execute(
+        delete(DirectMessage).where(DirectMessage.id.in_(chunk)),
+        execution_options={"synchronize_session": False},
+    )
+    return result.rowcount
+
+
+def delete_user_rows(db: Session, user_id: str) -> list[str]:
+    """Delete the user and everything referencing them with set-based DELETEs.
+
+    Nothing is loaded into the session first (no ``synchronize_session``
+    fetch), so the cost is one statement per table.  Dependents go first to
+    satisfy the foreign keys.  The caller commits, then collects the returned
+    photo blobs, which may now be unreferenced.
+    """
+    released = release_user_blobs(db, user_id)
+    bump_match_partners(db, user_id)
+    note_user_changed(db, user_id)
+    statements = [
+        delete(DirectMessage).where(DirectMessage.match_id.in_(_match_ids(user_id))),
+        delete(Match).where(or_(Match.user1_id == user_id, Match.user2_id == user_id)),
+        delete(Like).where(or_(Like.liker_id == user_id, Like.liked_id == user_id)),
+        delete(BlockedUser).where(or_(BlockedUser.blocker_id == user_id, BlockedUser.blocked_id == user_id)),
+        delete(ConversationMessage).where(ConversationMessage.user_id == user_id),
+        delete(ConversationState).where(ConversationState.user_id == user_id),
+        delete(UserPhoto).where(UserPhoto.user_id == user_id),
+        delete(UserProfile).where(UserProfile.user_id == user_id),
+        delete(User).where(User.id == user_id),
+    ]
+    for statement in statements:
+        db.execute(statement, execution_options={"synchronize_session": False})
+    return released
+
+
+def record_activity(db: Session, user: User) -> None:
+    """Stamp ``user.last_active_at`` in the caller's transaction, at most once per ``ACTIVITY_RESOLUTION_SECONDS``.
+
+    The stamp is a discover ranking signal, so minute precision is plenty and
+    hot paths (swipes, messages) do not rewrite the user row every time.
+    ``updated_at`` is left alone: activity is not a profile change.
+    """
+    now = datetime.now(timezone.utc)
+    last = user.last_active_at
+    if last is not None:
+        last = last if last.tzinfo else last.replace(tzinfo=timezone.utc)
+        if (now - last).total_seconds() < settings.ACTIVITY_RESOLUTION_SECONDS:
+            return
+    db.execute(
+        update(User).where(User.id == user.id).values(last_active_at=now, updated_at=User.updated_at),
+        execution_options={"synchronize_session": False},
+    )
+    set_committed_value(user, "last_active_at", now)
+    note_user_changed(db, user.id)
+
+
+def revoke_account(db: Session, user: User) -> None:
+    """Lock the account out immediately while a background purge is pending.
+
+    ``purge_requested_at`` marks the purge as owed in the database itself, so
+    it is re-enqueued after a restart that lost the job (``pending_purges``).
+    """
+    now = datetime.now(timezone.utc)
+    user.is_active = False
+    user.token_invalidated_at = now
+    user.purge_requested_at = now
+    note_user_changed(db, user.id)
+
+
+def pending_purges(db: Session) -> list[str]:
+    """Ids of revoked accounts whose rows have not been purged yet."""
+    return list(db.scalars(select(User.id).where(User.purge_requested_at.is_not(None))))
+
+
+def purge_account(db: Session, user_id: str, chunk_size: int | None = None) -> list[str]:
+    """Delete messages in chunks, each in its own transaction, then the remaining rows.
+
+    Returns the photo blobs released, as ``delete_user_rows`` does.
+    """
+    chunk_size = chunk_size or DELETE_CHUNK_SIZE
+    while delete_messages_chunk(db, user_id, chunk_size) >= chunk_size:
+        db.commit()
+    released = delete_user_rows(db, user_id)
+    db.commit()
+    return released
+
+
+def remove_user_uploads(user_id: str) -> None:
+    """Remove photos stored per user, from before content-addressed storage."""
+    get_storage().delete_prefix(f"{user_id}/")
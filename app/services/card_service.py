@@ -0,0 +1,141 @@
+"""Cached public profile cards for discover and the match list.
+
+A card is everything a ``DiscoverUserResponse`` shows about a user that does
+not depend on who is looking: hidden fields blanked, JSON columns parsed,
+photos sorted.  Cards are cached per process and keyed by
+``User.profile_version``, which every write to card data bumps in the same
+transaction, so a stale card is never served and no invalidation message is
+needed between workers.  On a hit the user's photos are not even loaded.
+
+Photos are cached as storage keys, not URLs: pre-signed S3 URLs and signed
+API links expire, so they are resolved again for every response.
+"""
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import inspect, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.config import settings
+from app.models.profile import UserProfile
+from app.models.user import User, UserPhoto
+from app.services.snapshot_service import note_user_changed
+from app.services.version_service import bump_match_partners
+from app.utils.profile_builder import build_card_summary, build_public_card, summarize_card
+
+
+def bump_profile_version(db: Session, user_id: str) -> None:
+    """Mark ``user_id``'s card as changed; call in the transaction that changes it."""
+    db.execute(
+        update(User).where(User.id == user_id).values(profile_version=User.profile_version + 1),
+        execution_options={"synchronize_session": False},
+    )
+    # The card is shown in the match lists of everyone matched with the user
+    bump_match_partners(db, user_id)
+    note_user_changed(db, user_id)
+
+
+class ProfileCardCache:
+    """LRU of ``user_id -> (profile_version, card)``."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._cards: OrderedDict[str, tuple[int, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str, version: int) -> dict | None:
+        with self._lock:
+            entry = self._cards.get(user_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._cards.move_to_end(user_id)
+            return entry[1]
+
+    def put(self, user_id: str, version: int, card: dict) -> None:
+        with self._lock:
+            self._cards[user_id] = (version, card)
+            self._cards.move_to_end(user_id)
+            while len(self._cards) > self.max_size:
+                self._cards.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cards.clear()
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+
+card_cache = ProfileCardCache(settings.PROFILE_CARD_CACHE_SIZE)
+
+
+def _profile_unloaded(user: User) -> bool:
+    if "profile" in inspect(user).unloaded:
+        return True
+    # Loaded for scoring with only some columns (see discover)
+    return user.profile is not None and bool(inspect(user.profile).unloaded)
+
+
+def _load_card_relations(db: Session, users: list[User]) -> None:
+    """Batch-load photos and profiles that are not loaded yet: two queries, not two per user."""
+    need_photos = [u.id for u in users if "photos" in inspect(u).unloaded]
+    need_profile = [u.id for u in users if _profile_unloaded(u)]
+    if need_photos:
+        photos: dict[str, list[UserPhoto]] = {uid: [] for uid in need_photos}
+        for photo in db.query(UserPhoto).filter(UserPhoto.user_id.in_(need_photos)):
+            photos[photo.user_id].append(photo)
+    if need_profile:
+        profiles = {p.user_id: p for p in db.query(UserProfile).filter(UserProfile.user_id.in_(need_profile))}
+    for user in users:
+        if user.id in need_photos:
+            set_committed_value(user, "photos", photos[user.id])
+        if user.id in need_profile and "profile" in inspect(user).unloaded:
+            set_committed_value(user, "profile", profiles.get(user.id))
+
+
+def public_cards(db: Session, users: list[User]) -> dict[str, dict]:
+    """Cards for ``users`` by id, built only where the cached one is missing or stale."""
+    cards = {}
+    misses = []
+    for user in users:
+        card = card_cache.get(user.id, user.profile_version)
+        if card is None:
+            misses.append(user)
+        else:
+            cards[user.id] = card
+    if misses:
+        _load_card_relations(db, misses)
+        for user in misses:
+            card = build_public_card(user)
+            card_cache.put(user.id, user.profile_version, card)
+            cards[user.id] = card
+    return cards
+
+
+def card_summaries(db: Session, users: list[User]) -> dict[str, dict]:
+    """``view=card`` fields for ``users`` by id.
+
+    Taken from the cached public card when it is fresh; otherwise built from
+    the user row and the primary photo alone, so profiles and the other
+    photos are never loaded.  Those partial results are not cached.
+    """
+    summaries = {}
+    misses = []
+    for user in users:
+        card = card_cache.get(user.id, user.profile_version)
+        if card is None:
+            misses.append(user)
+        else:
+            summaries[user.id] = summarize_card(card)
+    if misses:
+        primaries = {
+            p.user_id: p
+            for p in db.query(UserPhoto).filter(
+                UserPhoto.user_id.in_([u.id for u in misses]),
+                UserPhoto.is_primary == True,  # noqa: E712
+            )
+        }
+        for user in misses:
+            summaries[user.id] = build_card_summary(user, primaries.get(user.id))
+    return summaries
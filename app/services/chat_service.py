@@ -10,6 +10,9 @@ from app.config import settings
 from app.models.conversation import ConversationMessage, ConversationState
 from app.models.profile import UserProfile
 from app.models.user import User
+from app.services.card_service import bump_profile_version
+from app.services.snapshot_service import note_user_changed
+from app.services.version_service import bump_chat_version
 
 logger = logging.getLogger(__name__)
 
@@ -263,6 +266,7 @@ def _apply_profile_updates(db: Session, user_id: str, updates: dict) -> None:
               "communication_style", "deal_breakers", "life_goals", "dating_style", "conversation_highlights"]
     filled = sum(1 for f in fields if getattr(profile, f, None) is not None)
     profile.profile_completeness = filled / len(fields)
+    bump_profile_version(db, user_id)
 
     db.commit()
 
@@ -285,7 +289,9 @@ def _advance_topic(db: Session, state: ConversationState, ai_response: str) -> N
 
     if "[ONBOARDING_COMPLETE]" in ai_response:
         state.onboarding_status = ONBOARDING_COMPLETED
+        note_user_changed(db, state.user_id)
 
+    bump_chat_version(db, state.user_id)
     db.commit()
 
 
@@ -344,6 +350,7 @@ def process_message(db: Session, user_id: str, user_message: str, state: Convers
         topic=state.current_topic,
     )
     db.add(user_msg)
+    bump_chat_version(db, user_id)
     db.commit()
 
     # Build messages for OpenAI (cap history to avoid unbounded growth)
@@ -402,6 +409,7 @@ def process_message(db: Session, user_id: str, user_message: str, state: Convers
         topic=response_topic,
     )
     db.add(assistant_msg)
+    bump_chat_version(db, user_id)
     db.commit()
 
     return clean_content
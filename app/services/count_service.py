@@ -0,0 +1,61 @@
+"""Discover totals beyond the over-fetch window.
+
+Discover filters and scores only a newest-first window of candidates.  When
+the window is not full it holds every candidate, and the total is exact for
+free.  When it is full, discover counts the candidates matching the SQL-level
+filters with one indexed COUNT.  It then scales that count by the share of
+the window that passed the Python-level filters (gender preferences, exact
+distance, height, religion); the window is the sample.  The window holds the
+newest users rather than a random sample, so such totals are flagged as
+estimates (``total_exact: false``).
+
+Counted totals are cached per viewer for ``DISCOVER_COUNT_TTL_SECONDS``, keyed
+by the viewer's ``profile_version``, so a change of preferences recounts at
+once while paging and swiping do not.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from app.config import settings
+
+
+def estimate_total(population: int, sampled: int, passed: int) -> int:
+    """Candidates past every filter among ``population``, if ``passed`` of ``sampled`` of them were."""
+    if not sampled:
+        return 0
+    return max(passed, min(population, round(population * passed / sampled)))
+
+
+class DiscoverCountCache:
+    """LRU of ``user_id -> (expires, profile_version, total, exact)``."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._counts: OrderedDict[str, tuple[float, int, int, bool]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str, version: int) -> tuple[int, bool] | None:
+        with self._lock:
+            entry = self._counts.get(user_id)
+            if entry is None or entry[1] != version or entry[0] <= time.monotonic():
+                return None
+            self._counts.move_to_end(user_id)
+            return entry[2], entry[3]
+
+    def put(self, user_id: str, version: int, total: int, exact: bool) -> None:
+        with self._lock:
+            self._counts[user_id] = (time.monotonic() + settings.DISCOVER_COUNT_TTL_SECONDS, version, total, exact)
+            self._counts.move_to_end(user_id)
+            while len(self._counts) > self.max_size:
+                self._counts.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+count_cache = DiscoverCountCache(settings.DISCOVER_COUNT_CACHE_SIZE)
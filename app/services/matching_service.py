@@ -49,19 +49,29 @@ def jaccard_similarity(set_a: set, set_b: set) -> float:
     return len(intersection) / len(union) if union else 0.0
 
 
-def calculate_compatibility(profile1: UserProfile, profile2: UserProfile) -> float:
-    if not profile1 or not profile2:
-        return 0.0
+def dimension_tokens(fields: dict[str, str | None]) -> dict[str, set[str]]:
+    """Token sets of the scored dimensions in ``fields`` (raw column values by dimension), empty ones left out."""
+    tokens = {}
+    for dimension in DIMENSION_WEIGHTS:
+        parsed = _parse_field(fields.get(dimension))
+        if parsed:
+            tokens[dimension] = parsed
+    return tokens
+
+
+def profile_tokens(profile: UserProfile | None) -> dict[str, set[str]]:
+    if not profile:
+        return {}
+    return dimension_tokens({dimension: getattr(profile, dimension, None) for dimension in DIMENSION_WEIGHTS})
 
-    scores = {}
-    for dimension, weight in DIMENSION_WEIGHTS.items():
-        val1 = getattr(profile1, dimension, None)
-        val2 = getattr(profile2, dimension, None)
-        set1 = _parse_field(val1)
-        set2 = _parse_field(val2)
-        if set1 and set2:
-            scores[dimension] = jaccard_similarity(set1, set2)
 
+def compatibility_from_tokens(tokens1: dict[str, set[str]], tokens2: dict[str, set[str]]) -> float:
+    """``calculate_compatibility`` on pre-parsed tokens, so a profile scored many times is parsed once."""
+    scores = {
+        dimension: jaccard_similarity(tokens1[dimension], tokens2[dimension])
+        for dimension in DIMENSION_WEIGHTS
+        if dimension in tokens1 and dimension in tokens2
+    }
     if not scores:
         return 0.0
 
@@ -71,3 +81,9 @@ def calculate_compatibility(profile1: UserProfile, profile2: UserProfile) -> flo
 
     weighted_sum = sum(scores[k] * available_weights[k] for k in scores)
     return weighted_sum / total_weight if total_weight > 0 else 0.0
+
+
+def calculate_compatibility(profile1: UserProfile, profile2: UserProfile) -> float:
+    if not profile1 or not profile2:
+        return 0.0
+    return compatibility_from_tokens(profile_tokens(profile1), profile_tokens(profile2))
@@ -0,0 +1,160 @@
+"""Content-addressed photo storage.
+
+Files are stored under the keys ``blobs/<hh>/<sha256>_<variant>.webp``, named
+by the hash of the uploaded bytes, so the same image uploaded twice (re-added
+after a delete, or shared between accounts) is decoded and stored once.  A
+``PhotoBlob`` row counts the ``UserPhoto`` rows that reference it; when the
+count drops to zero a ``collect_blob`` job deletes the row and the files.
+Because a key never changes content, the files are stored as immutable.
+"""
+import json
+import mimetypes
+import uuid
+from pathlib import Path
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.user import PhotoBlob, UserPhoto
+from app.storage import IMMUTABLE_CACHE_CONTROL, get_storage
+from app.utils.images import process_photo
+
+UPLOADS_ROOT = Path("uploads")
+BLOB_DIR = "blobs"
+# Uploads and rendered variants wait here until stored.  Inside the upload
+# root so that local storage moves them into place with a rename.
+STAGING_DIR = UPLOADS_ROOT / ".incoming"
+
+# Unreferenced blobs are collected after this many seconds, so a re-upload of
+# the same image shortly after a delete takes the existing files back instead
+# of racing their removal.
+COLLECT_DELAY = 60.0
+
+
+def blob_dir(digest: str) -> str:
+    """Key prefix of ``digest``'s files, fanned out by hash prefix."""
+    return f"{BLOB_DIR}/{digest[:2]}"
+
+
+def staging_path(ext: str) -> Path:
+    """A fresh path in the staging directory for an incoming upload."""
+    return STAGING_DIR / f"{uuid.uuid4().hex}{ext}"
+
+
+def acquire_blob(db: Session, digest: str) -> PhotoBlob | None:
+    """Take a reference to an existing blob; None if there is none."""
+    # Plain read first: on SQLite an UPDATE takes the write lock even when it
+    # matches nothing, and a miss is followed by image processing.
+    if db.scalar(select(PhotoBlob.content_hash).where(PhotoBlob.content_hash == digest)) is None:
+        return None
+    result = db.execute(
+        update(PhotoBlob).where(PhotoBlob.content_hash == digest).values(refcount=PhotoBlob.refcount + 1),
+        execution_options={"synchronize_session": False},
+    )
+    if result.rowcount == 0:
+        return None  # collected in between
+    return db.get(PhotoBlob, digest, populate_existing=True)
+
+
+def add_blob(db: Session, digest: str, file_path: str, variants: dict[str, str] | None) -> PhotoBlob:
+    """Register newly written files with one reference.
+
+    If a concurrent upload of the same content registered them first, take a
+    reference to its row instead; both wrote identical files.
+    """
+    try:
+        with db.begin_nested():
+            blob = PhotoBlob(
+                content_hash=digest,
+                file_path=file_path,
+                variants=json.dumps(variants) if variants else None,
+                refcount=1,
+            )
+            db.add(blob)
+        return blob
+    except IntegrityError:
+        return acquire_blob(db, digest)
+
+
+def store_upload(db: Session, staged: Path, digest: str, ext: str) -> PhotoBlob:
+    """Turn a staged upload into a referenced blob, reusing stored files when the content is known.
+
+    The staged file is always consumed.  Raises ``ImageDecodeError`` when the
+    content cannot be decoded.  The caller commits.
+    """
+    storage = get_storage()
+    rendered: list[Path] = []
+    try:
+        blob = acquire_blob(db, digest)
+        if blob is not None:
+            return blob
+        prefix = blob_dir(digest)
+        # Rendered under the staging name: a concurrent upload of the same
+        # content renders its own copies rather than overwriting these
+        names = process_photo(staged, staged.parent, staged.stem)
+        if names is None:
+            # No Pillow: keep the upload itself as the only file
+            key = f"{prefix}/{digest}{ext}"
+            content_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+            storage.save(key, staged, content_type, IMMUTABLE_CACHE_CONTROL)
+            return add_blob(db, digest, key, None)
+        rendered = [staged.parent / name for name in names.values()]
+        variants = {}
+        for variant, name in names.items():
+            key = f"{prefix}/{digest}_{variant}.webp"
+            storage.save(key, staged.parent / name, "image/webp", IMMUTABLE_CACHE_CONTROL)
+            variants[variant] = key
+        return add_blob(db, digest, variants["full"], variants)
+    finally:
+        for path in [staged, *rendered]:
+            path.unlink(missing_ok=True)
+
+
+def release_blob(db: Session, digest: str) -> bool:
+    """Drop one reference; True when nothing references the blob any more."""
+    db.execute(
+        update(PhotoBlob).where(PhotoBlob.content_hash == digest).values(refcount=PhotoBlob.refcount - 1),
+        execution_options={"synchronize_session": False},
+    )
+    refcount = db.scalar(select(PhotoBlob.refcount).where(PhotoBlob.content_hash == digest))
+    return refcount is not None and refcount <= 0
+
+
+def release_user_blobs(db: Session, user_id: str) -> list[str]:
+    """Drop the references held by all of ``user_id``'s photos; returns the hashes released.
+
+    Run before the photos themselves are deleted.  The caller commits.
+    """
+    counts = db.execute(
+        select(UserPhoto.content_hash, func.count())
+        .where(UserPhoto.user_id == user_id, UserPhoto.content_hash.is_not(None))
+        .group_by(UserPhoto.content_hash)
+    ).all()
+    for digest, count in counts:
+        db.execute(
+            update(PhotoBlob).where(PhotoBlob.content_hash == digest).values(refcount=PhotoBlob.refcount - count),
+            execution_options={"synchronize_session": False},
+        )
+    return [digest for digest, _ in counts]
+
+
+def collect_blob(db: Session, digest: str) -> bool:
+    """Delete an unreferenced blob's row and files; False if it is referenced again.
+
+    The files are removed before the caller commits: the row stays locked
+    until then, so an upload of the same content waits rather than
+    registering files that are about to disappear.
+    """
+    row = db.execute(
+        delete(PhotoBlob)
+        .where(PhotoBlob.content_hash == digest, PhotoBlob.refcount <= 0)
+        .returning(PhotoBlob.file_path, PhotoBlob.variants),
+        execution_options={"synchronize_session": False},
+    ).first()
+    if row is None:
+        return False
+    storage = get_storage()
+    for key in {row.file_path, *json.loads(row.variants or "{}").values()}:
+        storage.delete(key)
+    return True
@@ -0,0 +1,74 @@
+"""Discover ranking: blend per-candidate signals into one score and keep the top K.
+
+Each signal is in [0, 1]:
+
+  compatibility  ``compatibility_from_tokens`` (``calculate_compatibility`` on parsed tokens)
+  distance       1 at the viewer's location down to 0 at their max distance;
+                 0.5 when either side has no GPS
+  completeness   ``UserProfile.profile_completeness``
+  activity       1 when just active, halving every ``DISCOVER_ACTIVITY_HALF_LIFE_HOURS``
+                 since ``last_active_at`` (``created_at`` until the first activity)
+
+The rank is the weighted sum of the signals, with the weights from the
+``DISCOVER_RANK_*`` settings.  Signals weighted 0 are not computed.  By
+default only compatibility counts, which is the order discover always had.
+Only the ``offset + limit`` best candidates are ordered, with a heap.
+"""
+import heapq
+import math
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from app.config import settings
+
+SIGNALS = ("compatibility", "distance", "completeness", "activity")
+
+
+class ScoredCandidate(NamedTuple):
+    user_id: str
+    compatibility: float
+    distance: float | None  # km, None without GPS on either side
+    completeness: float | None
+    last_active: datetime | None  # naive UTC
+
+
+def rank_weights() -> dict[str, float]:
+    return {
+        "compatibility": settings.DISCOVER_RANK_COMPATIBILITY,
+        "distance": settings.DISCOVER_RANK_DISTANCE,
+        "completeness": settings.DISCOVER_RANK_COMPLETENESS,
+        "activity": settings.DISCOVER_RANK_ACTIVITY,
+    }
+
+
+def rank_key(weights: dict[str, float], max_km: float, now: datetime | None = None):
+    """Rank of a ``ScoredCandidate`` under ``weights``; ``now`` is naive UTC."""
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    half_life = settings.DISCOVER_ACTIVITY_HALF_LIFE_HOURS * 3600
+    terms = []
+    if weights.get("compatibility"):
+        terms.append((weights["compatibility"], lambda c: c.compatibility))
+    if weights.get("distance"):
+        terms.append((weights["distance"], lambda c: 0.5 if c.distance is None else max(0.0, 1 - c.distance / max_km)))
+    if weights.get("completeness"):
+        terms.append((weights["completeness"], lambda c: c.completeness or 0.0))
+    if weights.get("activity"):
+        def activity(c):
+            last_active = c.last_active
+            if last_active is None:
+                return 0.0
+            if last_active.tzinfo is not None:
+                last_active = last_active.astimezone(timezone.utc).replace(tzinfo=None)
+            return 0.5 ** (max((now - last_active).total_seconds(), 0.0) / half_life)
+        terms.append((weights["activity"], activity))
+
+    if len(terms) == 1 and terms[0][0] > 0:
+        return terms[0][1]  # a single signal orders the same unweighted
+    return lambda c: math.fsum(weight * signal(c) for weight, signal in terms)
+
+
+def top_candidates(
+    scored: list[ScoredCandidate], k: int, weights: dict[str, float], max_km: float, now: datetime | None = None,
+) -> list[ScoredCandidate]:
+    """The ``k`` best of ``scored``, best first; ties keep their order in ``scored``."""
+    return heapq.nlargest(k, scored, key=rank_key(weights, max_km, now))
@@ -0,0 +1,372 @@
+"""Optional in-process snapshot of discover candidates as NumPy arrays.
+
+Meant for single-node deployments (``DISCOVER_SNAPSHOT``).  Every active,
+onboarded user is held as columns: location, birth date, age range, gender
+code and preference bitmask, height, religion code and a token bitset per
+scored dimension.  Discover then filters and scores with vectorized masks
+instead of scanning ``users`` on every request; only the viewer's own likes,
+matches and blocks are still read, by index.
+
+Profile and account writes call ``note_user_changed`` in their transaction.
+After the commit the users are queued, and the next discover in this process
+re-reads just those rows.  The snapshot is also rebuilt from scratch every
+``DISCOVER_SNAPSHOT_REBUILD_SECONDS``, which is how changes committed by other
+processes (and anything read from a lagging replica) are picked up.  That
+rebuild runs on a background thread; discover keeps using the previous
+version until the new one is swapped in.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, exists, func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import read_session
+from app.models.conversation import ConversationState
+from app.models.profile import UserProfile
+from app.models.user import User
+from app.services.matching_service import DIMENSION_WEIGHTS, dimension_tokens
+from app.utils.profile_builder import _safe_json_loads
+
+logger = logging.getLogger(__name__)
+
+NO_DATE = 0  # ``date.toordinal()`` is never below 1
+NO_CODE = -1  # gender or religion not set
+_MAX_GENDERS = 64  # preference bitmasks are uint64
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+_COLUMNS = (
+    User.id, User.created_at, User.date_of_birth, User.age_range_min, User.age_range_max, User.gender,
+    User.gender_preference, User.latitude, User.longitude, User.height_inches, User.religion,
+    UserProfile.profile_completeness, func.coalesce(User.last_active_at, User.created_at).label("last_active"),
+    *(getattr(UserProfile, dimension) for dimension in DIMENSION_WEIGHTS),
+)
+
+
+def numpy_available() -> bool:
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def note_user_changed(db: Session, user_id: str) -> None:
+    """Queue ``user_id`` for the snapshot once ``db`` commits; call in the transaction that changes discover data."""
+    if settings.DISCOVER_SNAPSHOT:
+        db.info.setdefault("snapshot_changes", set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session):
+    changed = session.info.pop("snapshot_changes", None)
+    if changed:
+        candidate_snapshot.changed(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_changes(session):
+    session.info.pop("snapshot_changes", None)
+
+
+def _eligible_rows(db: Session, user_ids=None) -> list:
+    """``_COLUMNS`` of the users discover may show to anyone, optionally only of ``user_ids``."""
+    from app.services.chat_service import ONBOARDING_COMPLETED  # chat_service imports this module's callers
+
+    query = (
+        select(*_COLUMNS)
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)
+        .where(
+            User.is_active == True,  # noqa: E712
+            User.profile_setup_complete == True,  # noqa: E712
+            exists().where(
+                ConversationState.user_id == User.id,
+                ConversationState.onboarding_status == ONBOARDING_COMPLETED,
+            ),
+        )
+    )
+    if user_ids is not None:
+        query = query.where(User.id.in_(user_ids))
+    return db.execute(query).all()
+
+
+class _Vocabulary:
+    """Append-only value -> code map, shared by a snapshot and those merged from it."""
+
+    def __init__(self):
+        self.codes: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+        return code
+
+
+class _Vocabularies:
+    def __init__(self):
+        self.genders = _Vocabulary()
+        self.religions = _Vocabulary()
+        self.tokens = {dimension: _Vocabulary() for dimension in DIMENSION_WEIGHTS}
+
+
+class SnapshotColumns:
+    """One immutable version of the snapshot: entry ``i`` of every array is user ``ids[i]``."""
+
+    _ARRAYS = (
+        "created", "dob", "age_min", "age_max", "gender", "preference", "any_gender",
+        "latitude", "longitude", "height", "religion", "completeness", "last_active",
+    )
+
+    def __init__(self, vocabularies: _Vocabularies, ids: list[str], tokens: dict, token_counts: dict, **arrays):
+        import numpy as np
+
+        self.vocabularies = vocabularies
+        self.ids = ids
+        self.slots = {user_id: slot for slot, user_id in enumerate(ids)}
+        self.tokens = tokens  # dimension -> uint64 bitsets, one row per user
+        self.token_counts = token_counts  # dimension -> tokens per user
+        for name in self._ARRAYS:
+            setattr(self, name, arrays[name])
+        self.order = np.argsort(-self.created, kind="stable")  # newest user first
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def encode(cls, rows: list, vocabularies: _Vocabularies) -> "SnapshotColumns":
+        import numpy as np
+
+        n = len(rows)
+        genders, religions = vocabularies.genders, vocabularies.religions
+        arrays = {
+            "created": np.array(
+                [_micros(r.created_at) for r in rows], dtype=np.int64
+            ),
+            "dob": np.array([r.date_of_birth.toordinal() if r.date_of_birth else NO_DATE for r in rows], dtype=np.int32),
+            # A NULL range bound matches no age in SQL; these sentinels match none either
+            "age_min": np.array([r.age_range_min if r.age_range_min is not None else 1 << 15 for r in rows], dtype=np.int32),
+            "age_max": np.array([r.age_range_max if r.age_range_max is not None else -1 for r in rows], dtype=np.int32),
+            "gender": np.array([genders.code(r.gender) if r.gender else NO_CODE for r in rows], dtype=np.int16),
+            "latitude": np.array([r.latitude if r.latitude is not None else np.nan for r in rows], dtype=np.float64),
+            "longitude": np.array([r.longitude if r.longitude is not None else np.nan for r in rows], dtype=np.float64),
+            "height": np.array([r.height_inches if r.height_inches is not None else -1 for r in rows], dtype=np.int32),
+            "religion": np.array([religions.code(r.religion) if r.religion else NO_CODE for r in rows], dtype=np.int32),
+            "completeness": np.array(
+                [r.profile_completeness if r.profile_completeness is not None else np.nan for r in rows], dtype=np.float64
+            ),
+            "last_active": np.array([_micros(r.last_active) for r in rows], dtype=np.int64),
+        }
+        preference = np.zeros(n, dtype=np.uint64)
+        any_gender = np.zeros(n, dtype=bool)
+        for i, r in enumerate(rows):
+            wanted = _safe_json_loads(r.gender_preference)
+            if not wanted:
+                any_gender[i] = True
+                continue
+            for gender in wanted if isinstance(wanted, list) else [wanted]:
+                preference[i] |= np.uint64(1 << genders.code(str(gender)))
+        if len(genders) > _MAX_GENDERS:
+            raise OverflowError(f"more than {_MAX_GENDERS} distinct genders")
+        arrays.update(preference=preference, any_gender=any_gender)
+
+        tokens, token_counts = {}, {}
+        parsed = [dimension_tokens(dict(zip(DIMENSION_WEIGHTS, r[len(_COLUMNS) - len(DIMENSION_WEIGHTS):]))) for r in rows]
+        for dimension, vocabulary in vocabularies.tokens.items():
+            row_index, codes, counts = [], [], np.zeros(n, dtype=np.int32)
+            for i, by_dimension in enumerate(parsed):
+                for token in by_dimension.get(dimension, ()):
+                    row_index.append(i)
+                    codes.append(vocabulary.code(token))
+                counts[i] = len(by_dimension.get(dimension, ()))
+            bits = np.zeros((n, _words(len(vocabulary))), dtype=np.uint64)
+            codes = np.array(codes, dtype=np.uint64)
+            np.bitwise_or.at(
+                bits, (np.array(row_index, dtype=np.intp), (codes >> np.uint64(6)).astype(np.intp)),
+                np.left_shift(np.uint64(1), codes & np.uint64(63)),
+            )
+            tokens[dimension], token_counts[dimension] = bits, counts
+        return cls(vocabularies, [r.id for r in rows], tokens, token_counts, **arrays)
+
+    def merged(self, rows: list, changed: set[str]) -> "SnapshotColumns":
+        """A new version with ``changed`` users replaced by ``rows`` (those of them still eligible)."""
+        import numpy as np
+
+        fresh = self.encode(rows, self.vocabularies)
+        keep = np.array([slot for user_id, slot in self.slots.items() if user_id not in changed], dtype=np.intp)
+        arrays = {name: np.concatenate([getattr(self, name)[keep], getattr(fresh, name)]) for name in self._ARRAYS}
+        tokens = {}
+        for dimension, bits in self.tokens.items():
+            new_bits = fresh.tokens[dimension]
+            old_bits = np.pad(bits[keep], ((0, 0), (0, new_bits.shape[1] - bits.shape[1])))
+            tokens[dimension] = np.concatenate([old_bits, new_bits])
+        token_counts = {d: np.concatenate([c[keep], fresh.token_counts[d]]) for d, c in self.token_counts.items()}
+        ids = [self.ids[slot] for slot in keep] + fresh.ids
+        return SnapshotColumns(self.vocabularies, ids, tokens, token_counts, **arrays)
+
+    def last_active_at(self, slots: list[int]) -> list[datetime]:
+        return [_EPOCH + value * _MICROSECOND for value in self.last_active[slots].tolist()]
+
+    def seconds_inactive(self, slots, now: datetime):
+        """Seconds from each user's ``last_active_at`` to naive UTC ``now``, as an array."""
+        return (_micros(now) - self.last_active[slots]) / 1e6
+
+    def slots_of(self, user_ids):
+        import numpy as np
+
+        return np.array([self.slots[u] for u in user_ids if u in self.slots], dtype=np.intp)
+
+    def codes_of(self, vocabulary: _Vocabulary, values) -> list[int]:
+        return [vocabulary.codes[v] for v in values if isinstance(v, str) and v in vocabulary.codes]
+
+    def token_row(self, dimension: str, tokens: set[str]):
+        """``tokens`` as a bitset comparable with ``self.tokens[dimension]``; unknown tokens match no one."""
+        import numpy as np
+
+        row = np.zeros(self.tokens[dimension].shape[1], dtype=np.uint64)
+        for code in self.codes_of(self.vocabularies.tokens[dimension], tokens):
+            if code < row.size * 64:  # a token first seen after this version was encoded
+                row[code >> 6] |= np.uint64(1 << (code & 63))
+        return row
+
+
+def _micros(value: datetime | None) -> int:
+    """Naive UTC ``value`` as microseconds since the epoch, for int64 arrays."""
+    if value is None:
+        return 0
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _words(n_codes: int) -> int:
+    return max(1, (n_codes + 63) // 64)
+
+
+class CandidateSnapshot:
+    """The current ``SnapshotColumns``, kept fresh from change events and periodic rebuilds."""
+
+    def __init__(self):
+        self._columns: SnapshotColumns | None = None
+        self.built_at = 0.0
+        self._failed_at: float | None = None
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()  # guards _pending
+        self._write_lock = threading.Lock()  # one rebuild or merge at a time
+
+    @property
+    def current(self) -> SnapshotColumns | None:
+        return self._columns
+
+    def changed(self, user_ids) -> None:
+        with self._lock:
+            self._pending.update(user_ids)
+
+    def clear(self) -> None:
+        with self._write_lock, self._lock:
+            self._columns = None
+            self._failed_at = None
+            self._pending.clear()
+
+    def _take_pending(self) -> set[str]:
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        return pending
+
+    def columns(self, db: Session) -> SnapshotColumns | None:
+        """The freshest version, reading from ``db`` as needed; None when it cannot be built.
+
+        Only the first build runs in the request (every request waits for it).
+        Later full rebuilds run on a background thread while the previous
+        version keeps being served; pending changes are merged in the request.
+        """
+        now = time.monotonic()
+        rebuild_seconds = settings.DISCOVER_SNAPSHOT_REBUILD_SECONDS
+        if self._failed_at is not None and now - self._failed_at < rebuild_seconds:
+            return None
+        current = self._columns
+        stale = current is None or now - self.built_at >= rebuild_seconds
+        if not stale and not self._pending:
+            return current
+        # While another request or the rebuild thread writes, keep serving the version there is
+        if not self._write_lock.acquire(blocking=current is None):
+            return current
+        if self._columns is not current:
+            self._write_lock.release()
+            return self._columns  # built while this request waited
+        if current is not None and stale:
+            # The thread owns the write lock until the new version is swapped in
+            threading.Thread(
+                target=self._rebuild_in_background, args=(now,), name="candidate-snapshot", daemon=True,
+            ).start()
+            return current
+        try:
+            if current is None:
+                self._rebuild(db, now)
+            else:
+                changed = self._take_pending()
+                self._columns = current.merged(_eligible_rows(db, changed), changed)
+            self._failed_at = None
+        except OverflowError as exc:
+            self._disable(exc, now)
+        finally:
+            self._write_lock.release()
+        return self._columns
+
+    def _rebuild(self, db: Session, now: float) -> None:
+        # Changes queued from here on are merged into the new version afterwards
+        self._take_pending()
+        started = time.perf_counter()
+        columns = SnapshotColumns.encode(_eligible_rows(db), _Vocabularies())
+        self._columns, self.built_at = columns, now
+        logger.info("Candidate snapshot rebuilt: %d users in %.0f ms",
+                    len(columns), (time.perf_counter() - started) * 1000)
+
+    def _rebuild_in_background(self, now: float) -> None:
+        try:
+            db = read_session()
+            try:
+                self._rebuild(db, now)
+            finally:
+                db.close()
+            self._failed_at = None
+        except OverflowError as exc:
+            self._disable(exc, now)
+        except Exception:
+            logger.exception("Candidate snapshot rebuild failed; serving the previous version")
+            self.built_at = now  # retried after another interval, not on every request
+        finally:
+            self._write_lock.release()
+
+    def _disable(self, exc: OverflowError, now: float) -> None:
+        logger.warning("Candidate snapshot disabled until the next rebuild: %s", exc)
+        self._columns, self._failed_at = None, now
+
+    def wait(self) -> None:
+        """Block until a rebuild or merge in progress has been swapped in."""
+        with self._write_lock:
+            pass
+
+
+candidate_snapshot = CandidateSnapshot()
+_warned_missing_numpy = False
+
+
+def get_snapshot_columns(db: Session) -> SnapshotColumns | None:
+    """The candidate snapshot for discover, or None to query SQL (disabled, or NumPy missing)."""
+    global _warned_missing_numpy
+    if not settings.DISCOVER_SNAPSHOT:
+        return None
+    if not numpy_available():
+        if not _warned_missing_numpy:
+            logger.warning("DISCOVER_SNAPSHOT is set but numpy is not installed; discover queries SQL")
+            _warned_missing_numpy = True
+        return None
+    return candidate_snapshot.columns(db)
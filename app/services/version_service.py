@@ -0,0 +1,43 @@
+"""Per-user version counters behind the ETags of the private GET endpoints.
+
+``User.profile_version`` (see card_service), ``matches_version`` and
+``chat_version`` are bumped in the same transaction as any write that changes
+what ``/profile/me``, ``/matches`` or ``/chat`` return.  They are loaded with
+the user row during authentication, so a matching ``If-None-Match`` is
+answered with a 304 before the endpoint queries or serializes anything.
+"""
+from collections.abc import Iterable
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.match import Match
+from app.models.user import User
+
+
+def _bump(db: Session, column, user_ids: Iterable[str] | None = None, where=None) -> None:
+    criterion = User.id.in_(list(user_ids)) if where is None else where
+    # Leaves updated_at alone: it is part of the /me ETag, and a new match or
+    # chat message does not change the account
+    db.execute(
+        update(User).where(criterion).values({column: column + 1, User.updated_at: User.updated_at}),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def bump_matches_version(db: Session, *user_ids: str) -> None:
+    """The match lists of ``user_ids`` changed: a match was made, scored or removed."""
+    _bump(db, User.matches_version, user_ids)
+
+
+def bump_match_partners(db: Session, user_id: str) -> None:
+    """``user_id``'s card changed, so did the match list of everyone matched with them."""
+    partners = select(Match.user2_id).where(Match.user1_id == user_id).union(
+        select(Match.user1_id).where(Match.user2_id == user_id)
+    )
+    _bump(db, User.matches_version, where=User.id.in_(partners))
+
+
+def bump_chat_version(db: Session, user_id: str) -> None:
+    """``user_id``'s onboarding chat history or state changed."""
+    _bump(db, User.chat_version, (user_id,))
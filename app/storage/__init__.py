@@ -0,0 +1,2 @@
+"""Where photo files live: the local ``uploads/`` directory or an S3-compatible bucket."""
+from app.storage.backend import IMMUTABLE_CACHE_CONTROL, LocalStorage, PhotoStorage, create_storage, get_storage, set_storage  # noqa: F401
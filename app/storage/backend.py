@@ -0,0 +1,109 @@
+"""Photo storage interface and the local-filesystem backend.
+
+Keys are the relative paths stored on ``UserPhoto.file_path`` (for example
+``blobs/ab/ab12..._full.webp``).  ``url`` is what clients fetch: with a CDN
+or a bucket in front, image bytes never pass through the API workers.  Local
+files without a CDN have no URL of their own and are served by the
+access-checked ``/api/v1/photos`` route.
+"""
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from app.config import settings
+
+# Content-addressed files never change under the same key
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class PhotoStorage(ABC):
+    """Backend interface."""
+
+    @abstractmethod
+    def save(self, key: str, source: Path, content_type: str, cache_control: str | None = None) -> None:
+        """Store the local file ``source`` under ``key``; ``source`` is consumed."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove ``key``; missing keys are ignored."""
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> None:
+        """Remove every key under ``prefix`` (a directory-like ``"<user_id>/"``)."""
+
+    @abstractmethod
+    def url(self, key: str) -> str | None:
+        """Where clients fetch ``key`` directly; None when only the API can serve it."""
+
+    def local_path(self, key: str) -> Path | None:
+        """The file behind ``key`` if it is on this machine's disk."""
+        return None
+
+
+class LocalStorage(PhotoStorage):
+    """Files under ``root``, served by the API or from ``public_url`` (a CDN origin-pulling them)."""
+
+    def __init__(self, root: Path, public_url: str = ""):
+        self.root = root
+        self.public_url = public_url.rstrip("/")
+
+    def _path(self, key: str) -> Path | None:
+        root = self.root.resolve()
+        path = (root / key).resolve()
+        return path if path.is_relative_to(root) and path != root else None
+
+    def save(self, key: str, source: Path, content_type: str, cache_control: str | None = None) -> None:
+        path = self._path(key)
+        if path is None:
+            raise ValueError(f"Storage key outside the upload root: {key!r}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A rename when the staging directory is on the same filesystem
+        shutil.move(source, path)
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def delete_prefix(self, prefix: str) -> None:
+        path = self._path(prefix)
+        if path is not None and path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+
+    def url(self, key: str) -> str | None:
+        if not self.public_url:
+            return None
+        return f"{self.public_url}/{key}"
+
+    def local_path(self, key: str) -> Path | None:
+        return self._path(key)
+
+
+_storage: PhotoStorage | None = None
+_storage_lock = threading.Lock()
+
+
+def create_storage(backend: str | None = None) -> PhotoStorage:
+    backend = backend or settings.STORAGE_BACKEND
+    if backend == "local":
+        return LocalStorage(Path("uploads"), settings.STORAGE_PUBLIC_URL)
+    if backend == "s3":
+        from app.storage.s3 import S3Storage
+        return S3Storage.from_settings()
+    raise ValueError(f"Unknown STORAGE_BACKEND {backend!r}")
+
+
+def get_storage() -> PhotoStorage:
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage()
+    return _storage
+
+
+def set_storage(storage: PhotoStorage | None) -> None:
+    """Replace the process-wide storage (None: recreate from settings on next use)."""
+    global _storage
+    _storage = storage
@@ -0,0 +1,73 @@
+"""Photo storage in an S3-compatible bucket (AWS S3, MinIO, R2, ...).
+
+Clients get a CDN URL when ``STORAGE_PUBLIC_URL`` is set, otherwise a
+pre-signed GET URL.  Pre-signed URLs are reused for half their lifetime so a
+photo keeps the same URL across responses and client caches stay warm.
+Requires ``boto3``; credentials come from the usual AWS environment/config.
+"""
+import threading
+import time
+from pathlib import Path
+
+from app.config import settings
+from app.storage.backend import PhotoStorage
+
+_MAX_CACHED_URLS = 10_000  # expired URLs are pruned once the cache grows past this
+_DELETE_BATCH = 1000  # DeleteObjects limit
+
+
+class S3Storage(PhotoStorage):
+    def __init__(self, client, bucket: str, public_url: str = "", presign_expires: int = 3600):
+        self._s3 = client
+        self.bucket = bucket
+        self.public_url = public_url.rstrip("/")
+        self.presign_expires = presign_expires
+        self._urls: dict[str, tuple[str, float]] = {}
+        self._urls_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "S3Storage":
+        import boto3
+
+        client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            region_name=settings.S3_REGION or None,
+        )
+        return cls(client, settings.S3_BUCKET, settings.STORAGE_PUBLIC_URL, settings.S3_PRESIGN_EXPIRES)
+
+    def save(self, key: str, source: Path, content_type: str, cache_control: str | None = None) -> None:
+        extra = {"ContentType": content_type}
+        if cache_control:
+            extra["CacheControl"] = cache_control
+        self._s3.upload_file(str(source), self.bucket, key, ExtraArgs=extra)
+        source.unlink(missing_ok=True)
+
+    def delete(self, key: str) -> None:
+        self._s3.delete_object(Bucket=self.bucket, Key=key)
+        with self._urls_lock:
+            self._urls.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        paginator = self._s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix, PaginationConfig={"PageSize": _DELETE_BATCH}):
+            keys = [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+            if keys:
+                self._s3.delete_objects(Bucket=self.bucket, Delete={"Objects": keys, "Quiet": True})
+
+    def url(self, key: str) -> str:
+        if self.public_url:
+            return f"{self.public_url}/{key}"
+        now = time.time()
+        cached = self._urls.get(key)
+        if cached is not None and now < cached[1]:
+            return cached[0]
+        url = self._s3.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=self.presign_expires
+        )
+        with self._urls_lock:
+            if len(self._urls) > _MAX_CACHED_URLS:
+                for stale in [k for k, (_, until) in self._urls.items() if until <= now]:
+                    del self._urls[stale]
+            self._urls[key] = (url, now + self.presign_expires / 2)
+        return url
@@ -0,0 +1,33 @@
+"""Conditional GET helpers for per-user versioned responses."""
+from fastapi import Request, Response, status
+
+# Private to the user, and always revalidated: a 304 costs one round trip
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of ``etag`` against an ``If-None-Match`` header, as that header requires."""
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def user_etag(resource: str, user_id: str, *versions) -> str:
+    """Weak ETag for ``resource`` as seen by ``user_id`` at ``versions``.
+
+    Weak because the body may be re-encoded (compressed) on the way out.
+    """
+    return f'W/"{resource}-{user_id}-{"-".join(str(v) for v in versions)}"'
+
+
+def validator_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": PRIVATE_REVALIDATE, "Vary": "Authorization"}
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """A 304 when the client already holds ``etag``, else None."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validator_headers(etag))
+    return None
@@ -0,0 +1,148 @@
+"""Photo variants: decode an upload once and write resized, metadata-free WebP copies.
+
+Decoding and encoding are CPU-bound, so they run in a process pool: the
+request thread only waits on a future while the work happens outside the
+GIL.  Pillow is imported in the worker; without it uploads are stored as-is.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels, largest first: each variant is resized from the previous one
+VARIANTS: dict[str, int] = {"full": 1600, "medium": 800, "thumb": 320}
+WEBP_QUALITY: dict[str, int] = {"full": 82, "medium": 80, "thumb": 75}
+
+
+class ImageDecodeError(ValueError):
+    """The upload passed the magic-byte check but is not a decodable image."""
+
+
+class ImageProcessingUnavailable(RuntimeError):
+    """Rendering did not finish within IMAGE_TIMEOUT, or its worker process died."""
+
+
+def pillow_available() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def render_variants(source: str, dest_dir: str, stem: str) -> dict[str, str]:
+    """Write ``<stem>_<variant>.webp`` files into ``dest_dir``; returns variant -> file name.
+
+    Runs in a pool process.  EXIF orientation is applied to the pixels and all
+    metadata (EXIF, GPS, ICC, comments) is dropped by re-encoding.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(source) as img:
+            # JPEG can decode at a reduced scale straight away
+            img.draft("RGB", (VARIANTS["full"], VARIANTS["full"]))
+            img = ImageOps.exif_transpose(img)
+            img.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as exc:
+        raise ImageDecodeError(str(exc)) from exc
+
+    has_alpha = img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+    img = img.convert("RGBA" if has_alpha else "RGB")
+
+    names = {}
+    for variant, size in VARIANTS.items():
+        img.thumbnail((size, size), Image.Resampling.LANCZOS)
+        name = f"{stem}_{variant}.webp"
+        img.save(Path(dest_dir) / name, "WEBP", quality=WEBP_QUALITY[variant], method=4)
+        names[variant] = name
+    return names
+
+
+class _InlineExecutor(Executor):
+    """IMAGE_WORKERS=0: render on the calling thread."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        from concurrent.futures import Future
+
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
+
+_pool: Executor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Executor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if settings.IMAGE_WORKERS > 0:
+                    # spawn: forking a process that runs threads can deadlock the child
+                    _pool = ProcessPoolExecutor(
+                        max_workers=settings.IMAGE_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    _pool = _InlineExecutor()
+    return _pool
+
+
+def _remove_variants(dest_dir: Path, stem: str) -> None:
+    for variant in VARIANTS:
+        (dest_dir / f"{stem}_{variant}.webp").unlink(missing_ok=True)
+
+
+def _discard_pool(pool: Executor) -> None:
+    """Drop a broken pool; the next upload starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def process_photo(source: Path, dest_dir: Path, stem: str) -> dict[str, str] | None:
+    """Render the variants of ``source`` in the pool; None if Pillow is not installed.
+
+    Raises ``ImageDecodeError`` for content Pillow cannot decode, and
+    ``ImageProcessingUnavailable`` when rendering times out or its worker
+    crashes.  Variants of a failed render are removed, including any that a
+    timed-out worker writes later.
+    """
+    if not pillow_available():
+        return None
+    pool = _get_pool()
+    future = None
+    try:
+        future = pool.submit(render_variants, str(source), str(dest_dir), stem)
+        return future.result(timeout=settings.IMAGE_TIMEOUT)
+    except (FuturesTimeoutError, BrokenProcessPool) as exc:
+        _remove_variants(dest_dir, stem)
+        if future is not None and not future.cancel():
+            # Already running: clean up after it once it stops
+            future.add_done_callback(lambda _: _remove_variants(dest_dir, stem))
+        if isinstance(exc, BrokenProcessPool):
+            logger.error("Image worker process died; restarting the pool")
+            _discard_pool(pool)
+        else:
+            logger.warning("Rendering photo variants took longer than %.0fs", settings.IMAGE_TIMEOUT)
+        raise ImageProcessingUnavailable(str(exc) or type(exc).__name__) from exc
+
+
+def shutdown_image_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
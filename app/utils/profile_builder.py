@@ -1,10 +1,14 @@
 import json
 import logging
 import math
+from datetime import datetime
+from typing import NamedTuple
 
-from app.models.user import User
+from app.models.user import User, UserPhoto
 from app.schemas.user import PhotoResponse, ProfileDataResponse, UserResponse
-from app.schemas.discover import DiscoverUserResponse
+from app.schemas.discover import DiscoverCardResponse, DiscoverUserResponse
+from app.storage import get_storage
+from app.utils.signed_urls import photo_link_query
 
 logger = logging.getLogger(__name__)
 
@@ -31,19 +35,94 @@ def _safe_json_loads(value: str | None, fallback=None):
         return fallback
 
 
+def _json_str_list(value: str | None, fallback=None) -> list[str] | None:
+    """Parse a JSON ``list[str]`` column, coercing what older writers left behind.
+
+    A bare string becomes a one-item list and scalar items become strings;
+    nested items are dropped and any other shape falls back.  The builders
+    skip validation, so this is what keeps responses matching their schema.
+    """
+    parsed = _safe_json_loads(value)
+    if parsed is None:
+        return fallback
+    if isinstance(parsed, str):
+        return [parsed]
+    if isinstance(parsed, list):
+        return [item if isinstance(item, str) else str(item) for item in parsed
+                if isinstance(item, (str, int, float))]
+    logger.warning("Expected a JSON list in database field: %.100s", value)
+    return fallback
+
+
+class PhotoRef(NamedTuple):
+    """What a cached card keeps of a photo: storage keys, not URLs.
+
+    Pre-signed and signed URLs expire, so they are derived per response by
+    ``resolve_photo`` instead of being cached with the card.
+    """
+    id: str
+    file_path: str
+    variants: dict
+    is_primary: bool
+    order_index: int
+    created_at: datetime
+
+
+def photo_ref(photo: UserPhoto) -> PhotoRef:
+    return PhotoRef(
+        photo.id, photo.file_path, _safe_json_loads(photo.variants, {}),
+        photo.is_primary, photo.order_index, photo.created_at,
+    )
+
+
+def photo_url(photo: PhotoRef, variants: dict, variant: str) -> str:
+    """Direct storage/CDN URL of a variant, or a signed link to the access-checked API route when there is none."""
+    return (
+        get_storage().url(variants.get(variant, photo.file_path))
+        or f"/api/v1/photos/{photo.id}/{variant}?{photo_link_query(photo.id, variant)}"
+    )
+
+
+# The photo, profile and discover-card builders use ``model_construct``: every
+# field comes straight from typed ORM columns or ``_json_str_list``, so
+# validating them again is pure overhead on the discover and match-list hot
+# paths.
+
+
+def resolve_photo(ref: PhotoRef) -> PhotoResponse:
+    return PhotoResponse.model_construct(
+        id=ref.id,
+        file_path=ref.file_path,
+        url=photo_url(ref, ref.variants, "full"),
+        medium_url=photo_url(ref, ref.variants, "medium"),
+        thumbnail_url=photo_url(ref, ref.variants, "thumb"),
+        is_primary=ref.is_primary,
+        order_index=ref.order_index,
+        created_at=ref.created_at,
+    )
+
+
+def build_photo(photo: UserPhoto) -> PhotoResponse:
+    return resolve_photo(photo_ref(photo))
+
+
+def _sorted_photos(user: User) -> list[UserPhoto]:
+    return sorted(user.photos, key=lambda p: p.order_index)
+
+
 def build_photos(user: User) -> list[PhotoResponse]:
-    return [PhotoResponse.model_validate(p) for p in sorted(user.photos, key=lambda p: p.order_index)]
+    return [build_photo(p) for p in _sorted_photos(user)]
 
 
 def build_profile_data(user: User) -> ProfileDataResponse | None:
     if not user.profile:
         return None
     p = user.profile
-    return ProfileDataResponse(
+    return ProfileDataResponse.model_construct(
         bio=p.bio,
-        interests=_safe_json_loads(p.interests),
-        values=_safe_json_loads(p.values),
-        personality_traits=_safe_json_loads(p.personality_traits),
+        interests=_json_str_list(p.interests),
+        values=_json_str_list(p.values),
+        personality_traits=_json_str_list(p.personality_traits),
         relationship_goals=p.relationship_goals,
         communication_style=p.communication_style,
         profile_completeness=p.profile_completeness,
@@ -51,7 +130,7 @@ def build_profile_data(user: User) -> ProfileDataResponse | None:
 
 
 def build_user_response(user: User) -> UserResponse:
-    gender_pref = _safe_json_loads(user.gender_preference)
+    gender_pref = _json_str_list(user.gender_preference)
     return UserResponse(
         id=user.id,
         email=user.email,
@@ -71,7 +150,7 @@ def build_user_response(user: User) -> UserResponse:
         job_title=user.job_title,
         college_university=user.college_university,
         education_level=user.education_level,
-        languages=_safe_json_loads(user.languages),
+        languages=_json_str_list(user.languages),
         ethnicity=user.ethnicity,
         religion=user.religion,
         children=user.children,
@@ -81,10 +160,10 @@ def build_user_response(user: User) -> UserResponse:
         marijuana=user.marijuana,
         drugs=user.drugs,
         relationship_goals=user.relationship_goals,
-        hidden_fields=_safe_json_loads(user.hidden_fields, fallback=[]),
+        hidden_fields=_json_str_list(user.hidden_fields, fallback=[]),
         height_pref_min=user.height_pref_min,
         height_pref_max=user.height_pref_max,
-        religion_preference=_safe_json_loads(user.religion_preference),
+        religion_preference=_json_str_list(user.religion_preference),
         dating_preferences_complete=bool(user.dating_preferences_complete),
         profile_setup_complete=bool(user.profile_setup_complete),
         is_active=user.is_active,
@@ -95,28 +174,31 @@ def build_user_response(user: User) -> UserResponse:
     )
 
 
-def build_discover_user(user: User, score: float, distance_km: float | None = None) -> DiscoverUserResponse:
-    hidden = set(_safe_json_loads(user.hidden_fields, fallback=[]))
+def build_public_card(user: User) -> dict:
+    """The viewer-independent fields of a ``DiscoverUserResponse``, hidden fields blanked.
+
+    Photos are ``PhotoRef``s; ``build_card_response`` turns them into URLs.
+    """
+    hidden = set(_json_str_list(user.hidden_fields, fallback=[]))
 
     def _visible(field_name: str, value):
         if field_name in hidden:
             return None
         return value
 
-    return DiscoverUserResponse(
+    return dict(
         id=user.id,
         display_name=user.display_name,
         date_of_birth=user.date_of_birth,
         gender=_visible("gender", user.gender),
         location=user.location,
-        distance_km=round(distance_km, 1) if distance_km is not None else None,
         height_inches=user.height_inches,
         home_town=_visible("home_town", user.home_town),
         sexual_orientation=_visible("sexual_orientation", user.sexual_orientation),
         job_title=_visible("job_title", user.job_title),
         college_university=_visible("college_university", user.college_university),
         # education_level is AI-only, never shown to others
-        languages=_visible("languages", _safe_json_loads(user.languages)),
+        languages=_visible("languages", _json_str_list(user.languages)),
         ethnicity=_visible("ethnicity", user.ethnicity),
         religion=_visible("religion", user.religion),
         children=_visible("children", user.children),
@@ -126,8 +208,49 @@ def build_discover_user(user: User, score: float, distance_km: float | None = No
         marijuana=_visible("marijuana", user.marijuana),
         drugs=_visible("drugs", user.drugs),
         relationship_goals=_visible("relationship_goals", user.relationship_goals),
-        photos=build_photos(user),
+        photos=[photo_ref(p) for p in _sorted_photos(user)],
         profile=build_profile_data(user),
-        compatibility_score=round(score, 4),
         created_at=user.created_at,
     )
+
+
+def build_card_response(card: dict, score: float, distance_km: float | None = None) -> DiscoverUserResponse:
+    """A public card plus the per-viewer score and distance."""
+    return DiscoverUserResponse.model_construct(
+        **dict(card, photos=[resolve_photo(ref) for ref in card["photos"]]),
+        distance_km=round(distance_km, 1) if distance_km is not None else None,
+        compatibility_score=round(score, 4),
+    )
+
+
+def build_discover_user(user: User, score: float, distance_km: float | None = None) -> DiscoverUserResponse:
+    return build_card_response(build_public_card(user), score, distance_km)
+
+
+def build_card_summary(user: User, primary_photo: UserPhoto | None) -> dict:
+    """The viewer-independent fields of a ``DiscoverCardResponse``; needs no relationship loaded."""
+    return dict(
+        id=user.id,
+        display_name=user.display_name,
+        date_of_birth=user.date_of_birth,
+        primary_photo=photo_ref(primary_photo) if primary_photo is not None else None,
+    )
+
+
+def summarize_card(card: dict) -> dict:
+    """``build_card_summary`` of an already built public card."""
+    return dict(
+        id=card["id"],
+        display_name=card["display_name"],
+        date_of_birth=card["date_of_birth"],
+        primary_photo=next((p for p in card["photos"] if p.is_primary), None),
+    )
+
+
+def build_summary_response(summary: dict, score: float, distance_km: float | None = None) -> DiscoverCardResponse:
+    primary = summary["primary_photo"]
+    return DiscoverCardResponse.model_construct(
+        **dict(summary, primary_photo=resolve_photo(primary) if primary is not None else None),
+        distance_km=round(distance_km, 1) if distance_km is not None else None,
+        compatibility_score=round(score, 4),
+    )
@@ -1,12 +1,100 @@
 import logging
+import math
 import threading
 import time
 from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 
 from fastapi import HTTPException, status
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    """Outcome of one limiter check, used for 429s and ``RateLimit-*`` headers.
+
+    ``reset_after`` is the number of seconds until the full quota is available
+    again; ``retry_after`` is the number of seconds until the next request
+    would be allowed (0 when the checked request was allowed).
+    """
+
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float = 0.0
+
+    @property
+    def allowed(self) -> bool:
+        return self.retry_after <= 0
+
+
+# Results recorded by limiters during the current request (see track_rate_limits)
+_request_results: ContextVar[list[RateLimitResult] | None] = ContextVar("rate_limit_results", default=None)
+
+
+def _record(result: RateLimitResult) -> RateLimitResult:
+    results = _request_results.get()
+    if results is not None:
+        results.append(result)
+    return result
+
+
+def _describe_window(window_seconds: int) -> str:
+    if window_seconds == 60:
+        return "minute"
+    if window_seconds == 3600:
+        return "hour"
+    return f"{window_seconds} seconds"
+
+
+def rate_limit_headers(result: RateLimitResult) -> dict[str, str]:
+    """Headers advertising ``result`` (IETF RateLimit header fields, delta-seconds)."""
+    headers = {
+        "RateLimit-Limit": str(result.limit),
+        "RateLimit-Remaining": str(result.remaining),
+        "RateLimit-Reset": str(math.ceil(result.reset_after)),
+    }
+    if not result.allowed:
+        headers["Retry-After"] = str(max(1, math.ceil(result.retry_after)))
+    return headers
+
+
+def _too_many_requests(result: RateLimitResult, window_seconds: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=(
+            f"Rate limit exceeded. Maximum {result.limit} requests per {_describe_window(window_seconds)}. "
+            f"Retry in {max(1, math.ceil(result.retry_after))} seconds."
+        ),
+        headers=rate_limit_headers(result),
+    )
+
+
+@contextmanager
+def track_rate_limits():
+    """Collect the results of every limiter checked while the block runs.
+
+    Used by the HTTP middleware: the list is shared with the request's
+    context (including threadpool workers running sync routes), so checks
+    made anywhere during the request are visible when the response is sent.
+    """
+    results: list[RateLimitResult] = []
+    token = _request_results.set(results)
+    try:
+        yield results
+    finally:
+        _request_results.reset(token)
+
+
+def most_restrictive(results: list[RateLimitResult]) -> RateLimitResult | None:
+    """Pick the result a client should obey when several limiters applied."""
+    if not results:
+        return None
+    return min(results, key=lambda r: (r.allowed, r.remaining, -r.reset_after))
+
 # ---------------------------------------------------------------------------
 # In-memory fallback (single-process only)
 # ---------------------------------------------------------------------------
@@ -38,18 +126,124 @@ class InMemoryRateLimiter:
         for uid in stale:
             del self._requests[uid]
 
-    def check(self, key: str) -> None:
+    def check(self, key: str) -> RateLimitResult:
         now = time.time()
         with self._lock:
             self._maybe_cleanup(now)
             cutoff = now - self.window_seconds
-            self._requests[key] = [t for t in self._requests[key] if t > cutoff]
-            if len(self._requests[key]) >= self.max_requests:
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail=f"Rate limit exceeded. Maximum {self.max_requests} requests per minute.",
-                )
-            self._requests[key].append(now)
+            timestamps = [t for t in self._requests[key] if t > cutoff]
+            self._requests[key] = timestamps
+            if len(timestamps) >= self.max_requests:
+                result = _record(RateLimitResult(
+                    limit=self.max_requests,
+                    remaining=0,
+                    reset_after=timestamps[-1] + self.window_seconds - now,
+                    retry_after=timestamps[0] + self.window_seconds - now,
+                ))
+                raise _too_many_requests(result, self.window_seconds)
+            timestamps.append(now)
+            return _record(RateLimitResult(
+                limit=self.max_requests,
+                remaining=self.max_requests - len(timestamps),
+                reset_after=timestamps[0] + self.window_seconds - now,
+            ))
+
+    def reset(self) -> None:
+        """Forget all tracked keys."""
+        with self._lock:
+            self._requests.clear()
+
+
+class GCRARateLimiter:
+    """GCRA (generic cell rate algorithm) limiter using local memory.
+
+    Equivalent to a token bucket holding ``max_requests`` tokens that refill
+    at ``max_requests / window_seconds`` per second, but stores a single
+    float per key — the theoretical arrival time (TAT) of the next request —
+    so each check is O(1) regardless of the limit.
+
+    Keys are spread over a fixed table of lock-protected shards so that
+    concurrent requests for different users rarely contend on the same lock.
+    Stale keys (TAT in the past, i.e. a full bucket) are dropped one shard at
+    a time, so no single check ever walks the whole key space.
+
+    Like ``InMemoryRateLimiter`` this only limits within a single process.
+    """
+
+    _NUM_SHARDS = 16
+
+    def __init__(self, max_requests: int, window_seconds: int, name: str = ""):
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.name = name
+        # Spacing between requests at the sustained rate, and how far ahead of
+        # "now" the TAT may run before requests are rejected (the burst).
+        self._emission_interval = window_seconds / max_requests
+        self._tolerance = window_seconds - self._emission_interval
+        self._cleanup_interval: float = 300.0
+        self._shards: list[tuple[threading.Lock, dict[str, float]]] = [
+            (threading.Lock(), {}) for _ in range(self._NUM_SHARDS)
+        ]
+        now = time.monotonic()
+        # Stagger shard cleanups so they don't all fall due on the same request
+        self._next_cleanup: list[float] = [
+            now + self._cleanup_interval * (i + 1) / self._NUM_SHARDS
+            for i in range(self._NUM_SHARDS)
+        ]
+
+    def _maybe_cleanup(self, shard: int, tats: dict[str, float], now: float) -> None:
+        """Drop keys of one shard whose bucket has fully refilled.  Caller holds the shard lock."""
+        if now < self._next_cleanup[shard]:
+            return
+        self._next_cleanup[shard] = now + self._cleanup_interval
+        stale = [key for key, tat in tats.items() if tat <= now]
+        for key in stale:
+            del tats[key]
+
+    def check(self, key: str) -> RateLimitResult:
+        now = time.monotonic()
+        shard = hash(key) % self._NUM_SHARDS
+        lock, tats = self._shards[shard]
+        with lock:
+            self._maybe_cleanup(shard, tats, now)
+            tat = max(tats.get(key, now), now)
+            if tat - now > self._tolerance:
+                result = _record(_gcra_result(self, tat - now, rejected=True))
+                raise _too_many_requests(result, self.window_seconds)
+            tats[key] = tat + self._emission_interval
+            return _record(_gcra_result(self, tat + self._emission_interval - now, rejected=False))
+
+    async def acheck(self, key: str) -> RateLimitResult:
+        """Async entry point; the in-memory check is O(1) and never waits on I/O."""
+        return self.check(key)
+
+    def reset(self) -> None:
+        """Forget all tracked keys."""
+        for lock, tats in self._shards:
+            with lock:
+                tats.clear()
+
+
+def _gcra_result(limiter, ahead: float, rejected: bool) -> RateLimitResult:
+    """Describe a GCRA bucket whose TAT runs ``ahead`` seconds past now.
+
+    For an allowed request ``ahead`` is measured after charging it; for a
+    rejected one it is the unchanged TAT.
+    """
+    if rejected:
+        return RateLimitResult(
+            limit=limiter.max_requests,
+            remaining=0,
+            reset_after=ahead,
+            retry_after=ahead - limiter._tolerance,
+        )
+    # Small epsilon: window / emission_interval is not always exact in floating point
+    remaining = math.floor((limiter.window_seconds - ahead) / limiter._emission_interval + 1e-9)
+    return RateLimitResult(
+        limit=limiter.max_requests,
+        remaining=max(0, remaining),
+        reset_after=ahead,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -74,11 +268,14 @@ class RedisRateLimiter:
     redis.call('ZREMRANGEBYSCORE', key, 0, cutoff)
     local count = redis.call('ZCARD', key)
     if count >= max_requests then
-        return 0
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local newest = redis.call('ZRANGE', key, -1, -1, 'WITHSCORES')
+        return {0, count, oldest[2], newest[2]}
     end
     redis.call('ZADD', key, now, tostring(now) .. ':' .. tostring(math.random(1000000)))
     redis.call('EXPIRE', key, window + 1)
-    return 1
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    return {1, count + 1, oldest[2], tostring(now)}
     """
 
     def __init__(self, redis_client, max_requests: int, window_seconds: int, name: str = ""):
@@ -88,65 +285,401 @@ class RedisRateLimiter:
         self.name = name
         self._script = self._redis.register_script(self._LUA_SCRIPT)
 
-    def check(self, key: str) -> None:
+    def check(self, key: str) -> RateLimitResult:
         now = time.time()
         redis_key = f"ratelimit:{self.name}:{key}"
         cutoff = now - self.window_seconds
 
-        allowed = self._script(
+        allowed, count, oldest, newest = self._script(
             keys=[redis_key],
             args=[now, cutoff, self.max_requests, self.window_seconds],
         )
-        if not allowed:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Rate limit exceeded. Maximum {self.max_requests} requests per minute.",
-            )
+        if not int(allowed):
+            result = _record(RateLimitResult(
+                limit=self.max_requests,
+                remaining=0,
+                reset_after=float(newest) + self.window_seconds - now,
+                retry_after=float(oldest) + self.window_seconds - now,
+            ))
+            raise _too_many_requests(result, self.window_seconds)
+        return _record(RateLimitResult(
+            limit=self.max_requests,
+            remaining=self.max_requests - int(count),
+            reset_after=float(oldest) + self.window_seconds - now,
+        ))
+
+
+# ---------------------------------------------------------------------------
+# Redis-backed GCRA (works across workers, one key per limited entity)
+# ---------------------------------------------------------------------------
+
+
+class _RedisGCRABase:
+    """State and script shared by the sync and asyncio Redis GCRA limiters.
+
+    The key holds the theoretical arrival time and expires as soon as the
+    bucket is full again, so Redis memory no longer grows with
+    ``max_requests``.  The Lua script checks every key it is given before
+    updating any of them, which lets several limiters be evaluated
+    atomically in one round trip.  It returns ``{0, ahead_1, ahead_2, ...}``
+    (how far each charged TAT runs past now) when every key is allowed, or
+    ``{i, ahead_i}`` for the first key that is not.  Time is read from the
+    Redis server, so clock skew between API hosts does not change the limits.
+
+    The limited entity (user id, email, IP) is the key's hash tag.  Limiters
+    on the same entity share a Redis Cluster slot and are checked in one
+    script call; different entities get one call each, all sent in a single
+    pipeline (a cluster pipeline routes each call to its slot's node), so a
+    check is still one network round trip.
+
+    Keys that Redis has rejected are remembered locally until their
+    retry-after time, so a throttled client hammering the API is turned away
+    without touching Redis at all.  While Redis is unreachable each limiter
+    falls back to a local ``GCRARateLimiter`` and Redis is retried after a
+    short back-off.
+    """
+
+    _LUA_SCRIPT = """
+    if redis.replicate_commands then
+        redis.replicate_commands()  -- Redis < 5: allow writes after TIME
+    end
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+    local new_tats = {}
+    for i = 1, #KEYS do
+        local emission = tonumber(ARGV[i * 2 - 1])
+        local tolerance = tonumber(ARGV[i * 2])
+        local tat = tonumber(redis.call('GET', KEYS[i])) or now
+        if tat < now then
+            tat = now
+        end
+        if tat - now > tolerance then
+            return {i, tostring(tat - now)}
+        end
+        new_tats[i] = tat + emission
+    end
+    local ahead = {0}
+    for i = 1, #KEYS do
+        local ttl_ms = math.ceil((new_tats[i] - now) * 1000)
+        redis.call('SET', KEYS[i], tostring(new_tats[i]), 'PX', ttl_ms)
+        ahead[i + 1] = tostring(new_tats[i] - now)
+    end
+    return ahead
+    """
+
+    _MAX_BLOCKED_KEYS = 10_000
+
+    def __init__(self, redis_client, max_requests: int, window_seconds: int, name: str = ""):
+        self._redis = redis_client
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.name = name
+        self._emission_interval = window_seconds / max_requests
+        self._tolerance = window_seconds - self._emission_interval
+        self._script = self._redis.register_script(self._LUA_SCRIPT)
+        self._blocked_until: dict[str, float] = {}
+        self._blocked_lock = threading.Lock()
+        self._fallback = GCRARateLimiter(max_requests, window_seconds, name)
+
+    def _redis_key(self, key: str) -> str:
+        return f"ratelimit:gcra:{self.name}:{{{key}}}"
+
+    def _blocked_locally(self, key: str, now: float) -> float:
+        """Seconds this key must still wait according to the local cache (0 if not cached)."""
+        with self._blocked_lock:
+            until = self._blocked_until.get(key)
+            if until is None:
+                return 0.0
+            if until <= now:
+                del self._blocked_until[key]
+                return 0.0
+            return until - now
+
+    def _block_locally(self, key: str, retry_after: float, now: float) -> None:
+        with self._blocked_lock:
+            if len(self._blocked_until) >= self._MAX_BLOCKED_KEYS:
+                expired = [k for k, until in self._blocked_until.items() if until <= now]
+                for k in expired:
+                    del self._blocked_until[k]
+                if len(self._blocked_until) >= self._MAX_BLOCKED_KEYS:
+                    return
+            self._blocked_until[key] = now + retry_after
+
+    @staticmethod
+    def _prepare(checks: list[tuple["_RedisGCRABase", str]], now: float) -> tuple[list[str], list[float]]:
+        """Reject locally cached keys and build the script's KEYS/ARGV."""
+        for limiter, key in checks:
+            wait = limiter._blocked_locally(key, now)
+            if wait:
+                result = _record(_gcra_result(limiter, wait + limiter._tolerance, rejected=True))
+                raise _too_many_requests(result, limiter.window_seconds)
+        args: list[float] = []
+        for limiter, _ in checks:
+            args += [limiter._emission_interval, limiter._tolerance]
+        return [limiter._redis_key(key) for limiter, key in checks], args
+
+    @staticmethod
+    def _apply_result(checks: list[tuple["_RedisGCRABase", str]], reply, now: float) -> list[RateLimitResult]:
+        denied_index = int(reply[0])
+        if denied_index:
+            limiter, key = checks[denied_index - 1]
+            result = _record(_gcra_result(limiter, float(reply[1]), rejected=True))
+            limiter._block_locally(key, result.retry_after, now)
+            raise _too_many_requests(result, limiter.window_seconds)
+        return [
+            _record(_gcra_result(limiter, float(ahead), rejected=False))
+            for (limiter, _), ahead in zip(checks, reply[1:])
+        ]
+
+    @staticmethod
+    def _check_fallback(checks: list[tuple["_RedisGCRABase", str]]) -> list[RateLimitResult]:
+        return [limiter._fallback.check(key) for limiter, key in checks]
+
+    @staticmethod
+    def _by_slot(checks: list[tuple["_RedisGCRABase", str]], now: float) -> list[tuple[list, list[str], list[float]]]:
+        """Group checks by limited entity (hash tag), in order of first appearance, with each group's KEYS/ARGV.
+
+        Raises for locally cached rejections before anything is sent.
+        """
+        groups: dict[str, list[tuple[_RedisGCRABase, str]]] = {}
+        for limiter, key in checks:
+            groups.setdefault(key, []).append((limiter, key))
+        return [(group, *_RedisGCRABase._prepare(group, now)) for group in groups.values()]
+
+    @staticmethod
+    def _pipeline(checks: list[tuple["_RedisGCRABase", str]], groups: list):
+        """A pipeline with one EVALSHA per group queued on it."""
+        limiter = checks[0][0]
+        pipe = limiter._redis.pipeline(transaction=False)
+        for _, keys, args in groups:
+            pipe.evalsha(limiter._script.sha, len(keys), *keys, *args)
+        return pipe
+
+    @staticmethod
+    def _apply_replies(groups: list, replies: list, now: float) -> list[RateLimitResult]:
+        results: list[RateLimitResult] = []
+        for (group, _, _), reply in zip(groups, replies):
+            if isinstance(reply, Exception):
+                raise reply
+            results += _RedisGCRABase._apply_result(group, reply, now)
+        return results
+
+
+class RedisGCRARateLimiter(_RedisGCRABase):
+    """GCRA rate limiter backed by a single Redis string per key (blocking client)."""
+
+    @staticmethod
+    def check_many(checks: list[tuple["RedisGCRARateLimiter", str]]) -> list[RateLimitResult]:
+        """Check several (limiter, key) pairs that share a Redis client, in one round trip.
+
+        Pairs on the same key run in one script call: either all of them are
+        charged or none is.  Each further key adds a call to the same
+        pipeline and is charged on its own; a 429 is raised for the first
+        limiter, in order, that rejects.
+        """
+        now = time.monotonic()
+        groups = _RedisGCRABase._by_slot(checks, now)
+        if not _redis_usable(now):
+            return _RedisGCRABase._check_fallback(checks)
+        script = checks[0][0]._script
+        try:
+            if len(groups) == 1:
+                _, keys, args = groups[0]
+                replies = [script(keys=keys, args=args)]
+            else:
+                replies = _RedisGCRABase._pipeline(checks, groups).execute(raise_on_error=False)
+                # Scripts flushed from the server: load and run again, for those groups only
+                replies = [
+                    script(keys=keys, args=args) if isinstance(reply, _NoScriptError) else reply
+                    for reply, (_, keys, args) in zip(replies, groups)
+                ]
+        except _REDIS_CONNECTION_ERRORS as exc:
+            _mark_redis_down(exc)
+            return _RedisGCRABase._check_fallback(checks)
+        return _RedisGCRABase._apply_replies(groups, replies, now)
+
+    def check(self, key: str) -> RateLimitResult:
+        return self.check_many([(self, key)])[0]
+
+
+class AsyncRedisGCRARateLimiter(_RedisGCRABase):
+    """GCRA rate limiter on a ``redis.asyncio`` connection pool.
+
+    ``acheck`` awaits the Redis round trip instead of blocking a worker
+    thread, so it can be used from async routes and dependencies.
+    """
+
+    @staticmethod
+    async def acheck_many(checks: list[tuple["AsyncRedisGCRARateLimiter", str]]) -> list[RateLimitResult]:
+        """Async counterpart of ``RedisGCRARateLimiter.check_many``."""
+        now = time.monotonic()
+        groups = _RedisGCRABase._by_slot(checks, now)
+        if not _redis_usable(now):
+            return _RedisGCRABase._check_fallback(checks)
+        script = checks[0][0]._script
+        try:
+            if len(groups) == 1:
+                _, keys, args = groups[0]
+                replies = [await script(keys=keys, args=args)]
+            else:
+                replies = await _RedisGCRABase._pipeline(checks, groups).execute(raise_on_error=False)
+                replies = [
+                    await script(keys=keys, args=args) if isinstance(reply, _NoScriptError) else reply
+                    for reply, (_, keys, args) in zip(replies, groups)
+                ]
+        except _REDIS_CONNECTION_ERRORS as exc:
+            _mark_redis_down(exc)
+            return _RedisGCRABase._check_fallback(checks)
+        return _RedisGCRABase._apply_replies(groups, replies, now)
+
+    async def acheck(self, key: str) -> RateLimitResult:
+        return (await self.acheck_many([(self, key)]))[0]
 
 
 # ---------------------------------------------------------------------------
-# Factory — tries Redis, falls back to in-memory
+# Connection management — lazy clients that recover when Redis comes back
 # ---------------------------------------------------------------------------
 
+try:
+    from redis.exceptions import (
+        ConnectionError as _RedisConnectionError,
+        NoScriptError as _NoScriptError,
+        TimeoutError as _RedisTimeoutError,
+    )
+
+    _REDIS_CONNECTION_ERRORS: tuple[type[Exception], ...] = (_RedisConnectionError, _RedisTimeoutError, OSError)
+except ImportError:  # redis is optional when REDIS_URL is unset
+    _REDIS_CONNECTION_ERRORS = (OSError,)
+
+    class _NoScriptError(Exception):
+        pass
+
+_REDIS_RETRY_INTERVAL = 5.0  # seconds to stay on the local fallback after a failure
+
 _redis_client = None
-_redis_available: bool | None = None  # None = not yet checked
+_async_redis_client = None
+_redis_down_until: float = 0.0
+
+
+def _redis_usable(now: float) -> bool:
+    return now >= _redis_down_until
+
+
+def _mark_redis_down(exc: Exception) -> None:
+    """Route checks to the in-memory fallback for a while after a connection failure."""
+    global _redis_down_until
+    if _redis_usable(time.monotonic()):
+        logger.warning(
+            "Redis unavailable (%s), using in-memory rate limiting for %.0fs",
+            exc, _REDIS_RETRY_INTERVAL,
+        )
+    _redis_down_until = time.monotonic() + _REDIS_RETRY_INTERVAL
 
 
 def _get_redis_client():
-    """Lazily connect to Redis.  Returns the client or None."""
-    global _redis_client, _redis_available
+    """Return the shared blocking Redis client, or None if Redis is not configured.
+
+    The client connects lazily and redis-py reconnects on the next command
+    after a dropped connection, so a Redis outage at startup no longer pins
+    the process to in-memory limiting.
+    """
+    global _redis_client
 
-    if _redis_available is False:
-        return None
     if _redis_client is not None:
         return _redis_client
 
     from app.config import settings
 
     if not settings.REDIS_URL:
-        _redis_available = False
         return None
 
     try:
         import redis
+    except ImportError:
+        logger.warning("REDIS_URL is set but the redis package is not installed; using in-memory rate limiting")
+        return None
 
-        _redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True, socket_connect_timeout=2)
-        _redis_client.ping()
-        _redis_available = True
-        logger.info("Redis connected for rate limiting: %s", settings.REDIS_URL)
-        return _redis_client
-    except Exception as exc:
-        logger.warning("Redis unavailable (%s), falling back to in-memory rate limiting", exc)
-        _redis_available = False
+    _redis_client = redis.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        socket_connect_timeout=2,
+        socket_timeout=2,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+    )
+    logger.info("Redis rate limiting configured: %s", settings.REDIS_URL)
+    return _redis_client
+
+
+def _get_async_redis_client():
+    """Return the shared ``redis.asyncio`` client backed by a connection pool, or None."""
+    global _async_redis_client
+
+    if _async_redis_client is not None:
+        return _async_redis_client
+
+    from app.config import settings
+
+    if not settings.REDIS_URL:
+        return None
+
+    try:
+        import redis.asyncio
+    except ImportError:
+        logger.warning("REDIS_URL is set but the redis package is not installed; using in-memory rate limiting")
         return None
 
+    pool = redis.asyncio.ConnectionPool.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        socket_connect_timeout=2,
+        socket_timeout=2,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+    )
+    _async_redis_client = redis.asyncio.Redis(connection_pool=pool)
+    return _async_redis_client
+
+
+async def close_async_redis() -> None:
+    """Release the asyncio connection pool (called on application shutdown)."""
+    global _async_redis_client
+    if _async_redis_client is not None:
+        await _async_redis_client.aclose()
+        _async_redis_client = None
+
+
+# ---------------------------------------------------------------------------
+# Factory — Redis-backed when configured, in-memory otherwise
+# ---------------------------------------------------------------------------
+
 
 def create_rate_limiter(max_requests: int, window_seconds: int, name: str = ""):
-    """Create a rate limiter — Redis-backed if available, in-memory otherwise."""
+    """Create a rate limiter — Redis-backed if configured, in-memory otherwise."""
     client = _get_redis_client()
     if client is not None:
-        return RedisRateLimiter(client, max_requests, window_seconds, name)
-    return InMemoryRateLimiter(max_requests, window_seconds, name)
+        return RedisGCRARateLimiter(client, max_requests, window_seconds, name)
+    return GCRARateLimiter(max_requests, window_seconds, name)
+
+
+def create_async_rate_limiter(max_requests: int, window_seconds: int, name: str = ""):
+    """Create a limiter exposing ``await limiter.acheck(key)`` for async code paths."""
+    client = _get_async_redis_client()
+    if client is not None:
+        return AsyncRedisGCRARateLimiter(client, max_requests, window_seconds, name)
+    return GCRARateLimiter(max_requests, window_seconds, name)
+
+
+def check_rate_limits(*checks: tuple) -> list[RateLimitResult]:
+    """Apply several ``(limiter, key)`` checks, raising 429 on the first rejection.
+
+    When every limiter is Redis-backed on the same connection, all checks go
+    to Redis in a single round trip; otherwise they run in order.
+    """
+    if checks and all(
+        isinstance(limiter, RedisGCRARateLimiter) and limiter._redis is checks[0][0]._redis
+        for limiter, _ in checks
+    ):
+        return RedisGCRARateLimiter.check_many(list(checks))
+    return [limiter.check(key) for limiter, key in checks]
 
 
 # Pre-built limiters used by routers
@@ -154,4 +687,5 @@ chat_rate_limiter = create_rate_limiter(max_requests=30, window_seconds=60, name
 auth_rate_limiter = create_rate_limiter(max_requests=10, window_seconds=60, name="auth")
 # IP-based limiter for auth endpoints — prevents lockout attacks via email
 auth_ip_rate_limiter = create_rate_limiter(max_requests=30, window_seconds=60, name="auth_ip")
-message_rate_limiter = create_rate_limiter(max_requests=60, window_seconds=60, name="msg")
+# Applied through the rate_limit_user dependency, so it may be asyncio-backed
+message_rate_limiter = create_async_rate_limiter(max_requests=60, window_seconds=60, name="msg")
@@ -0,0 +1,18 @@
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+class PrebuiltResponse(Response):
+    """JSON response for a response model the route assembled itself.
+
+    Returning a ``Response`` makes FastAPI skip ``response_model``: the model
+    is not dumped, re-validated and run through ``jsonable_encoder``, but
+    serialized once, straight to bytes, by pydantic-core.  Only for models
+    built by ``app.utils.profile_builder`` and friends, whose fields are
+    already the right types.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return content.__pydantic_serializer__.to_json(content)
@@ -0,0 +1,53 @@
+"""Short-lived signed links to the photo route.
+
+An ``<Image>`` tag cannot send an ``Authorization`` header, so photo URLs in
+API responses carry ``exp`` and ``sig`` query parameters instead: an HMAC of
+the photo, variant and expiry under ``SECRET_KEY``.  Like a pre-signed S3
+URL, the link works for whoever holds it until it expires.  The response that
+handed it out already applied the viewer's blocks.
+
+Expiries are rounded up to the end of the next ``PHOTO_URL_TTL`` window, so a
+photo keeps the same URL for a whole window and client image caches hit.
+A link is valid for between one and two windows.  Responses that carry
+photo links put ``link_window()`` in their ETag, so a revalidation in a later
+window gets fresh links instead of a 304 for the old ones.
+"""
+import base64
+import hashlib
+import hmac
+import time
+
+from app.config import settings
+
+
+def _signature(photo_id: str, variant: str, exp: int) -> str:
+    message = f"{photo_id}:{variant}:{exp}".encode()
+    digest = hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:16]).rstrip(b"=").decode()
+
+
+def photo_link_query(photo_id: str, variant: str, now: float | None = None) -> str:
+    """``exp=...&sig=...`` for a link to ``photo_id``'s ``variant``."""
+    window = settings.PHOTO_URL_TTL
+    exp = (int(now if now is not None else time.time()) // window + 2) * window
+    return f"exp={exp}&sig={_signature(photo_id, variant, exp)}"
+
+
+def link_window(now: float | None = None) -> int:
+    """Index of the current window; a photo link handed out in it is valid until the window ends.
+
+    Pre-signed S3 URLs last ``S3_PRESIGN_EXPIRES`` from when they are made,
+    so with S3 and no CDN that is the window instead.
+    """
+    seconds = settings.PHOTO_URL_TTL
+    if settings.STORAGE_BACKEND == "s3" and not settings.STORAGE_PUBLIC_URL:
+        seconds = settings.S3_PRESIGN_EXPIRES
+    return int(now if now is not None else time.time()) // seconds
+
+
+def verify_photo_link(photo_id: str, variant: str, exp: int | None, sig: str | None, now: float | None = None) -> bool:
+    if exp is None or not sig:
+        return False
+    if exp <= (now if now is not None else time.time()):
+        return False
+    return hmac.compare_digest(sig, _signature(photo_id, variant, exp))
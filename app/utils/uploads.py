@@ -0,0 +1,170 @@
+"""Streaming multipart uploads.
+
+Starlette parses a multipart body in full before the endpoint runs, spooling
+each file to memory and then to a temporary file.  ``receive_file`` reads
+the request stream itself instead: the one expected file field is checked
+and written to disk as it arrives, and the request is rejected as soon as it
+breaks a limit, without reading the rest of the body.  Other fields are
+ignored.
+"""
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from fastapi import HTTPException, Request, status
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+# Boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 16 * 1024
+# Enough of the file for any magic-byte check
+HEAD_SIZE = 16
+
+
+@dataclass(frozen=True, slots=True)
+class ReceivedFile:
+    path: Path
+    filename: str
+    content_type: str
+    size: int
+    sha256: str
+
+
+class _FilePart:
+    """``MultipartParser`` callbacks collecting the data of one file field."""
+
+    def __init__(self, field: str, max_size: int, too_large: str, accept: Callable[[str, str], Path]):
+        self.field = field
+        self.max_size = max_size
+        self.too_large = too_large
+        self.accept = accept
+        self.dest: Path | None = None
+        self.filename = ""
+        self.content_type = ""
+        self.size = 0
+        self.pending: list[bytes] = []
+        self.finished = False
+        self._in_field = False
+        self._headers: dict[bytes, bytes] = {}
+        self._header_name = b""
+        self._header_value = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if self.dest is not None or b"filename" not in options:
+            return
+        if options.get(b"name", b"").decode("latin-1") != self.field:
+            return
+        self.filename = options[b"filename"].decode("utf-8", "replace")
+        self.content_type = self._headers.get(b"content-type", b"").decode("latin-1")
+        self.dest = self.accept(self.filename, self.content_type)
+        self._in_field = True
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._in_field:
+            return
+        self.size += end - start
+        if self.size > self.max_size:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=self.too_large)
+        self.pending.append(data[start:end])
+
+    def on_part_end(self) -> None:
+        if self._in_field:
+            self._in_field = False
+            self.finished = True
+
+
+async def receive_file(
+    request: Request,
+    field: str,
+    *,
+    max_size: int,
+    too_large: str,
+    accept: Callable[[str, str], Path],
+    check_head: Callable[[bytes], None],
+) -> ReceivedFile:
+    """Stream the file in multipart field ``field`` to disk and return where it went.
+
+    ``accept(filename, content_type)`` runs on the part headers and returns
+    the destination path, or raises to refuse the file.  ``check_head`` gets
+    the first ``HEAD_SIZE`` bytes before anything is written.  A
+    ``Content-Length`` past ``max_size`` is refused before the body is read,
+    and the body is abandoned once the file grows past it.  The data goes to
+    a temp file next to the destination and is renamed into place only once
+    complete.
+    """
+    mime_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if mime_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a multipart/form-data upload")
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > max_size + MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=too_large)
+
+    part = _FilePart(field, max_size, too_large, accept)
+    parser = MultipartParser(params[b"boundary"], part.callbacks())
+    digest = hashlib.sha256()
+    head = b""
+    tmp = None
+
+    def write(data: bytes) -> None:
+        tmp.write(data)
+        digest.update(data)
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if not part.pending:
+                continue
+            data = b"".join(part.pending)
+            part.pending.clear()
+            if tmp is None:
+                head += data
+                if len(head) < HEAD_SIZE and not part.finished:
+                    continue
+                check_head(head[:HEAD_SIZE])
+                part.dest.parent.mkdir(parents=True, exist_ok=True)
+                tmp = tempfile.NamedTemporaryFile(dir=part.dest.parent, prefix=".upload-", suffix=".part", delete=False)
+                data, head = head, b""
+            await run_in_threadpool(write, data)
+            if part.finished:
+                break
+        if part.dest is None:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Missing file field {field!r}")
+        if tmp is None:
+            check_head(head)  # shorter than HEAD_SIZE
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty upload")
+        tmp.close()
+        os.replace(tmp.name, part.dest)
+    except BaseException:
+        if tmp is not None:
+            tmp.close()
+            Path(tmp.name).unlink(missing_ok=True)
+        raise
+    return ReceivedFile(part.dest, part.filename, part.content_type, part.size, digest.hexdigest())
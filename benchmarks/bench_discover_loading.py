@@ -0,0 +1,160 @@
+"""Benchmark how discover loads its candidates and its page (limit=50).
+
+Seeds onboarded candidates with full profiles and photos in a throwaway
+database. It then loads the over-fetch set (300 rows) and materializes
+the first 50 as a page three ways. For each it reports the SQL
+statements sent, the median time and the peak memory allocated:
+
+  subqueryload  the original loading: full User objects for the whole
+                over-fetch set, with subqueryload(User.profile) and
+                subqueryload(User.photos) re-running the filtered candidate
+                query twice more
+  cold          discover's two phases with an empty profile-card cache:
+                compact filter/scoring tuples for the over-fetch set in one
+                query, then full rows, photos and profiles for the page only
+  warm          the same with every card of the page cached
+
+Scoring and filtering are left out. They cost the same on every path,
+and on this data they are larger than the loading itself.
+
+    python -m benchmarks.bench_discover_loading [--candidates 300] [--repeat 50]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, subqueryload
+
+from app.database import Base
+from app.models.conversation import ConversationState
+from app.models.profile import UserProfile
+from app.models.user import User, UserPhoto
+from app.routers.discover import _candidate_query, _load_candidates, _page_users
+from app.services.card_service import card_cache
+from app.services.chat_service import ONBOARDING_COMPLETED
+from app.utils.profile_builder import build_discover_user
+
+LIMIT = 50
+SQL_LIMIT = LIMIT * 5 + 50  # discover's over-fetch for the first page
+
+
+def _user(email: str, gender: str, preference: str, i: int) -> User:
+    user = User(
+        email=email, hashed_password="$2b$12$" + "x" * 53, display_name=f"User {i}",
+        date_of_birth=date(1994, 1 + i % 12, 1 + i % 28), gender=gender, gender_preference=preference,
+        location="Brooklyn, NY", latitude=40.68 + i * 1e-4, longitude=-73.94, height_inches=66,
+        home_town="Austin", job_title="Engineer", college_university="State U",
+        languages='["English", "Spanish"]', religion="Agnostic", drinking="Socially",
+        relationship_goals="Long-term", hidden_fields='["religion"]', profile_setup_complete=True,
+    )
+    user.profile = UserProfile(
+        bio="Hiking, coffee and long conversations about books. " * 3,
+        interests=f'["hiking", "reading", "coffee", "travel", "topic{i % 7}"]',
+        values='["honesty", "curiosity", "kindness"]',
+        personality_traits='["introverted", "thoughtful", "funny"]',
+        relationship_goals="Long-term", communication_style="Direct",
+        deal_breakers='["smoking"]', life_goals='["travel the world", "start a family"]',
+        dating_style="Slow and intentional. " * 10,
+        conversation_highlights='["' + "A long story about a road trip. " * 20 + '"]',
+        profile_completeness=0.9,
+    )
+    user.photos = [
+        UserPhoto(file_path=f"blobs/ab/{i:060d}{n}_full.webp", is_primary=n == 0, order_index=n)
+        for n in range(4)
+    ]
+    return user
+
+
+def _seed(Session, n_candidates: int) -> str:
+    session = Session()
+    viewer = _user("viewer@example.com", "male", '["female"]', 0)
+    users = [viewer] + [_user(f"c{i}@example.com", "female", '["male"]', i) for i in range(n_candidates)]
+    session.add_all(users)
+    session.flush()
+    session.add_all(ConversationState(user_id=u.id, onboarding_status=ONBOARDING_COMPLETED) for u in users)
+    session.commit()
+    viewer_id = viewer.id
+    session.close()
+    return viewer_id
+
+
+def _subqueryload_page(db, viewer: User) -> list:
+    """The previous discover loading."""
+    candidates = (
+        _candidate_query(db, viewer)
+        .options(subqueryload(User.profile), subqueryload(User.photos))
+        .limit(SQL_LIMIT)
+        .all()
+    )
+    return [build_discover_user(c, 0.5) for c in candidates[:LIMIT]]
+
+
+def _two_phase_page(db, viewer: User) -> list:
+    candidates = _load_candidates(db, viewer, SQL_LIMIT)
+    return _page_users(db, [(user_id, 0.5, None) for user_id in candidates.ids[:LIMIT]], "full")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        viewer_id = _seed(Session, args.candidates)
+
+        log: list[str] = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _count(conn, cursor, statement, *args):
+            log.append(statement)
+
+        paths = {
+            "subqueryload": (_subqueryload_page, card_cache.clear),
+            "cold": (_two_phase_page, card_cache.clear),
+            "warm": (_two_phase_page, lambda: None),
+        }
+        print(f"discover page: {LIMIT} of {min(SQL_LIMIT, args.candidates)} loaded candidates")
+        baseline = None
+        for label, (run, before) in paths.items():
+            statements = []
+            samples = []
+            for i in range(args.repeat + 1):
+                before()
+                db = Session()
+                viewer = db.get(User, viewer_id)
+                log.clear()
+                start = time.perf_counter()
+                run(db, viewer)
+                elapsed = time.perf_counter() - start
+                statements = list(log)
+                db.close()
+                if i:  # the first run warms up
+                    samples.append(elapsed)
+            median = statistics.median(samples)
+            baseline = baseline or median
+
+            # One more run, traced: tracemalloc would skew the timings above
+            before()
+            db = Session()
+            viewer = db.get(User, viewer_id)
+            tracemalloc.start()
+            run(db, viewer)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            db.close()
+            print(f"  {label:<13} {len(statements):>2} statements  {median * 1000:>7.2f} ms  ({baseline / median:.1f}x)"
+                  f"  peak {peak / 1024:>6.0f} KiB")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
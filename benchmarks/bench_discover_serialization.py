@@ -0,0 +1,121 @@
+"""Benchmark serializing a full discover page (limit=50).
+
+Loads 50 onboarded candidates with profiles and photos from a throwaway
+database, then times turning them into response bytes three ways:
+
+  fastapi+json    cards built, then FastAPI's response_model path (dump,
+                  re-validate, jsonable_encoder) and the stdlib JSONResponse
+  fastapi+orjson  the same with ORJSONResponse, the app's default class now
+  prebuilt        cards built with model_construct and PrebuiltResponse, as
+                  the discover route does
+
+    python -m benchmarks.bench_discover_serialization [--users 50] [--repeat 200]
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, subqueryload
+
+from app.database import Base
+from app.main import app
+from app.models.profile import UserProfile
+from app.models.user import User, UserPhoto
+from app.schemas.discover import DiscoverResponse
+from app.utils.profile_builder import build_discover_user
+from app.utils.responses import PrebuiltResponse
+
+
+def _seed(Session, n_users: int) -> None:
+    session = Session()
+    for i in range(n_users):
+        user = User(
+            email=f"ser{i}@example.com", hashed_password="x", display_name=f"User {i}",
+            gender="female", gender_preference='["male"]', location="Brooklyn, NY",
+            height_inches=66, home_town="Austin", job_title="Engineer", college_university="State U",
+            languages='["English", "Spanish"]', religion="Agnostic", drinking="Socially",
+            relationship_goals="Long-term", hidden_fields='["religion"]', profile_setup_complete=True,
+        )
+        user.profile = UserProfile(
+            bio="Hiking, coffee and long conversations about books. " * 3,
+            interests='["hiking", "reading", "coffee", "travel", "music"]',
+            values='["honesty", "curiosity", "kindness"]',
+            personality_traits='["introverted", "thoughtful", "funny"]',
+            relationship_goals="Long-term", communication_style="Direct", profile_completeness=0.9,
+        )
+        user.photos = [
+            UserPhoto(
+                file_path=f"blobs/ab/{i:060d}{n}_full.webp",
+                variants=(f'{{"full": "blobs/ab/{i:060d}{n}_full.webp", "medium": "blobs/ab/{i:060d}{n}_medium.webp", '
+                          f'"thumb": "blobs/ab/{i:060d}{n}_thumb.webp"}}'),
+                is_primary=n == 0, order_index=n,
+            )
+            for n in range(4)
+        ]
+        session.add(user)
+    session.commit()
+    session.close()
+
+
+def _time(fn, repeat: int) -> list[float]:
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    route = next(r for r in app.routes if getattr(r, "path", None) == "/api/v1/discover")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        _seed(Session, args.users)
+        session = Session()
+        users = session.query(User).options(subqueryload(User.profile), subqueryload(User.photos)).all()
+
+        def _page() -> DiscoverResponse:
+            cards = [build_discover_user(u, 0.5 + i / 1000, 3.2) for i, u in enumerate(users)]
+            return DiscoverResponse.model_construct(users=cards, total=len(cards), limit=args.users, offset=0)
+
+        def _fastapi(response_class):
+            def _run():
+                content = asyncio.run(serialize_response(
+                    field=route.response_field, response_content=_page(), is_coroutine=True,
+                ))
+                return response_class(content).body
+            return _run
+
+        paths = {
+            "fastapi+json": _fastapi(JSONResponse),
+            "fastapi+orjson": _fastapi(ORJSONResponse),
+            "prebuilt": lambda: PrebuiltResponse(_page()).body,
+        }
+        size = len(PrebuiltResponse(_page()).body)
+        print(f"discover page: {args.users} users, {size / 1024:.1f} KiB of JSON")
+        baseline = None
+        for label, fn in paths.items():
+            median = statistics.median(_time(fn, args.repeat))
+            baseline = baseline or median
+            print(f"  {label:<15} {median * 1000:>7.2f} ms  ({baseline / median:.1f}x)")
+        session.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
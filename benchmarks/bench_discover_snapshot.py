@@ -0,0 +1,107 @@
+"""Benchmark discover filtering and scoring: SQL window vs candidate snapshot.
+
+Seeds onboarded candidates (the profiles of bench_discover_loading, with
+varied genders, preferences and locations) in a throwaway database.  For a
+first page (offset 0) and a deep page (offset 1000) of 50 it then times:
+
+  sql       the over-fetch window read with the filter/scoring query, then
+            Python filters and compatibility_from_tokens per candidate
+  snapshot  every candidate as masks over the in-memory NumPy snapshot,
+            after one likes/matches/blocks lookup for the viewer, ranked
+            down to the shortlist that can reach the page
+
+Loading the returned page is left out: it is the same on both paths.  The
+one-off snapshot build is reported separately.
+
+    python -m benchmarks.bench_discover_snapshot [--candidates 5000] [--repeat 20]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.conversation import ConversationState
+from app.models.user import User
+from app.routers.discover import _snapshot_scores, _sql_scores
+from app.services.chat_service import ONBOARDING_COMPLETED
+from app.services.matching_service import profile_tokens
+from app.services.snapshot_service import SnapshotColumns, _eligible_rows, _Vocabularies
+from benchmarks.bench_discover_loading import _user
+
+LIMIT = 50
+
+
+def _seed(Session, n_candidates: int) -> str:
+    session = Session()
+    viewer = _user("viewer@example.com", "male", '["female", "non-binary"]', 0)
+    genders = ["female", "female", "non-binary", "male"]
+    preferences = ['["male"]', '["male", "female"]', None, '["female"]']
+    users = [viewer]
+    for i in range(n_candidates):
+        user = _user(f"c{i}@example.com", genders[i % 4], preferences[i % 3], i)
+        user.latitude, user.longitude = 40.3 + (i % 97) * 0.01, -74.4 + (i % 89) * 0.01
+        users.append(user)
+    session.add_all(users)
+    session.flush()
+    session.add_all(ConversationState(user_id=u.id, onboarding_status=ONBOARDING_COMPLETED) for u in users)
+    session.commit()
+    viewer_id = viewer.id
+    session.close()
+    return viewer_id
+
+
+def _median_ms(fn, repeat: int) -> float:
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        viewer_id = _seed(Session, args.candidates)
+
+        db = Session()
+        viewer = db.get(User, viewer_id)
+        user_tokens = profile_tokens(viewer.profile)
+
+        start = time.perf_counter()
+        columns = SnapshotColumns.encode(_eligible_rows(db), _Vocabularies())
+        print(f"snapshot of {len(columns)} users built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        for offset in (0, 1000):
+            sql_limit = (offset + LIMIT) * 5 + 50
+            sql = _median_ms(lambda: _sql_scores(db, viewer, sql_limit, user_tokens), args.repeat)
+            snapshot = _median_ms(
+                lambda: _snapshot_scores(db, viewer, columns, offset + LIMIT, user_tokens, now), args.repeat,
+            )
+            window = len(_sql_scores(db, viewer, sql_limit, user_tokens)[0])
+            total = _snapshot_scores(db, viewer, columns, offset + LIMIT, user_tokens, now)[1]
+            print(f"offset {offset:>4} ({window} of {min(sql_limit, args.candidates)} in the window pass the filters,"
+                  f" {total} of {args.candidates} in the snapshot)")
+            print(f"  sql       {sql:>8.2f} ms")
+            print(f"  snapshot  {snapshot:>8.2f} ms  ({sql / snapshot:.1f}x)")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Benchmark the write-heavy like and message endpoints under two SQLite profiles.
+
+Compares the previous engine setup (foreign_keys + WAL only, default
+synchronous=FULL) with the tuned profile from ``app.database.sqlite_pragmas``
+on a file-backed database, driving the real routes concurrently.  A raw
+single-row commit loop is reported alongside: it isolates the per-commit
+fsync cost the profile removes, which the endpoint numbers only show on
+disks where fsync is expensive relative to request handling.
+
+    python -m benchmarks.bench_write_endpoints [--users 60] [--workers 8]
+"""
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, configure_sqlite, engine_options, sqlite_pragmas
+from app.dependencies import get_db
+from app.main import app
+from app.models.match import Match
+from app.models.user import User
+from app.services.auth_service import create_access_token, hash_password
+from app.utils.rate_limiter import message_rate_limiter
+
+PROFILES = {
+    "baseline": ["PRAGMA foreign_keys=ON", "PRAGMA journal_mode=WAL"],
+    "tuned": sqlite_pragmas(),
+}
+
+
+def _seed(Session, n_users: int) -> list[tuple[str, str]]:
+    hashed = hash_password("password123")  # bcrypt once; every user shares it
+    session = Session()
+    users = [User(email=f"bench{i}@example.com", hashed_password=hashed, display_name=f"B{i}") for i in range(n_users)]
+    session.add_all(users)
+    session.commit()
+    out = [(u.id, create_access_token(u.id)) for u in users]
+    session.close()
+    return out
+
+
+def _run(workers: int, calls: list) -> tuple[float, list[float]]:
+    """Run ``calls`` (each returning a response) across threads; return wall time and latencies."""
+    local = threading.local()
+    latencies: list[float] = []
+
+    def _call(fn):
+        if not hasattr(local, "client"):
+            local.client = TestClient(app)
+        start = time.perf_counter()
+        r = fn(local.client)
+        latencies.append(time.perf_counter() - start)
+        assert r.status_code < 300, r.text
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(_call, calls))
+    return time.perf_counter() - start, latencies
+
+
+def _report(label: str, wall: float, latencies: list[float]) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"  {label:<9} {len(latencies):>5} req  {len(latencies) / wall:>8.1f} req/s  "
+        f"p50 {statistics.median(latencies) * 1000:>6.1f} ms  p95 {p95 * 1000:>6.1f} ms"
+    )
+
+
+def _bench_commits(engine, n: int = 2000) -> None:
+    """Single-row commits on one connection: isolates the storage cost the pragmas change."""
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE bench_commit (id INTEGER PRIMARY KEY, v TEXT)"))
+        conn.commit()
+        start = time.perf_counter()
+        for i in range(n):
+            conn.execute(text("INSERT INTO bench_commit (v) VALUES (:v)"), {"v": str(i)})
+            conn.commit()
+        wall = time.perf_counter() - start
+    print(f"  {'commit':<9} {n:>5} txn  {n / wall:>8.1f} txn/s")
+
+
+def bench_profile(name: str, pragmas: list[str], n_users: int, workers: int, likes_per_user: int, root: str) -> None:
+    with tempfile.TemporaryDirectory(dir=root) as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = create_engine(url, **engine_options(url))
+        configure_sqlite(engine, pragmas)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def _override():
+            s = Session()
+            try:
+                yield s
+            finally:
+                s.close()
+
+        app.dependency_overrides[get_db] = _override
+        try:
+            users = _seed(Session, n_users)
+
+            # Every user likes its ``likes_per_user`` nearest neighbours on a
+            # ring, so every like is eventually reciprocated and half of the
+            # requests create a match.
+            like_calls = []
+            for i, (_, token) in enumerate(users):
+                neighbours = [
+                    users[(i + direction * step) % n_users][0]
+                    for step in range(1, likes_per_user // 2 + 1)
+                    for direction in (1, -1)
+                ]
+                for target in neighbours:
+                    like_calls.append(lambda c, t=token, target=target: c.post(
+                        "/api/v1/matches/like", json={"liked_user_id": target},
+                        headers={"Authorization": f"Bearer {t}"},
+                    ))
+            print(f"{name}: {' | '.join(p.removeprefix('PRAGMA ') for p in pragmas)}")
+            _bench_commits(engine)
+            wall, lat = _run(workers, like_calls)
+            _report("like", wall, lat)
+
+            session = Session()
+            matches = session.query(Match.id, Match.user1_id, Match.user2_id).all()
+            session.close()
+            tokens = dict(users)
+            # Alternate senders so each user stays under the 60/min message limit
+            message_rate_limiter.reset()
+            message_calls = [
+                lambda c, m=m_id, t=tokens[(u1, u2)[n % 2]]: c.post(
+                    f"/api/v1/matches/{m}/messages", json={"content": "hello there"},
+                    headers={"Authorization": f"Bearer {t}"},
+                )
+                for m_id, u1, u2 in matches
+                for n in range(6)
+            ]
+            wall, lat = _run(workers, message_calls)
+            _report("message", wall, lat)
+        finally:
+            app.dependency_overrides.clear()
+            engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=60)
+    parser.add_argument("--likes-per-user", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=2, help="interleaved repetitions of both profiles")
+    parser.add_argument("--dir", default=".", help="where to create the database; use a real disk, not tmpfs")
+    args = parser.parse_args()
+    for _ in range(args.rounds):
+        for name, pragmas in PROFILES.items():
+            bench_profile(name, pragmas, args.users, args.workers, args.likes_per_user, args.dir)
+
+
+if __name__ == "__main__":
+    main()
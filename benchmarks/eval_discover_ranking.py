@@ -0,0 +1,167 @@
+"""Offline evaluation of discover ranking: quality against latency.
+
+Seeds a synthetic population in a throwaway database: varied interests and
+values, locations, profile completeness and last activity.  Each viewer's
+candidates are filtered and scored by discover's own ``_sql_scores``, either
+over the default over-fetch window for the first page (newest users) or over
+every eligible candidate.
+
+Whether a viewer would like a candidate is simulated.  The hidden relevance
+model blends the same four signals with the ``--truth`` weights, plus
+deterministic per-pair noise.  For each ranking configuration the script
+reports, averaged over the viewers:
+
+  ndcg@K   ranked page against the ideal page of the full population
+  rel@K    mean simulated relevance of the page
+  heap ms  top_candidates (heapq.nlargest) over the pool
+  sort ms  a full sort of the pool, as discover did before
+
+    python -m benchmarks.eval_discover_ranking [--candidates 2000] [--viewers 20] [--k 10]
+"""
+import argparse
+import hashlib
+import math
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.conversation import ConversationState
+from app.models.profile import UserProfile
+from app.models.user import User
+from app.routers.discover import _sql_scores
+from app.services.chat_service import ONBOARDING_COMPLETED
+from app.services.matching_service import profile_tokens
+from app.services.ranking_service import rank_key, top_candidates
+
+CONFIGS = {
+    "compatibility": {"compatibility": 1.0},
+    "+distance": {"compatibility": 0.7, "distance": 0.3},
+    "+activity": {"compatibility": 0.7, "activity": 0.3},
+    "blend": {"compatibility": 0.5, "distance": 0.2, "completeness": 0.1, "activity": 0.2},
+}
+INTERESTS = ["hiking", "reading", "coffee", "travel", "music", "cooking", "chess", "yoga", "film", "art",
+             "running", "gaming", "dogs", "wine", "climbing", "photography"]
+VALUES = ["honesty", "curiosity", "kindness", "ambition", "family", "humor", "loyalty", "independence"]
+GOALS = ["Long-term", "Marriage", "Something casual", "Not sure yet"]
+STYLES = ["Direct", "Playful", "Thoughtful and slow", "Direct and open"]
+
+
+def _person(rng: random.Random, email: str, gender: str, preference: str, now: datetime) -> User:
+    user = User(
+        email=email, hashed_password="x", display_name=email.split("@")[0],
+        date_of_birth=date(rng.randint(1985, 2000), rng.randint(1, 12), rng.randint(1, 28)),
+        gender=gender, gender_preference=preference, max_distance_km=50,
+        latitude=40.7128 + rng.gauss(0, 0.15), longitude=-74.0060 + rng.gauss(0, 0.15),
+        profile_setup_complete=True,
+        created_at=now - timedelta(days=rng.uniform(0, 365)),
+    )
+    if rng.random() < 0.8:
+        user.last_active_at = now - timedelta(hours=rng.expovariate(1 / 96))
+    user.profile = UserProfile(
+        interests=str(rng.sample(INTERESTS, rng.randint(2, 6))).replace("'", '"'),
+        values=str(rng.sample(VALUES, rng.randint(1, 4))).replace("'", '"'),
+        relationship_goals=rng.choice(GOALS),
+        communication_style=rng.choice(STYLES),
+        profile_completeness=round(rng.uniform(0.2, 1.0), 1),
+    )
+    return user
+
+
+def _seed(Session, n_candidates: int, n_viewers: int, now: datetime) -> list[str]:
+    rng = random.Random(42)
+    session = Session()
+    viewers = [_person(rng, f"viewer{i}@example.com", "male", '["female"]', now) for i in range(n_viewers)]
+    candidates = [_person(rng, f"c{i}@example.com", "female", '["male"]', now) for i in range(n_candidates)]
+    session.add_all(viewers + candidates)
+    session.flush()
+    session.add_all(
+        ConversationState(user_id=u.id, onboarding_status=ONBOARDING_COMPLETED) for u in viewers + candidates
+    )
+    session.commit()
+    viewer_ids = [v.id for v in viewers]
+    session.close()
+    return viewer_ids
+
+
+def _noise(viewer_id: str, user_id: str) -> float:
+    digest = hashlib.blake2b(f"{viewer_id}:{user_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64 - 0.5
+
+
+def _ndcg(ranked: list[float], ideal: list[float]) -> float:
+    def dcg(gains):
+        return sum(g / math.log2(i + 2) for i, g in enumerate(gains))
+    best = dcg(ideal)
+    return dcg(ranked) / best if best else 0.0
+
+
+def _median_ms(fn, repeat: int = 5) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--viewers", type=int, default=20)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--truth", default="0.5,0.2,0.1,0.2",
+                        help="hidden relevance weights: compatibility,distance,completeness,activity")
+    args = parser.parse_args()
+    truth = dict(zip(("compatibility", "distance", "completeness", "activity"), map(float, args.truth.split(","))))
+    now = datetime.utcnow()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'eval.db'}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        viewer_ids = _seed(Session, args.candidates, args.viewers, now)
+        db = Session()
+
+        pools = {"window": args.k * 5 + 50, "all": args.candidates + args.viewers}
+        results = {(config, pool): ([], [], [], []) for config in CONFIGS for pool in pools}
+        for viewer_id in viewer_ids:
+            viewer = db.get(User, viewer_id)
+            tokens = profile_tokens(viewer.profile)
+            relevance_key = rank_key(truth, viewer.max_distance_km, now)
+
+            def relevance(c):
+                return relevance_key(c) + 0.2 * _noise(viewer_id, c.user_id)
+
+            everyone, _ = _sql_scores(db, viewer, pools["all"], tokens)
+            ideal = sorted((relevance(c) for c in everyone), reverse=True)[:args.k]
+            for pool_name, sql_limit in pools.items():
+                pool, _ = _sql_scores(db, viewer, sql_limit, tokens)
+                for config, weights in CONFIGS.items():
+                    ndcg, rel, heap_ms, sort_ms = results[(config, pool_name)]
+                    page = top_candidates(pool, args.k, weights, viewer.max_distance_km, now)
+                    gains = [relevance(c) for c in page]
+                    ndcg.append(_ndcg(gains, ideal))
+                    rel.append(statistics.fmean(gains) if gains else 0.0)
+                    key = rank_key(weights, viewer.max_distance_km, now)
+                    heap_ms.append(_median_ms(lambda: top_candidates(pool, args.k, weights, viewer.max_distance_km, now)))
+                    sort_ms.append(_median_ms(lambda: sorted(pool, key=key, reverse=True)[:args.k]))
+        db.close()
+        engine.dispose()
+
+    print(f"{args.viewers} viewers, {args.candidates} candidates, page of {args.k}; "
+          f"window = {pools['window']} newest candidates before filtering")
+    print(f"  {'ranking':<14} {'pool':<7} {'ndcg@k':>7} {'rel@k':>7} {'heap ms':>8} {'sort ms':>8}")
+    for (config, pool_name), (ndcg, rel, heap_ms, sort_ms) in results.items():
+        print(f"  {config:<14} {pool_name:<7} {statistics.fmean(ndcg):>7.3f} {statistics.fmean(rel):>7.3f}"
+              f" {statistics.fmean(heap_ms):>8.3f} {statistics.fmean(sort_ms):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Baseline: the schema as created by Base.metadata.create_all before migrations.
+
+Databases created that way are stamped at this revision on first startup.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('display_name', sa.String(length=100), nullable=True),
+    sa.Column('date_of_birth', sa.Date(), nullable=True),
+    sa.Column('gender', sa.String(length=50), nullable=True),
+    sa.Column('gender_preference', sa.Text(), nullable=True),
+    sa.Column('location', sa.String(length=100), nullable=True),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('max_distance_km', sa.Integer(), nullable=False),
+    sa.Column('age_range_min', sa.Integer(), nullable=False),
+    sa.Column('age_range_max', sa.Integer(), nullable=False),
+    sa.Column('height_inches', sa.Integer(), nullable=True),
+    sa.Column('height_pref_min', sa.Integer(), nullable=True),
+    sa.Column('height_pref_max', sa.Integer(), nullable=True),
+    sa.Column('religion_preference', sa.Text(), nullable=True),
+    sa.Column('dating_preferences_complete', sa.Boolean(), nullable=False),
+    sa.Column('home_town', sa.String(length=200), nullable=True),
+    sa.Column('sexual_orientation', sa.String(length=100), nullable=True),
+    sa.Column('job_title', sa.String(length=200), nullable=True),
+    sa.Column('college_university', sa.String(length=200), nullable=True),
+    sa.Column('education_level', sa.String(length=100), nullable=True),
+    sa.Column('languages', sa.Text(), nullable=True),
+    sa.Column('ethnicity', sa.String(length=100), nullable=True),
+    sa.Column('religion', sa.String(length=100), nullable=True),
+    sa.Column('children', sa.String(length=100), nullable=True),
+    sa.Column('family_plans', sa.String(length=100), nullable=True),
+    sa.Column('drinking', sa.String(length=50), nullable=True),
+    sa.Column('smoking', sa.String(length=50), nullable=True),
+    sa.Column('marijuana', sa.String(length=50), nullable=True),
+    sa.Column('drugs', sa.String(length=50), nullable=True),
+    sa.Column('relationship_goals', sa.String(length=100), nullable=True),
+    sa.Column('hidden_fields', sa.Text(), nullable=True),
+    sa.Column('profile_setup_complete', sa.Boolean(), nullable=False),
+    sa.Column('token_invalidated_at', sa.DateTime(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_index('ix_users_latitude', 'users', ['latitude'])
+    op.create_index('ix_users_longitude', 'users', ['longitude'])
+
+    op.create_table('blocked_users',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('blocker_id', sa.String(length=36), nullable=False),
+    sa.Column('blocked_id', sa.String(length=36), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['blocked_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['blocker_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('blocker_id', 'blocked_id')
+    )
+    op.create_index('ix_blocked_users_blocked_id', 'blocked_users', ['blocked_id'])
+    op.create_index('ix_blocked_users_blocker_id', 'blocked_users', ['blocker_id'])
+
+    op.create_table('conversation_messages',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('topic', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_conversation_messages_user_id', 'conversation_messages', ['user_id'])
+
+    op.create_table('conversation_state',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('current_topic', sa.String(length=50), nullable=False),
+    sa.Column('topics_completed', sa.Text(), nullable=True),
+    sa.Column('onboarding_status', sa.String(length=20), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_table('likes',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('liker_id', sa.String(length=36), nullable=False),
+    sa.Column('liked_id', sa.String(length=36), nullable=False),
+    sa.Column('is_pass', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['liked_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['liker_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('liker_id', 'liked_id')
+    )
+    op.create_index('ix_likes_liked_id', 'likes', ['liked_id'])
+    op.create_index('ix_likes_liker_id', 'likes', ['liker_id'])
+
+    op.create_table('matches',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user1_id', sa.String(length=36), nullable=False),
+    sa.Column('user2_id', sa.String(length=36), nullable=False),
+    sa.Column('compatibility_score', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user1_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['user2_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user1_id', 'user2_id')
+    )
+    op.create_index('ix_matches_user1_id', 'matches', ['user1_id'])
+    op.create_index('ix_matches_user2_id', 'matches', ['user2_id'])
+
+    op.create_table('user_photos',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('file_path', sa.String(length=500), nullable=False),
+    sa.Column('is_primary', sa.Boolean(), nullable=False),
+    sa.Column('order_index', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('user_profiles',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('bio', sa.Text(), nullable=True),
+    sa.Column('interests', sa.Text(), nullable=True),
+    sa.Column('values', sa.Text(), nullable=True),
+    sa.Column('personality_traits', sa.Text(), nullable=True),
+    sa.Column('relationship_goals', sa.Text(), nullable=True),
+    sa.Column('communication_style', sa.Text(), nullable=True),
+    sa.Column('deal_breakers', sa.Text(), nullable=True),
+    sa.Column('life_goals', sa.Text(), nullable=True),
+    sa.Column('dating_style', sa.Text(), nullable=True),
+    sa.Column('conversation_highlights', sa.Text(), nullable=True),
+    sa.Column('profile_completeness', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_table('direct_messages',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('match_id', sa.String(length=36), nullable=False),
+    sa.Column('sender_id', sa.String(length=36), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('read_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['match_id'], ['matches.id'], ),
+    sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_direct_messages_match_id', 'direct_messages', ['match_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_direct_messages_match_id', table_name='direct_messages')
+
+    op.drop_table('direct_messages')
+    op.drop_table('user_profiles')
+    op.drop_table('user_photos')
+    op.drop_index('ix_matches_user2_id', table_name='matches')
+    op.drop_index('ix_matches_user1_id', table_name='matches')
+
+    op.drop_table('matches')
+    op.drop_index('ix_likes_liker_id', table_name='likes')
+    op.drop_index('ix_likes_liked_id', table_name='likes')
+
+    op.drop_table('likes')
+    op.drop_table('conversation_state')
+    op.drop_index('ix_conversation_messages_user_id', table_name='conversation_messages')
+
+    op.drop_table('conversation_messages')
+    op.drop_index('ix_blocked_users_blocker_id', table_name='blocked_users')
+    op.drop_index('ix_blocked_users_blocked_id', table_name='blocked_users')
+
+    op.drop_table('blocked_users')
+    op.drop_index('ix_users_longitude', table_name='users')
+    op.drop_index('ix_users_latitude', table_name='users')
+
+    op.drop_table('users')
\ No newline at end of file
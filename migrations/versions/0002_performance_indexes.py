@@ -0,0 +1,52 @@
+"""Composite indexes for the hot queries.
+
+- likes(liker_id, liked_id, is_pass): duplicate and mutual-like checks
+- direct_messages(match_id, created_at): a match's messages in order
+- conversation_messages(user_id, created_at): onboarding chat history
+- matches(user1_id, created_at) / (user2_id, created_at): match list, newest first
+- user_photos(user_id, order_index): a user's photos in order
+- users(created_at) WHERE active and set up: discover's candidate scan
+
+On PostgreSQL the indexes are built CONCURRENTLY so existing tables stay
+writable during the upgrade.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_likes_liker_liked_pass', 'likes', ['liker_id', 'liked_id', 'is_pass'], {}),
+    ('ix_direct_messages_match_created', 'direct_messages', ['match_id', 'created_at'], {}),
+    ('ix_conversation_messages_user_created', 'conversation_messages', ['user_id', 'created_at'], {}),
+    ('ix_matches_user1_created', 'matches', ['user1_id', 'created_at'], {}),
+    ('ix_matches_user2_created', 'matches', ['user2_id', 'created_at'], {}),
+    ('ix_user_photos_user_order', 'user_photos', ['user_id', 'order_index'], {}),
+    ('ix_users_discoverable_created', 'users', ['created_at'], {
+        'sqlite_where': sa.text('is_active = 1 AND profile_setup_complete = 1'),
+        'postgresql_where': sa.text('is_active AND profile_setup_complete'),
+    }),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, **where)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
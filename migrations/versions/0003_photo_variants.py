@@ -0,0 +1,26 @@
+"""Store resized WebP variants of each photo.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('user_photos', sa.Column('variants', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('user_photos') as batch_op:
+        batch_op.drop_column('variants')
@@ -0,0 +1,38 @@
+"""Content-addressed photo blobs with reference counts.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'photo_blobs',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('file_path', sa.String(length=500), nullable=False),
+        sa.Column('variants', sa.Text(), nullable=True),
+        sa.Column('refcount', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('content_hash'),
+    )
+    op.add_column('user_photos', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_user_photos_content_hash', 'user_photos', ['content_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_photos_content_hash', table_name='user_photos')
+    with op.batch_alter_table('user_photos') as batch_op:
+        batch_op.drop_column('content_hash')
+    op.drop_table('photo_blobs')
@@ -141,7 +141,7 @@ export default function DiscoverScreen() {
       <View style={styles.card}>
         {primaryPhoto ? (
           <Image
-            source={{ uri: photoUrl(primaryPhoto.file_path) }}
+            source={{ uri: photoUrl(primaryPhoto.medium_url) }}
             style={styles.photo}
           />
         ) : (
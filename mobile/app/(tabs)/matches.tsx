@@ -58,7 +58,7 @@ export default function MatchesScreen() {
       >
         {photo ? (
           <Image
-            source={{ uri: photoUrl(photo.file_path) }}
+            source={{ uri: photoUrl(photo.thumbnail_url) }}
             style={styles.avatar}
           />
         ) : (
@@ -186,7 +186,7 @@ export default function ProfileScreen() {
             {profile.photos.map((photo) => (
               <View key={photo.id} style={styles.photoItem}>
                 <Image
-                  source={{ uri: photoUrl(photo.file_path) }}
+                  source={{ uri: photoUrl(photo.thumbnail_url) }}
                   style={styles.photo}
                 />
                 <TouchableOpacity
@@ -1186,7 +1186,7 @@ export default function ProfileSetupScreen() {
             if (photo) {
               return (
                 <View key={photo.id} style={styles.photoSlot}>
-                  <Image source={{ uri: photoUrl(photo.file_path) }} style={styles.photoImage} />
+                  <Image source={{ uri: photoUrl(photo.thumbnail_url) }} style={styles.photoImage} />
                   <TouchableOpacity
                     style={styles.photoDelete}
                     onPress={() => handleDeletePhoto(photo.id)}
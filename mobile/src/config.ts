@@ -5,10 +5,8 @@ const lanIp = Constants.expoConfig?.extra?.lanIp || "localhost";
 export const API_BASE_URL =
   process.env.EXPO_PUBLIC_API_URL || `http://${lanIp}:8000`;
 
-export function photoUrl(filePath: string): string {
-  const encoded = filePath
-    .split("/")
-    .map((segment) => encodeURIComponent(segment))
-    .join("/");
-  return `${API_BASE_URL}/uploads/${encoded}`;
+// Photo URLs from the API are either absolute (CDN, pre-signed S3) or signed
+// links relative to the API, which image tags can load without a token.
+export function photoUrl(url: string): string {
+  return /^https?:\/\//.test(url) ? url : `${API_BASE_URL}${url}`;
 }
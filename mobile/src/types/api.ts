@@ -20,6 +20,9 @@ export interface TokenResponse {
 export interface PhotoResponse {
   id: string;
   file_path: string;
+  url: string;
+  medium_url: string;
+  thumbnail_url: string;
   is_primary: boolean;
   order_index: number;
   created_at: string;
@@ -9,7 +9,7 @@ from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 
 from app.database import Base
-from app.dependencies import get_db
+from app.dependencies import get_db, get_async_db, get_read_db, get_async_read_db, ThreadedSession
 from app.main import app
 from app.models.user import User
 from app.models.profile import UserProfile
@@ -17,6 +17,12 @@ from app.models.conversation import ConversationState
 from app.services.auth_service import hash_password, create_access_token
 
 
+def pytest_configure(config):
+    # The response builders skip validation, so a value of the wrong type only
+    # shows up as this serializer warning; fail the request that produced it.
+    config.addinivalue_line("filterwarnings", "error:Pydantic serializer warnings:UserWarning")
+
+
 @pytest.fixture()
 def _test_db():
     engine = create_engine(
@@ -45,7 +51,7 @@ def db(_test_db):
 
 
 @pytest.fixture()
-def client(_test_db):
+def client(_test_db, monkeypatch):
     def _override():
         s = _test_db()
         try:
@@ -53,7 +59,35 @@ def client(_test_db):
         finally:
             s.close()
 
+    async def _async_override():
+        s = _test_db()
+        try:
+            yield ThreadedSession(s)
+        finally:
+            s.close()
+
+    def _read_override():
+        s = _test_db()
+        s.info["read_only"] = True
+        try:
+            yield s
+        finally:
+            s.close()
+
+    async def _async_read_override():
+        s = _test_db()
+        s.info["read_only"] = True
+        try:
+            yield ThreadedSession(s)
+        finally:
+            s.close()
+
+    # Jobs open their own sessions through app.database.SessionLocal
+    monkeypatch.setattr("app.database.SessionLocal", _test_db)
     app.dependency_overrides[get_db] = _override
+    app.dependency_overrides[get_async_db] = _async_override
+    app.dependency_overrides[get_read_db] = _read_override
+    app.dependency_overrides[get_async_read_db] = _async_read_override
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
@@ -63,8 +97,80 @@ def client(_test_db):
 def _reset_rate_limiters():
     from app.utils.rate_limiter import chat_rate_limiter, auth_rate_limiter, auth_ip_rate_limiter, message_rate_limiter
     for limiter in (chat_rate_limiter, auth_rate_limiter, auth_ip_rate_limiter, message_rate_limiter):
-        if hasattr(limiter, "_requests"):
-            limiter._requests.clear()
+        if hasattr(limiter, "reset"):
+            limiter.reset()
+
+
+@pytest.fixture(autouse=True)
+def _inline_jobs():
+    """Run enqueued jobs synchronously, so tests see their effects immediately."""
+    from app.jobs import InlineQueue, set_queue
+    queue = InlineQueue()
+    set_queue(queue)
+    yield queue
+    set_queue(None)
+
+
+@pytest.fixture(autouse=True)
+def _inline_image_processing(monkeypatch):
+    """Render photo variants on the calling thread instead of spawning pool processes."""
+    from app.utils.images import shutdown_image_pool
+    shutdown_image_pool()
+    monkeypatch.setattr("app.utils.images.settings.IMAGE_WORKERS", 0)
+    yield
+    shutdown_image_pool()
+
+
+@pytest.fixture(autouse=True)
+def upload_root(tmp_path, monkeypatch):
+    """Local photo storage and its staging directory under ``tmp_path``, not the working directory."""
+    from app.services import photo_service
+    from app.storage import LocalStorage, set_storage
+
+    root = tmp_path / "uploads"
+    monkeypatch.setattr(photo_service, "STAGING_DIR", root / ".incoming")
+    set_storage(LocalStorage(root))
+    yield root
+    set_storage(None)
+
+
+@pytest.fixture(autouse=True)
+def _reset_primary_pins():
+    from app.database import reset_primary_pins
+    reset_primary_pins()
+
+
+@pytest.fixture(autouse=True)
+def _clear_card_cache():
+    from app.services.card_service import card_cache
+    card_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def _clear_candidate_snapshot():
+    from app.services.snapshot_service import candidate_snapshot
+    candidate_snapshot.clear()
+
+
+@pytest.fixture(autouse=True)
+def _clear_count_cache():
+    from app.services.count_service import count_cache
+    count_cache.clear()
+
+
+@pytest.fixture()
+def rate_limit_clock(monkeypatch):
+    """Freeze the rate limiter clock; advance it with ``rate_limit_clock.now += seconds``.
+
+    GCRA limiters refill continuously, so tests that count requests up to a
+    limit must not let wall-clock time leak in.
+    """
+    class _Clock:
+        now = 1000.0
+
+    clock = _Clock()
+    monkeypatch.setattr("app.utils.rate_limiter.time.monotonic", lambda: clock.now)
+    return clock
 
 
 @pytest.fixture()
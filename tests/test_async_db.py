@@ -0,0 +1,94 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, async_database_url, configure_sqlite
+from app.dependencies import get_db, get_async_db, get_read_db, get_async_read_db
+from app.main import app
+from tests.conftest import _create_onboarded_user
+
+pytest.importorskip("aiosqlite")
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+
+class TestAsyncDatabaseUrl:
+    def test_sqlite(self):
+        assert async_database_url("sqlite:///./dating_app.db") == "sqlite+aiosqlite:///./dating_app.db"
+
+    def test_postgres(self):
+        assert async_database_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+        assert async_database_url("postgresql+psycopg2://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+
+    def test_unknown_scheme_unchanged(self):
+        assert async_database_url("mysql://u:p@h/db") == "mysql://u:p@h/db"
+
+
+@pytest.fixture()
+def async_client(tmp_path, monkeypatch):
+    """Client whose hot routes run on a real aiosqlite AsyncSession over a file database."""
+    path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    configure_sqlite(sync_engine)
+    Base.metadata.create_all(bind=sync_engine)
+    SyncSession = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    configure_sqlite(async_engine.sync_engine)
+    AsyncSession = async_sessionmaker(async_engine, autoflush=False)
+
+    def _sync_override():
+        s = SyncSession()
+        try:
+            yield s
+        finally:
+            s.close()
+
+    async def _async_override():
+        async with AsyncSession() as session:
+            yield session
+
+    monkeypatch.setattr("app.database.SessionLocal", SyncSession)
+    app.dependency_overrides[get_db] = _sync_override
+    app.dependency_overrides[get_async_db] = _async_override
+    app.dependency_overrides[get_read_db] = _sync_override
+    app.dependency_overrides[get_async_read_db] = _async_override
+    with TestClient(app) as c:
+        yield c, SyncSession
+    app.dependency_overrides.clear()
+    sync_engine.dispose()
+
+
+class TestAsyncSessionRoutes:
+    def test_discover_like_and_message(self, async_client, auth_headers):
+        client, SyncSession = async_client
+        session = SyncSession()
+        alice, alice_token = _create_onboarded_user(session, email="a@async.test", gender="female", gender_preference='["male"]')
+        bob, bob_token = _create_onboarded_user(session, email="b@async.test", gender="male", gender_preference='["female"]')
+        alice_id, bob_id = alice.id, bob.id
+        session.close()
+
+        r = client.get("/api/v1/discover", headers=auth_headers(alice_token))
+        assert r.status_code == 200
+        assert [u["id"] for u in r.json()["users"]] == [bob_id]
+
+        r = client.post("/api/v1/matches/like", json={"liked_user_id": bob_id}, headers=auth_headers(alice_token))
+        assert r.status_code == 200
+        assert r.json()["is_match"] is False
+        r = client.post("/api/v1/matches/like", json={"liked_user_id": alice_id}, headers=auth_headers(bob_token))
+        match_id = r.json()["match_id"]
+        assert r.json()["is_match"] is True
+
+        r = client.post(f"/api/v1/matches/{match_id}/messages", json={"content": "hi"}, headers=auth_headers(bob_token))
+        assert r.status_code == 201
+        r = client.get(f"/api/v1/matches/{match_id}/messages", headers=auth_headers(alice_token))
+        assert [m["content"] for m in r.json()] == ["hi"]
+
+        # Sync routes on the same database see the async writes
+        r = client.get("/api/v1/matches", headers=auth_headers(alice_token))
+        assert r.json()["total"] == 1
+
+    def test_invalid_token_rejected(self, async_client):
+        client, _ = async_client
+        r = client.get("/api/v1/discover", headers={"Authorization": "Bearer nope"})
+        assert r.status_code == 401
@@ -1,5 +1,5 @@
 class TestRateLimiting:
-    def test_auth_rate_limit(self, client):
+    def test_auth_rate_limit(self, client, rate_limit_clock):
         # Auth endpoints have 10 req/min per email
         for i in range(10):
             client.post("/api/v1/auth/login", json={
@@ -229,3 +229,107 @@ class TestDeactivatedUser:
         r = client.post("/api/v1/account/reactivate", headers=headers)
         assert r.status_code == 200
         assert r.json()["is_active"] is True
+
+
+class TestBulkAccountDeletion:
+    def _match_with_messages(self, client, create_user, auth_headers, count):
+        from app.models.message import DirectMessage
+
+        user1, token1 = create_user(email="bulk1@test.com")
+        user2, token2 = create_user(email="bulk2@test.com")
+        client.post("/api/v1/matches/like", json={"liked_user_id": user2.id}, headers=auth_headers(token1))
+        r = client.post("/api/v1/matches/like", json={"liked_user_id": user1.id}, headers=auth_headers(token2))
+        match_id = r.json()["match_id"]
+        return user1, token1, user2, token2, match_id, [
+            DirectMessage(match_id=match_id, sender_id=user1.id, content=f"m{i}") for i in range(count)
+        ]
+
+    def test_large_history_is_purged_in_chunks(self, client, create_user, auth_headers, db, monkeypatch):
+        from app.models.match import Match
+        from app.models.message import DirectMessage
+        from app.models.user import User
+        from app.services import account_service
+
+        monkeypatch.setattr(account_service, "DELETE_CHUNK_SIZE", 3)
+        chunks = []
+        real_chunk = account_service.delete_messages_chunk
+
+        def _spy(session, user_id, chunk_size):
+            deleted = real_chunk(session, user_id, chunk_size)
+            chunks.append(deleted)
+            return deleted
+
+        monkeypatch.setattr(account_service, "delete_messages_chunk", _spy)
+
+        user1, token1, _, token2, _, messages = self._match_with_messages(client, create_user, auth_headers, 8)
+        uid = user1.id
+        db.add_all(messages)
+        db.commit()
+
+        r = client.delete("/api/v1/account", headers=auth_headers(token1))
+        assert r.status_code == 204
+
+        # TestClient runs background tasks before returning
+        assert chunks == [3, 3, 2]
+        db.expire_all()
+        assert db.query(User).filter(User.id == uid).first() is None
+        assert db.query(DirectMessage).count() == 0
+        assert db.query(Match).count() == 0
+        assert client.get("/api/v1/matches", headers=auth_headers(token2)).json()["total"] == 0
+
+    def _delete_with_lost_purge(self, client, create_user, auth_headers, db, monkeypatch):
+        """Delete a large account while its purge job sits in a queue that nothing drains."""
+        from app.jobs import MemoryQueue, set_queue
+        from app.services import account_service
+
+        monkeypatch.setattr(account_service, "DELETE_CHUNK_SIZE", 3)
+        user1, token1, _, _, _, messages = self._match_with_messages(client, create_user, auth_headers, 8)
+        db.add_all(messages)
+        db.commit()
+        set_queue(MemoryQueue())
+        assert client.delete("/api/v1/account", headers=auth_headers(token1)).status_code == 204
+        return user1.id
+
+    def test_pending_purge_blocks_login_and_reactivation(self, client, create_user, auth_headers, db, monkeypatch):
+        from datetime import timedelta
+
+        from app.models.user import User
+        from app.services.auth_service import create_access_token
+
+        uid = self._delete_with_lost_purge(client, create_user, auth_headers, db, monkeypatch)
+        r = client.post("/api/v1/auth/login", json={"email": "bulk1@test.com", "password": "password123"})
+        assert r.status_code == 403
+        # Even a token minted after the revocation cannot bring the account back
+        db.expire_all()
+        user = db.get(User, uid)
+        user.token_invalidated_at -= timedelta(hours=1)
+        db.commit()
+        r = client.post("/api/v1/account/reactivate", headers=auth_headers(create_access_token(uid)))
+        assert r.status_code == 403
+
+    def test_pending_purge_resumed_at_startup(self, client, create_user, auth_headers, db, monkeypatch, _inline_jobs):
+        from fastapi.testclient import TestClient
+
+        from app.jobs import set_queue
+        from app.main import app
+        from app.models.user import User
+
+        uid = self._delete_with_lost_purge(client, create_user, auth_headers, db, monkeypatch)
+        db.expire_all()
+        assert db.get(User, uid).purge_requested_at is not None
+
+        set_queue(_inline_jobs)  # the restart: the memory queue and its job are gone
+        with TestClient(app):
+            pass
+        db.expire_all()
+        assert db.get(User, uid) is None
+
+    def test_deleted_users_uploads_are_removed(self, client, create_user, auth_headers, upload_root):
+        user, token = create_user(email="bulk3@test.com")
+        photo_dir = upload_root / user.id
+        photo_dir.mkdir(parents=True)
+        (photo_dir / "a.jpg").write_bytes(b"x")
+
+        r = client.delete("/api/v1/account", headers=auth_headers(token))
+        assert r.status_code == 204
+        assert not photo_dir.exists()
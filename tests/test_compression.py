@@ -0,0 +1,88 @@
+import gzip
+
+import brotli
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.utils.compression import CompressionMiddleware
+from tests.test_photos import _upload
+
+
+def _discover_page(client, create_user, auth_headers, encoding):
+    _, token = create_user(email="viewer@test.com", gender="male", gender_preference='["female"]')
+    for i in range(10):
+        create_user(email=f"c{i}@test.com", gender="female", gender_preference='["male"]')
+    return client.get("/api/v1/discover", headers={**auth_headers(token), "Accept-Encoding": encoding})
+
+
+class TestJsonCompression:
+    def test_gzip(self, client, create_user, auth_headers):
+        r = _discover_page(client, create_user, auth_headers, "gzip")
+        assert r.status_code == 200
+        assert r.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in r.headers["vary"].lower()
+        assert len(r.json()["users"]) == 10
+
+    def test_brotli_preferred(self, client, create_user, auth_headers):
+        r = _discover_page(client, create_user, auth_headers, "gzip, deflate, br")
+        assert r.headers["content-encoding"] == "br"
+        assert len(r.json()["users"]) == 10
+
+    def test_refused_codings_ignored(self, client, create_user, auth_headers):
+        r = _discover_page(client, create_user, auth_headers, "br;q=0, gzip")
+        assert r.headers["content-encoding"] == "gzip"
+        headers = {"Authorization": r.request.headers["authorization"], "Accept-Encoding": "identity"}
+        r = client.get("/api/v1/discover", headers=headers)
+        assert "content-encoding" not in r.headers
+
+    def test_small_bodies_sent_as_is(self, client):
+        r = client.get("/health", headers={"Accept-Encoding": "gzip, br"})
+        assert r.status_code == 200
+        assert "content-encoding" not in r.headers
+
+    def test_images_not_compressed(self, client, create_user, auth_headers):
+        _, token = create_user(email="img@test.com")
+        photo = _upload(client, token, auth_headers, size=(400, 300))
+        r = client.get(photo["url"], headers={**auth_headers(token), "Accept-Encoding": "gzip, br"})
+        assert r.status_code == 200
+        assert r.headers["content-type"] == "image/webp"
+        assert "content-encoding" not in r.headers
+
+
+class TestCompressionMiddleware:
+    def _app(self, **kwargs):
+        app = FastAPI()
+
+        @app.get("/stream")
+        def stream():
+            return StreamingResponse((b'{"n": %d}\n' % i for i in range(500)), media_type="application/json")
+
+        @app.get("/csv")
+        def csv():
+            return StreamingResponse(iter([b"a,b\n" * 1000]), media_type="text/csv")
+
+        app.add_middleware(CompressionMiddleware, **kwargs)
+        return TestClient(app)
+
+    def test_streamed_body_compressed_incrementally(self):
+        client = self._app(use_brotli=False)
+        r = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert r.headers["content-encoding"] == "gzip"
+        assert "content-length" not in r.headers
+        assert r.text.count("\n") == 500
+
+    def test_content_type_allowlist(self):
+        client = self._app(content_types=["application/json"])
+        r = client.get("/csv", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in r.headers
+        client = self._app(content_types=["text/csv"])
+        r = client.get("/csv", headers={"Accept-Encoding": "gzip"})
+        assert r.headers["content-encoding"] == "gzip"
+
+    def test_payload_round_trips(self):
+        client = self._app(content_types=["text/csv"])
+        for encoding, decompress in (("gzip", gzip.decompress), ("br", brotli.decompress)):
+            with client.stream("GET", "/csv", headers={"Accept-Encoding": encoding}) as r:
+                raw = b"".join(r.iter_raw())
+            assert decompress(raw) == b"a,b\n" * 1000
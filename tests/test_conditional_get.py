@@ -0,0 +1,128 @@
+from sqlalchemy import event
+
+from app.config import settings
+
+from tests.test_chat import _signup
+
+
+def _revalidate(client, path, headers):
+    r = client.get(path, headers=headers)
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    assert r.headers["cache-control"] == "private, no-cache"
+    again = client.get(path, headers={**headers, "If-None-Match": etag})
+    return etag, again
+
+
+def _match(client, create_user, auth_headers):
+    user1, token1 = create_user(email="m1@test.com", gender="male", gender_preference='["female"]')
+    user2, token2 = create_user(email="m2@test.com", gender="female", gender_preference='["male"]')
+    client.post("/api/v1/matches/like", json={"liked_user_id": user2.id}, headers=auth_headers(token1))
+    r = client.post("/api/v1/matches/like", json={"liked_user_id": user1.id}, headers=auth_headers(token2))
+    assert r.json()["is_match"] is True
+    return r.json()["match_id"], token1, token2
+
+
+class TestProfileEtag:
+    def test_unchanged_profile_is_not_modified(self, client, create_user, auth_headers):
+        _, token = create_user(email="e1@test.com")
+        etag, r = _revalidate(client, "/api/v1/profile/me", auth_headers(token))
+        assert r.status_code == 304
+        assert r.content == b""
+        assert r.headers["etag"] == etag
+
+    def test_update_changes_etag(self, client, create_user, auth_headers):
+        _, token = create_user(email="e2@test.com")
+        etag, _ = _revalidate(client, "/api/v1/profile/me", auth_headers(token))
+        client.put("/api/v1/profile/me", json={"job_title": "Chef"}, headers=auth_headers(token))
+        r = client.get("/api/v1/profile/me", headers={**auth_headers(token), "If-None-Match": etag})
+        assert r.status_code == 200
+        assert r.json()["job_title"] == "Chef"
+        assert r.headers["etag"] != etag
+
+    def test_etag_is_per_user(self, client, create_user, auth_headers):
+        _, token1 = create_user(email="e3@test.com")
+        _, token2 = create_user(email="e4@test.com")
+        etag, _ = _revalidate(client, "/api/v1/profile/me", auth_headers(token1))
+        r = client.get("/api/v1/profile/me", headers={**auth_headers(token2), "If-None-Match": etag})
+        assert r.status_code == 200
+
+    def test_not_modified_skips_queries(self, client, db, create_user, auth_headers):
+        _, token = create_user(email="e5@test.com")
+        etag, _ = _revalidate(client, "/api/v1/profile/me", auth_headers(token))
+        statements = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.get_bind(), "before_cursor_execute", _record)
+        try:
+            r = client.get("/api/v1/profile/me", headers={**auth_headers(token), "If-None-Match": etag})
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", _record)
+        assert r.status_code == 304
+        # Only the authentication lookup of the user row
+        assert len(statements) == 1
+        assert "FROM users" in statements[0]
+
+    def test_new_link_window_changes_etag(self, client, create_user, auth_headers, monkeypatch):
+        _, token = create_user(email="e6@test.com")
+        etag, _ = _revalidate(client, "/api/v1/profile/me", auth_headers(token))
+        # Photo links in the cached body may have expired: send new ones
+        monkeypatch.setattr(settings, "PHOTO_URL_TTL", settings.PHOTO_URL_TTL + 1)
+        r = client.get("/api/v1/profile/me", headers={**auth_headers(token), "If-None-Match": etag})
+        assert r.status_code == 200
+
+    def test_match_list_changes_keep_etag(self, client, create_user, auth_headers):
+        match_id, token1, token2 = _match(client, create_user, auth_headers)
+        etag, _ = _revalidate(client, "/api/v1/profile/me", auth_headers(token1))
+        client.delete(f"/api/v1/matches/{match_id}", headers=auth_headers(token2))
+        r = client.get("/api/v1/profile/me", headers={**auth_headers(token1), "If-None-Match": etag})
+        assert r.status_code == 304
+
+
+class TestMatchesEtag:
+    def test_unchanged_list_is_not_modified(self, client, create_user, auth_headers):
+        _, token1, _ = _match(client, create_user, auth_headers)
+        _, r = _revalidate(client, "/api/v1/matches", auth_headers(token1))
+        assert r.status_code == 304
+
+    def test_partner_profile_update_changes_etag(self, client, create_user, auth_headers):
+        _, token1, token2 = _match(client, create_user, auth_headers)
+        etag, _ = _revalidate(client, "/api/v1/matches", auth_headers(token1))
+        client.put("/api/v1/profile/me", json={"job_title": "Chef"}, headers=auth_headers(token2))
+        r = client.get("/api/v1/matches", headers={**auth_headers(token1), "If-None-Match": etag})
+        assert r.status_code == 200
+        assert r.json()["matches"][0]["other_user"]["job_title"] == "Chef"
+
+    def test_new_link_window_changes_etag(self, client, create_user, auth_headers, monkeypatch):
+        _, token1, _ = _match(client, create_user, auth_headers)
+        etag, _ = _revalidate(client, "/api/v1/matches", auth_headers(token1))
+        monkeypatch.setattr(settings, "PHOTO_URL_TTL", settings.PHOTO_URL_TTL + 1)
+        r = client.get("/api/v1/matches", headers={**auth_headers(token1), "If-None-Match": etag})
+        assert r.status_code == 200
+
+    def test_unmatch_changes_etag(self, client, create_user, auth_headers):
+        match_id, token1, token2 = _match(client, create_user, auth_headers)
+        etag, _ = _revalidate(client, "/api/v1/matches", auth_headers(token1))
+        client.delete(f"/api/v1/matches/{match_id}", headers=auth_headers(token2))
+        r = client.get("/api/v1/matches", headers={**auth_headers(token1), "If-None-Match": etag})
+        assert r.status_code == 200
+        assert r.json()["matches"] == []
+
+
+class TestChatEtag:
+    def test_history_and_status_change_with_new_messages(self, client, db, mock_openai):
+        token = _signup(client, db)
+        headers = {"Authorization": f"Bearer {token}"}
+        history_etag, r = _revalidate(client, "/api/v1/chat/history", headers)
+        assert r.status_code == 304
+        status_etag, r = _revalidate(client, "/api/v1/chat/status", headers)
+        assert r.status_code == 304
+
+        client.post("/api/v1/chat", json={"message": "Hello!"}, headers=headers)
+        r = client.get("/api/v1/chat/history", headers={**headers, "If-None-Match": history_etag})
+        assert r.status_code == 200
+        assert len(r.json()) == 2
+        r = client.get("/api/v1/chat/status", headers={**headers, "If-None-Match": status_etag})
+        assert r.status_code == 200
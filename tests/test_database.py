@@ -0,0 +1,41 @@
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.database import configure_sqlite, engine_options, sqlite_pragmas
+
+
+class TestEngineOptions:
+    def test_postgres_gets_pool_settings(self, monkeypatch):
+        monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+        monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 3)
+        opts = engine_options("postgresql://u:p@localhost/db")
+        assert opts["pool_size"] == 7
+        assert opts["max_overflow"] == 3
+        assert opts["pool_pre_ping"] is True
+        assert opts["pool_recycle"] == settings.DB_POOL_RECYCLE
+        assert "connect_args" not in opts
+
+    def test_sqlite_has_no_pool_sizing(self):
+        opts = engine_options("sqlite:///./x.db")
+        assert "pool_size" not in opts
+        assert opts["connect_args"]["check_same_thread"] is False
+        assert opts["connect_args"]["timeout"] == settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+
+
+class TestSqlitePragmas:
+    def test_pragmas_applied_to_connections(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT_MS", 1234)
+        url = f"sqlite:///{tmp_path / 'tuned.db'}"
+        engine = create_engine(url, **engine_options(url))
+        configure_sqlite(engine)
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+            assert conn.execute(text("PRAGMA cache_size")).scalar() == -settings.SQLITE_CACHE_SIZE_KB
+            assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+        engine.dispose()
+
+    def test_foreign_keys_pragma_comes_first(self):
+        assert sqlite_pragmas()[0] == "PRAGMA foreign_keys=ON"
@@ -317,3 +317,262 @@ class TestDiscoverReligionFiltering:
         ids = [u["id"] for u in r.json()["users"]]
         assert user_a.id in ids
         assert user_b.id in ids
+
+
+class TestDiscoverSerialization:
+    def test_prebuilt_body_matches_response_model(self, client, create_user, auth_headers):
+        import io
+        from fastapi.encoders import jsonable_encoder
+        from app.schemas.discover import DiscoverResponse
+        from tests.test_profile import _make_png_bytes
+
+        _, token1 = create_user(email="ser1@test.com", gender="male", gender_preference='["female"]')
+        _, token2 = create_user(
+            email="ser2@test.com", gender="female", gender_preference='["male"]',
+            hidden_fields='["religion"]', religion="Other", languages='["English"]',
+        )
+        client.post(
+            "/api/v1/profile/me/photos",
+            files={"file": ("p.png", io.BytesIO(_make_png_bytes()), "image/png")},
+            headers=auth_headers(token2),
+        )
+
+        r = client.get("/api/v1/discover", headers=auth_headers(token1))
+        assert r.headers["content-type"] == "application/json"
+        body = r.json()
+        # What FastAPI's validating response_model path would have produced
+        assert jsonable_encoder(DiscoverResponse.model_validate(body)) == body
+        card = body["users"][0]
+        assert card["religion"] is None
+        assert card["languages"] == ["English"]
+        assert card["photos"][0]["thumbnail_url"].split("?")[0].endswith("/thumb")
+
+
+class TestDiscoverCardView:
+    def test_card_view_fields(self, client, create_user, auth_headers):
+        import io
+        from tests.test_profile import _make_png_bytes
+
+        _, token1 = create_user(email="cv1@test.com", gender="male", gender_preference='["female"]')
+        user2, token2 = create_user(email="cv2@test.com", gender="female", gender_preference='["male"]')
+        photo = client.post(
+            "/api/v1/profile/me/photos",
+            files={"file": ("p.png", io.BytesIO(_make_png_bytes()), "image/png")},
+            headers=auth_headers(token2),
+        ).json()
+
+        r = client.get("/api/v1/discover?view=card", headers=auth_headers(token1))
+        assert r.status_code == 200
+        card = r.json()["users"][0]
+        assert set(card) == {"id", "display_name", "date_of_birth", "distance_km", "primary_photo", "compatibility_score"}
+        assert card["id"] == user2.id
+        assert card["primary_photo"]["id"] == photo["id"]
+
+        # The same from a cached full card
+        client.get("/api/v1/discover", headers=auth_headers(token1))
+        assert client.get("/api/v1/discover?view=card", headers=auth_headers(token1)).json()["users"][0] == card
+
+    def test_unknown_view_rejected(self, client, create_user, auth_headers):
+        _, token = create_user(email="cv3@test.com")
+        assert client.get("/api/v1/discover?view=compact", headers=auth_headers(token)).status_code == 422
+
+
+class TestDiscoverLoading:
+    def _statements(self, client, db, token, auth_headers):
+        from sqlalchemy import event
+
+        statements = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.get_bind(), "before_cursor_execute", _record)
+        try:
+            r = client.get("/api/v1/discover?limit=50", headers=auth_headers(token))
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", _record)
+        assert r.status_code == 200
+        return statements, r.json()
+
+    def test_statement_count_independent_of_candidates(self, client, db, create_user, auth_headers):
+        _, token = create_user(email="ld0@test.com", gender="male", gender_preference='["female"]')
+        create_user(email="ld1@test.com", gender="female", gender_preference='["male"]')
+        few, _ = self._statements(client, db, token, auth_headers)
+        for i in range(2, 8):
+            create_user(email=f"ld{i}@test.com", gender="female", gender_preference='["male"]')
+        many, body = self._statements(client, db, token, auth_headers)
+        assert len(body["users"]) == 7
+        assert body["users"][0]["profile"]["bio"] == "Test bio"
+        assert len(many) == len(few)
+
+    def test_candidate_query_loads_only_filter_columns(self, client, db, create_user, auth_headers):
+        _, token = create_user(email="lc0@test.com", gender="male", gender_preference='["female"]')
+        create_user(email="lc1@test.com", gender="female", gender_preference='["male"]')
+        statements, _ = self._statements(client, db, token, auth_headers)
+        candidate_query = next(s for s in statements if "NOT IN" in s)
+        assert "hashed_password" not in candidate_query
+        # Profiles come from one IN query, not a re-run of the candidate query
+        profile_queries = [s for s in statements if s.lstrip().startswith("SELECT user_profiles")]
+        assert all("NOT IN" not in s for s in profile_queries)
+
+
+class TestDiscoverRanking:
+    def _ids(self, client, token, auth_headers, query="limit=50"):
+        r = client.get(f"/api/v1/discover?{query}", headers=auth_headers(token))
+        assert r.status_code == 200
+        return [u["id"] for u in r.json()["users"]]
+
+    def test_heap_selection_matches_full_sort(self):
+        import random
+        from app.services.ranking_service import ScoredCandidate, top_candidates
+
+        rng = random.Random(7)
+        scored = [
+            ScoredCandidate(str(i), rng.choice([0.0, 0.25, 0.5, rng.random()]), rng.choice([None, rng.uniform(0, 60)]),
+                            rng.random(), None)
+            for i in range(300)
+        ]
+        weights = {"compatibility": 0.7, "distance": 0.3}
+        full = sorted(scored, key=lambda c: 0.7 * c.compatibility + 0.3 * (
+            0.5 if c.distance is None else max(0.0, 1 - c.distance / 50)), reverse=True)
+        assert [c.user_id for c in top_candidates(scored, 40, weights, 50)] == [c.user_id for c in full[:40]]
+        # Compatibility alone keeps the previous order, ties newest first
+        by_score = sorted(scored, key=lambda c: c.compatibility, reverse=True)
+        assert top_candidates(scored, 300, {"compatibility": 1.0}, 50) == by_score
+
+    def test_distance_weight_puts_nearby_first(self, client, create_user, auth_headers, monkeypatch):
+        from app.config import settings
+
+        _, token = create_user(email="rd0@test.com", gender="male", gender_preference='["female"]')
+        far, _ = create_user(email="rd1@test.com", latitude=40.95, longitude=-74.0060)
+        near, _ = create_user(email="rd2@test.com", latitude=40.72, longitude=-74.0060)
+        no_gps, _ = create_user(email="rd3@test.com", latitude=None, longitude=None)
+
+        monkeypatch.setattr(settings, "DISCOVER_RANK_COMPATIBILITY", 0.0)
+        monkeypatch.setattr(settings, "DISCOVER_RANK_DISTANCE", 1.0)
+        assert self._ids(client, token, auth_headers) == [near.id, no_gps.id, far.id]
+        assert self._ids(client, token, auth_headers, "limit=1&offset=1") == [no_gps.id]
+
+    def test_activity_and_completeness_weights(self, client, db, create_user, auth_headers, monkeypatch):
+        from datetime import datetime, timedelta
+        from app.config import settings
+        from app.models.profile import UserProfile
+
+        _, token = create_user(email="ra0@test.com", gender="male", gender_preference='["female"]')
+        idle, _ = create_user(email="ra1@test.com")
+        active, _ = create_user(email="ra2@test.com")
+        idle.created_at = datetime.utcnow() - timedelta(days=30)
+        active.created_at = datetime.utcnow() - timedelta(days=60)
+        active.last_active_at = datetime.utcnow() - timedelta(hours=1)
+        db.query(UserProfile).filter(UserProfile.user_id == idle.id).update({"profile_completeness": 0.2})
+        db.commit()
+
+        monkeypatch.setattr(settings, "DISCOVER_RANK_COMPATIBILITY", 0.0)
+        monkeypatch.setattr(settings, "DISCOVER_RANK_ACTIVITY", 1.0)
+        assert self._ids(client, token, auth_headers) == [active.id, idle.id]
+
+        monkeypatch.setattr(settings, "DISCOVER_RANK_ACTIVITY", 0.0)
+        monkeypatch.setattr(settings, "DISCOVER_RANK_COMPLETENESS", 1.0)
+        assert self._ids(client, token, auth_headers) == [active.id, idle.id]
+        db.query(UserProfile).filter(UserProfile.user_id == idle.id).update({"profile_completeness": 1.0})
+        db.query(UserProfile).filter(UserProfile.user_id == active.id).update({"profile_completeness": 0.5})
+        db.commit()
+        assert self._ids(client, token, auth_headers) == [idle.id, active.id]
+
+
+class TestRecordActivity:
+    def test_login_and_swipes_stamp_last_active(self, client, db, create_user, auth_headers):
+        from app.models.user import User
+
+        user, token = create_user(email="act0@test.com", gender="male", gender_preference='["female"]')
+        other, _ = create_user(email="act1@test.com")
+        assert user.last_active_at is None
+        updated_at = user.updated_at
+
+        r = client.post("/api/v1/auth/login", json={"email": "act0@test.com", "password": "password123"})
+        assert r.status_code == 200
+        db.expire_all()
+        first = db.get(User, user.id).last_active_at
+        assert first is not None
+        assert db.get(User, user.id).updated_at == updated_at  # activity is not a profile change
+
+        # Within ACTIVITY_RESOLUTION_SECONDS the row is not written again
+        r = client.post("/api/v1/matches/like", json={"liked_user_id": other.id}, headers=auth_headers(token))
+        assert r.status_code == 200
+        db.expire_all()
+        assert db.get(User, user.id).last_active_at == first
+
+    def test_stale_stamp_refreshed_by_pass(self, client, db, create_user, auth_headers):
+        from datetime import datetime, timedelta
+        from app.models.user import User
+
+        user, token = create_user(email="act2@test.com", gender="male", gender_preference='["female"]')
+        other, _ = create_user(email="act3@test.com")
+        user.last_active_at = datetime.utcnow() - timedelta(days=2)
+        db.commit()
+
+        r = client.post("/api/v1/matches/pass", json={"passed_user_id": other.id}, headers=auth_headers(token))
+        assert r.status_code == 200
+        db.expire_all()
+        assert db.get(User, user.id).last_active_at > datetime.utcnow() - timedelta(minutes=1)
+
+
+class TestDiscoverTotal:
+    def _window(self, db, user, sql_limit):
+        from app.routers.discover import _sql_scores, _sql_total
+        from app.services.matching_service import profile_tokens
+
+        scored, window = _sql_scores(db, user, sql_limit, profile_tokens(user.profile))
+        return _sql_total(db, user, len(scored), window, sql_limit)
+
+    def test_exact_when_window_holds_everyone(self, client, create_user, auth_headers):
+        _, token = create_user(email="t0@test.com", gender="male", gender_preference='["female"]')
+        create_user(email="t1@test.com", gender="female", gender_preference='["male"]')
+        create_user(email="t2@test.com", gender="male", gender_preference='["female"]')
+
+        r = client.get("/api/v1/discover?limit=1", headers=auth_headers(token))
+        data = r.json()
+        assert data["total"] == 1
+        assert data["total_exact"] is True
+
+    def test_full_window_estimated_from_sample(self, db, create_user):
+        from app.services.count_service import estimate_total
+
+        viewer, _ = create_user(email="t3@test.com", gender="male", gender_preference='["female"]')
+        for i, gender in enumerate(["male", "female", "female", "male"]):
+            create_user(email=f"t{4 + i}@test.com", gender=gender, gender_preference='["male"]')
+
+        total, exact = self._window(db, viewer, 2)
+        assert exact is False
+        assert total == estimate_total(4, 2, 1)
+
+    def test_count_exact_without_python_filters(self, db, create_user):
+        viewer, _ = create_user(
+            email="t8@test.com", gender=None, gender_preference=None, latitude=None, longitude=None,
+        )
+        for i in range(3):
+            create_user(email=f"t{9 + i}@test.com")
+
+        assert self._window(db, viewer, 2) == (3, True)
+
+    def test_count_cached_until_profile_changes(self, db, create_user):
+        viewer, _ = create_user(
+            email="t12@test.com", gender=None, gender_preference=None, latitude=None, longitude=None,
+        )
+        for i in range(3):
+            create_user(email=f"t{13 + i}@test.com")
+        assert self._window(db, viewer, 2) == (3, True)
+
+        create_user(email="t16@test.com")
+        assert self._window(db, viewer, 2) == (3, True)
+        viewer.profile_version += 1
+        db.commit()
+        assert self._window(db, viewer, 2) == (4, True)
+
+    def test_estimate_clamped(self):
+        from app.services.count_service import estimate_total
+
+        assert estimate_total(1000, 100, 0) == 0
+        assert estimate_total(1000, 100, 25) == 250
+        assert estimate_total(10, 100, 50) == 50  # never below what was seen
+        assert estimate_total(0, 0, 0) == 0
@@ -0,0 +1,306 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.config import settings
+from app.models.conversation import ConversationState
+from app.models.profile import UserProfile
+from app.services import snapshot_service
+from app.services.snapshot_service import candidate_snapshot
+from tests import test_discover
+
+
+@pytest.fixture()
+def snapshot(monkeypatch):
+    monkeypatch.setattr(settings, "DISCOVER_SNAPSHOT", True)
+    return candidate_snapshot
+
+
+def _discover(client, token, auth_headers, query="limit=50"):
+    r = client.get(f"/api/v1/discover?{query}", headers=auth_headers(token))
+    assert r.status_code == 200
+    return r.json()
+
+
+def _ids(body):
+    return [u["id"] for u in body["users"]]
+
+
+def _results(body):
+    """``body`` without ``total_exact``, which is always false from the snapshot."""
+    return {key: value for key, value in body.items() if key != "total_exact"}
+
+
+# The discover suite again, served from the snapshot
+@pytest.mark.usefixtures("snapshot")
+class TestSnapshotResults(test_discover.TestDiscoverResults):
+    pass
+
+
+@pytest.mark.usefixtures("snapshot")
+class TestSnapshotExcludesInactive(test_discover.TestDiscoverExcludesInactive):
+    pass
+
+
+@pytest.mark.usefixtures("snapshot")
+class TestSnapshotFiltering(test_discover.TestDiscoverFiltering):
+    pass
+
+
+@pytest.mark.usefixtures("snapshot")
+class TestSnapshotDistanceFiltering(test_discover.TestDiscoverDistanceFiltering):
+    pass
+
+
+@pytest.mark.usefixtures("snapshot")
+class TestSnapshotHeightFiltering(test_discover.TestDiscoverHeightFiltering):
+    pass
+
+
+@pytest.mark.usefixtures("snapshot")
+class TestSnapshotReligionFiltering(test_discover.TestDiscoverReligionFiltering):
+    pass
+
+
+class TestSnapshotParity:
+    def _population(self, create_user):
+        genders = ["female", "male", "non-binary"]
+        preferences = ['["male"]', '["female"]', '["male", "non-binary"]', None, "not json"]
+        religions = ["None", "Buddhist", "Christian", ""]
+        interests = ['["hiking", "reading"]', '["cooking", "hiking", "travel"]', '["chess"]', None]
+        values = ['["honesty", "kindness"]', '["ambition"]', '"family first"', None]
+        for i in range(30):
+            create_user(
+                email=f"sp{i}@test.com",
+                gender=genders[i % 3],
+                gender_preference=preferences[i % 5],
+                dob=date(1980 + i % 25, 1 + i % 12, 1 + i % 28),
+                age_min=18 + i % 7, age_max=35 + i % 20,
+                latitude=None if i % 9 == 0 else 40.7 + (i % 10) * 0.08,
+                longitude=None if i % 9 == 0 else -74.0 + (i % 6) * 0.1,
+                height_inches=None if i % 8 == 0 else 60 + i % 15,
+                religion=religions[i % 4],
+                interests=interests[i % 4],
+                values=values[(i // 4) % 4],
+            )
+
+    def test_same_pages_and_scores_as_sql(self, client, create_user, auth_headers, monkeypatch):
+        self._population(create_user)
+        viewers = [
+            {},
+            {"gender": "male", "gender_preference": '["female", "non-binary"]', "max_distance_km": 20},
+            {"gender": "non-binary", "gender_preference": None, "latitude": None, "longitude": None},
+            {"gender": "female", "gender_preference": '["female"]', "dob": date(1990, 2, 28), "age_min": 25, "age_max": 40},
+        ]
+        tokens = [
+            create_user(
+                email=f"viewer{i}@test.com", height_pref_min=62, height_pref_max=72,
+                religion_preference='["None", "Buddhist"]', **viewer,
+            )[1]
+            for i, viewer in enumerate(viewers)
+        ]
+        queries = ["limit=50", "limit=5&offset=3"]
+
+        expected = [_discover(client, token, auth_headers, q) for token in tokens for q in queries]
+        assert all(body["total"] > 0 for body in expected)
+        monkeypatch.setattr(settings, "DISCOVER_SNAPSHOT", True)
+        bodies = [_discover(client, token, auth_headers, q) for token in tokens for q in queries]
+        assert [_results(body) for body in bodies] == [_results(body) for body in expected]
+        assert not any(body["total_exact"] for body in bodies)
+
+
+class TestSnapshotFreshness:
+    def test_profile_change_applied_without_rebuild(self, client, create_user, auth_headers, snapshot):
+        _, token = create_user(email="f0@test.com", gender="male", gender_preference='["female"]')
+        other, other_token = create_user(email="f1@test.com", gender="female", gender_preference='["male"]')
+        assert _ids(_discover(client, token, auth_headers)) == [other.id]
+        built_at = snapshot.built_at
+
+        r = client.put("/api/v1/profile/me", json={"gender_preference": ["female"]}, headers=auth_headers(other_token))
+        assert r.status_code == 200
+        assert _discover(client, token, auth_headers)["total"] == 0
+
+        r = client.put("/api/v1/profile/me", json={"gender_preference": ["male"]}, headers=auth_headers(other_token))
+        assert _ids(_discover(client, token, auth_headers)) == [other.id]
+        assert snapshot.built_at == built_at  # merged, not rebuilt
+
+    def test_deactivation_and_reactivation(self, client, create_user, auth_headers, snapshot):
+        _, token = create_user(email="fd0@test.com", gender="male", gender_preference='["female"]')
+        other, other_token = create_user(email="fd1@test.com", gender="female", gender_preference='["male"]')
+        assert _ids(_discover(client, token, auth_headers)) == [other.id]
+
+        client.post("/api/v1/account/deactivate", headers=auth_headers(other_token))
+        assert _ids(_discover(client, token, auth_headers)) == []
+        client.post("/api/v1/account/reactivate", headers=auth_headers(other_token))
+        assert _ids(_discover(client, token, auth_headers)) == [other.id]
+
+    def test_deleted_account_dropped(self, client, create_user, auth_headers, snapshot):
+        _, token = create_user(email="fx0@test.com", gender="male", gender_preference='["female"]')
+        other, other_token = create_user(email="fx1@test.com", gender="female", gender_preference='["male"]')
+        assert _ids(_discover(client, token, auth_headers)) == [other.id]
+
+        assert client.delete("/api/v1/account", headers=auth_headers(other_token)).status_code == 204
+        assert _discover(client, token, auth_headers)["total"] == 0
+
+    def test_scoring_change_applied(self, client, create_user, auth_headers, snapshot):
+        _, token = create_user(email="fs0@test.com", gender="male", gender_preference='["female"]')
+        _, other_token = create_user(email="fs1@test.com", gender="female", gender_preference='["male"]')
+        before = _discover(client, token, auth_headers)["users"][0]["compatibility_score"]
+
+        r = client.put(
+            "/api/v1/profile/me/profile", json={"interests": ["knitting", "opera"], "values": ["chaos"]},
+            headers=auth_headers(other_token),
+        )
+        assert r.status_code == 200
+        after = _discover(client, token, auth_headers)["users"][0]["compatibility_score"]
+        assert after < before
+
+    def test_rolled_back_change_not_queued(self, db, create_user, snapshot):
+        user, _ = create_user(email="fr0@test.com")
+        snapshot_service.note_user_changed(db, user.id)
+        db.rollback()
+        assert not snapshot._pending
+
+    def test_periodic_rebuild_picks_up_direct_writes(self, client, db, create_user, auth_headers, snapshot, monkeypatch):
+        _, token = create_user(email="fp0@test.com", gender="male", gender_preference='["female"]')
+        assert _discover(client, token, auth_headers)["total"] == 0
+
+        # Written past the app (another process, a script): no change event
+        other, _ = create_user(email="fp1@test.com", gender="female", gender_preference='["male"]')
+        assert _discover(client, token, auth_headers)["total"] == 0
+        monkeypatch.setattr(settings, "DISCOVER_SNAPSHOT_REBUILD_SECONDS", 0)
+        # The rebuild runs off the request; the old version is served meanwhile
+        assert _discover(client, token, auth_headers)["total"] == 0
+        snapshot.wait()
+        monkeypatch.setattr(settings, "DISCOVER_SNAPSHOT_REBUILD_SECONDS", 300)
+        assert _ids(_discover(client, token, auth_headers)) == [other.id]
+
+    def test_rebuild_does_not_block_requests(self, client, create_user, auth_headers, snapshot, monkeypatch):
+        import threading
+
+        _, token = create_user(email="fb0@test.com", gender="male", gender_preference='["female"]')
+        other, _ = create_user(email="fb1@test.com", gender="female", gender_preference='["male"]')
+        assert _ids(_discover(client, token, auth_headers)) == [other.id]
+        old = snapshot.current
+
+        release = threading.Event()
+        encode = snapshot_service.SnapshotColumns.encode
+
+        def slow_encode(*args):
+            release.wait(10)
+            return encode(*args)
+
+        monkeypatch.setattr(snapshot_service.SnapshotColumns, "encode", slow_encode)
+        monkeypatch.setattr(settings, "DISCOVER_SNAPSHOT_REBUILD_SECONDS", 0)
+        try:
+            # Both answered from the old version while the rebuild is held up
+            assert _ids(_discover(client, token, auth_headers)) == [other.id]
+            assert _ids(_discover(client, token, auth_headers)) == [other.id]
+            assert snapshot.current is old
+        finally:
+            release.set()
+            snapshot.wait()
+        assert snapshot.current is not old
+
+    def test_new_tokens_after_build(self, client, create_user, auth_headers, snapshot, monkeypatch):
+        _, token = create_user(email="ft0@test.com", gender="male", gender_preference='["female"]', interests='["zymurgy"]')
+        _, other_token = create_user(email="ft1@test.com", gender="female", gender_preference='["male"]')
+        _discover(client, token, auth_headers)
+
+        # Enough new interests to widen the bitsets past one word
+        interests = ["zymurgy"] + [f"topic{i} subject{i}" for i in range(40)]
+        r = client.put("/api/v1/profile/me/profile", json={"interests": interests}, headers=auth_headers(other_token))
+        assert r.status_code == 200
+        with_snapshot = _discover(client, token, auth_headers)
+        monkeypatch.setattr(settings, "DISCOVER_SNAPSHOT", False)
+        assert _results(_discover(client, token, auth_headers)) == _results(with_snapshot)
+
+
+class TestSnapshotWholeVector:
+    def _scores(self, db, snapshot, viewer, k):
+        from datetime import datetime, timezone
+
+        from app.routers.discover import _snapshot_scores
+        from app.services.matching_service import profile_tokens
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return _snapshot_scores(db, viewer, snapshot.columns(db), k, profile_tokens(viewer.profile), now)
+
+    def test_exact_total(self, db, create_user, snapshot):
+        viewer, _ = create_user(email="tot0@test.com", gender="male", gender_preference='["female"]')
+        for i, gender in enumerate(["male", "female", "female", "male", "female"]):
+            create_user(email=f"tot{1 + i}@test.com", gender=gender, gender_preference='["male"]')
+
+        scored, total = self._scores(db, snapshot, viewer, 1)
+        assert len(scored) == 1
+        assert total == 3
+
+    def test_oldest_best_match_is_ranked(self, db, create_user, snapshot):
+        from app.services.ranking_service import rank_weights, top_candidates
+
+        viewer, _ = create_user(
+            email="old0@test.com", gender="male", gender_preference='["female"]',
+            interests='["chess", "go"]', values='["ambition"]',
+        )
+        best, _ = create_user(email="old1@test.com", interests='["chess", "go"]', values='["ambition"]')
+        for i in range(2, 8):  # newer, and sharing nothing with the viewer
+            create_user(email=f"old{i}@test.com", interests='["surfing"]', values='["loyalty"]')
+
+        scored, total = self._scores(db, snapshot, viewer, 1)
+        assert total == 7
+        assert len(scored) == 1  # only the shortlist leaves NumPy
+        assert [c.user_id for c in top_candidates(scored, 1, rank_weights(), 50)] == [best.id]
+
+    def test_ties_shortlist_newest_first(self, db, create_user, snapshot):
+        viewer, _ = create_user(email="tie0@test.com", gender="male", gender_preference='["female"]')
+        others = [create_user(email=f"tie{i}@test.com")[0] for i in range(1, 6)]
+
+        scored, total = self._scores(db, snapshot, viewer, 2)
+        assert total == 5
+        assert [c.user_id for c in scored] == [others[-1].id, others[-2].id]
+
+
+class TestSnapshotQueries:
+    def test_no_candidate_scan(self, client, db, create_user, auth_headers, snapshot):
+        _, token = create_user(email="q0@test.com", gender="male", gender_preference='["female"]')
+        for i in range(1, 4):
+            create_user(email=f"q{i}@test.com", gender="female", gender_preference='["male"]')
+        _discover(client, token, auth_headers)  # builds the snapshot
+
+        statements = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.get_bind(), "before_cursor_execute", _record)
+        try:
+            body = _discover(client, token, auth_headers)
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", _record)
+        assert body["total"] == 3
+        assert body["total_exact"] is False  # the snapshot may lag other workers
+        assert not any("ORDER BY users.created_at DESC" in s for s in statements)
+        assert not any("onboarding_status" in s and "EXISTS" in s for s in statements)
+
+    def test_falls_back_to_sql_without_numpy(self, client, create_user, auth_headers, snapshot, monkeypatch):
+        monkeypatch.setattr(snapshot_service, "numpy_available", lambda: False)
+        _, token = create_user(email="n0@test.com", gender="male", gender_preference='["female"]')
+        other, _ = create_user(email="n1@test.com", gender="female", gender_preference='["male"]')
+        assert _ids(_discover(client, token, auth_headers)) == [other.id]
+        assert snapshot.current is None
+
+
+class TestSnapshotOnboarding:
+    def test_completed_onboarding_enters_snapshot(self, client, db, create_user, auth_headers, snapshot):
+        _, token = create_user(email="o0@test.com", gender="male", gender_preference='["female"]')
+        other, _ = create_user(email="o1@test.com", gender="female", gender_preference='["male"]')
+        state = db.query(ConversationState).filter(ConversationState.user_id == other.id).one()
+        state.onboarding_status = "in_progress"
+        db.commit()
+        assert _discover(client, token, auth_headers)["total"] == 0
+
+        from app.services.chat_service import _advance_topic
+        _advance_topic(db, state, "All done! [ONBOARDING_COMPLETE]")
+        assert db.query(UserProfile).filter(UserProfile.user_id == other.id).count() == 1
+        assert _ids(_discover(client, token, auth_headers)) == [other.id]
@@ -0,0 +1,254 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.jobs import Job, MemoryQueue, enqueue, job, set_queue
+from app.jobs.queue import HANDLERS, run_job
+from app.jobs.sqlite_queue import SQLiteQueue
+from app.jobs.worker import AsyncWorker, run_worker
+
+calls: list[tuple[str, dict]] = []
+failures_left = {"n": 0}
+
+
+@job("test.record")
+def _record(**kwargs):
+    calls.append(("record", kwargs))
+
+
+@job("test.flaky", max_attempts=3)
+def _flaky(**kwargs):
+    if failures_left["n"] > 0:
+        failures_left["n"] -= 1
+        raise RuntimeError("boom")
+    calls.append(("flaky", kwargs))
+
+
+@pytest.fixture(autouse=True)
+def _reset_calls():
+    calls.clear()
+    failures_left["n"] = 0
+
+
+@pytest.fixture()
+def no_backoff(monkeypatch):
+    monkeypatch.setattr("app.jobs.queue.settings.JOB_RETRY_BACKOFF", 0.0)
+
+
+class TestEnqueue:
+    def test_inline_runs_immediately(self):
+        job_id = enqueue("test.record", x=1)
+        assert job_id
+        assert calls == [("record", {"x": 1})]
+
+    def test_accepts_registered_function(self):
+        enqueue(_record, x=2)
+        assert calls == [("record", {"x": 2})]
+
+    def test_unknown_job_rejected(self):
+        with pytest.raises(ValueError):
+            enqueue("test.missing")
+
+    def test_idempotency_key_deduplicates(self):
+        assert enqueue("test.record", idempotency_key="k1", x=1)
+        assert enqueue("test.record", idempotency_key="k1", x=1) is None
+        assert len(calls) == 1
+
+    def test_retries_until_success(self, _inline_jobs):
+        failures_left["n"] = 2
+        enqueue("test.flaky", x=1)
+        assert calls == [("flaky", {"x": 1})]
+        assert _inline_jobs.buried == []
+
+    def test_gives_up_after_max_attempts(self, _inline_jobs):
+        failures_left["n"] = 5
+        enqueue("test.flaky", x=1)
+        assert calls == []
+        [(buried, error)] = _inline_jobs.buried
+        assert buried.attempts == 3
+        assert "boom" in error
+
+
+class TestMemoryQueue:
+    def test_delay_and_retry_backoff(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("app.jobs.queue.time.time", lambda: now[0])
+        queue = MemoryQueue()
+        set_queue(queue)
+        failures_left["n"] = 1
+
+        enqueue("test.flaky", delay=5)
+        assert queue.reserve() is None
+        now[0] += 5
+        job_ = queue.reserve()
+        assert not run_job(queue, job_)
+        assert queue.reserve() is None  # backing off
+
+        now[0] += 2
+        assert run_job(queue, queue.reserve())
+        assert calls == [("flaky", {})]
+        assert len(queue) == 0
+
+    def test_async_worker_drains_queue(self):
+        queue = MemoryQueue()
+        set_queue(queue)
+
+        async def _main():
+            worker = AsyncWorker(queue, poll_interval=5)
+            worker.start()
+            enqueue("test.record", n=1)
+            enqueue("test.record", n=2)
+            for _ in range(100):
+                if len(calls) == 2:
+                    break
+                await asyncio.sleep(0.01)
+            await worker.stop()
+
+        asyncio.run(_main())
+        assert calls == [("record", {"n": 1}), ("record", {"n": 2})]
+
+
+class TestSQLiteQueue:
+    def test_jobs_survive_a_new_queue_instance(self, tmp_path):
+        path = str(tmp_path / "jobs.db")
+        SQLiteQueue(path).push(Job(name="test.record", kwargs={"a": 1}), 0)
+
+        queue = SQLiteQueue(path)
+        job_ = queue.reserve()
+        assert job_.kwargs == {"a": 1}
+        assert queue.reserve() is None  # leased
+        assert run_job(queue, job_)
+        assert queue.counts() == {}
+
+    def test_idempotency_key_outlives_completion(self, tmp_path):
+        queue = SQLiteQueue(str(tmp_path / "jobs.db"))
+        assert queue.push(Job(name="test.record", kwargs={}, idempotency_key="k"), 0)
+        run_job(queue, queue.reserve())
+        assert not queue.push(Job(name="test.record", kwargs={}, idempotency_key="k"), 0)
+        assert queue.counts() == {"done": 1}
+
+    def test_expired_lease_is_handed_out_again(self, tmp_path, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("app.jobs.sqlite_queue.time.time", lambda: now[0])
+        queue = SQLiteQueue(str(tmp_path / "jobs.db"))
+        queue.push(Job(name="test.record", kwargs={}), 0)
+        first = queue.reserve()
+        assert queue.reserve() is None
+
+        now[0] += 301  # JOB_VISIBILITY_TIMEOUT
+        assert queue.reserve().id == first.id
+
+    def test_job_that_keeps_losing_its_lease_is_buried(self, tmp_path, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("app.jobs.sqlite_queue.time.time", lambda: now[0])
+        queue = SQLiteQueue(str(tmp_path / "jobs.db"))
+        queue.push(Job(name="test.flaky", kwargs={}), 0)
+        for attempts in range(3):  # test.flaky: max_attempts=3
+            job_ = queue.reserve()
+            assert job_.attempts == attempts
+            now[0] += 301  # the worker died mid-run
+
+        assert not run_job(queue, queue.reserve())
+        assert calls == []
+        assert queue.counts() == {"dead": 1}
+
+    def test_retry_then_dead(self, tmp_path, no_backoff):
+        queue = SQLiteQueue(str(tmp_path / "jobs.db"))
+        failures_left["n"] = 5
+        queue.push(Job(name="test.flaky", kwargs={}), 0)
+        for _ in range(3):
+            run_job(queue, queue.reserve())
+        assert queue.reserve() is None
+        assert queue.counts() == {"dead": 1}
+
+    def test_cli_worker_burst(self, tmp_path):
+        queue = SQLiteQueue(str(tmp_path / "jobs.db"))
+        for i in range(3):
+            queue.push(Job(name="test.record", kwargs={"i": i}), 0)
+        assert run_worker(queue, threading.Event(), burst=True) == 3
+        assert [kw["i"] for _, kw in calls] == [0, 1, 2]
+
+
+class TestRedisQueue:
+    @pytest.fixture()
+    def queue(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        from app.jobs.redis_queue import RedisQueue
+        return RedisQueue(fakeredis.FakeRedis(decode_responses=True))
+
+    def test_push_reserve_ack(self, queue):
+        assert queue.push(Job(name="test.record", kwargs={"a": 1}, idempotency_key="k"), 0)
+        assert not queue.push(Job(name="test.record", kwargs={"a": 1}, idempotency_key="k"), 0)
+        job_ = queue.reserve()
+        assert queue.reserve() is None
+        assert run_job(queue, job_)
+        assert calls == [("record", {"a": 1})]
+
+    def test_retry_and_bury(self, queue, no_backoff):
+        failures_left["n"] = 5
+        queue.push(Job(name="test.flaky", kwargs={}), 0)
+        for _ in range(3):
+            run_job(queue, queue.reserve())
+        assert queue.reserve() is None
+        assert queue._redis.llen(queue._dead) == 1
+
+    def test_expired_lease_counts_as_an_attempt(self, queue, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("app.jobs.redis_queue.time.time", lambda: now[0])
+        queue.push(Job(name="test.record", kwargs={}), 0)
+        assert queue.reserve().attempts == 0
+        now[0] += 301
+        assert queue.reserve().attempts == 1
+
+
+class TestAppJobs:
+    def test_match_is_scored_by_job(self, client, create_user, auth_headers, db):
+        from app.models.match import Match
+
+        user1, token1 = create_user(email="job1@test.com")
+        user2, token2 = create_user(email="job2@test.com")
+        client.post("/api/v1/matches/like", json={"liked_user_id": user2.id}, headers=auth_headers(token1))
+        r = client.post("/api/v1/matches/like", json={"liked_user_id": user1.id}, headers=auth_headers(token2))
+        match = db.get(Match, r.json()["match_id"])
+        assert match.compatibility_score is not None
+        assert match.compatibility_score > 0
+
+    def test_deleted_photo_file_is_removed(self, client, auth_headers, upload_root):
+        r = client.post("/api/v1/auth/signup", json={"email": "job3@test.com", "password": "password123"})
+        headers = auth_headers(r.json()["access_token"])
+        from tests.test_profile import _make_png_bytes
+
+        png = _make_png_bytes()
+        r = client.post("/api/v1/profile/me/photos", files={"file": ("a.png", png, "image/png")}, headers=headers)
+        assert r.status_code == 201
+        stored = upload_root / r.json()["file_path"]
+        assert stored.exists()
+
+        assert client.delete(f"/api/v1/profile/me/photos/{r.json()['id']}", headers=headers).status_code == 204
+        assert not stored.exists()
+
+
+def test_handlers_registered():
+    assert {"remove_upload", "remove_user_uploads", "purge_account", "score_match"} <= set(HANDLERS)
+
+
+def test_incomplete_backend_fails_at_construction():
+    from app.jobs.queue import JobQueue
+
+    class NoBury(JobQueue):
+        def push(self, job, run_at):
+            return True
+
+        def reserve(self):
+            return None
+
+        def ack(self, job):
+            pass
+
+        def retry(self, job, run_at, error):
+            pass
+
+    with pytest.raises(TypeError, match="bury"):
+        NoBury()
@@ -189,3 +189,30 @@ class TestUnmatch:
         # User3 is not part of this match
         r = client.delete(f"/api/v1/matches/{match_id}", headers=auth_headers(token3))
         assert r.status_code == 403
+
+
+class TestMatchCardView:
+    def test_card_view_skips_profiles(self, client, db, create_user, auth_headers):
+        from sqlalchemy import event
+
+        user1, token1 = create_user(email="mcv1@test.com", gender="male", gender_preference='["female"]')
+        user2, token2 = create_user(email="mcv2@test.com", gender="female", gender_preference='["male"]')
+        client.post("/api/v1/matches/like", json={"liked_user_id": user2.id}, headers=auth_headers(token1))
+        client.post("/api/v1/matches/like", json={"liked_user_id": user1.id}, headers=auth_headers(token2))
+
+        statements = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.get_bind(), "before_cursor_execute", _record)
+        try:
+            r = client.get("/api/v1/matches?view=card", headers=auth_headers(token1))
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", _record)
+        assert r.status_code == 200
+        other = r.json()["matches"][0]["other_user"]
+        assert other["id"] == user2.id
+        assert "profile" not in other and "photos" not in other
+        assert other["primary_photo"] is None
+        assert not any("FROM user_profiles" in s for s in statements)
@@ -142,7 +142,7 @@ class TestMessageBlockCheck:
 
 
 class TestMessageRateLimit:
-    def test_rate_limit_on_messages(self, client, create_user, auth_headers):
+    def test_rate_limit_on_messages(self, client, create_user, auth_headers, rate_limit_clock):
         _, token1, _, _, match_id = _create_match(client, create_user, auth_headers)
 
         # message_rate_limiter allows 60 requests per 60 seconds
@@ -0,0 +1,49 @@
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+
+from app.database import Base
+from app.migrate import alembic_config, upgrade_database
+import app.models  # noqa: F401
+
+
+def _engine(tmp_path, name="migrated.db"):
+    return create_engine(f"sqlite:///{tmp_path / name}")
+
+
+def _version(engine):
+    with engine.connect() as conn:
+        return MigrationContext.configure(conn).get_current_revision()
+
+
+def _head():
+    from alembic.script import ScriptDirectory
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+class TestMigrations:
+    def test_migrations_match_models(self, tmp_path):
+        engine = _engine(tmp_path)
+        upgrade_database(engine)
+        with engine.connect() as conn:
+            diff = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+        assert diff == []
+        assert _version(engine) == _head()
+
+    def test_create_all_database_is_stamped_and_upgraded(self, tmp_path):
+        engine = _engine(tmp_path, "legacy.db")
+        upgrade_database(engine, "0001")
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE alembic_version")
+
+        upgrade_database(engine)
+
+        assert _version(engine) == _head()
+        index_names = {ix["name"] for ix in inspect(engine).get_indexes("likes")}
+        assert "ix_likes_liker_liked_pass" in index_names
+
+    def test_upgrade_is_idempotent(self, tmp_path):
+        engine = _engine(tmp_path)
+        upgrade_database(engine)
+        upgrade_database(engine)
+        assert _version(engine) == _head()
@@ -0,0 +1,153 @@
+import hashlib
+import io
+
+from app.config import settings
+from app.utils.signed_urls import photo_link_query
+from tests.test_profile import _make_jpeg_bytes
+
+
+def _upload(client, token, auth_headers, size=(60, 40)):
+    r = client.post(
+        "/api/v1/profile/me/photos",
+        files={"file": ("photo.jpg", io.BytesIO(_make_jpeg_bytes(size=size)), "image/jpeg")},
+        headers=auth_headers(token),
+    )
+    assert r.status_code == 201
+    return r.json()
+
+
+class TestPhotoServing:
+    def test_cache_headers(self, client, create_user, auth_headers):
+        _, token = create_user(email="ps1@test.com")
+        _, viewer = create_user(email="ps2@test.com")
+        photo = _upload(client, token, auth_headers)
+        digest = hashlib.sha256(_make_jpeg_bytes(size=(60, 40))).hexdigest()
+
+        r = client.get(photo["url"], headers=auth_headers(viewer))
+        assert r.status_code == 200
+        assert r.headers["content-type"] == "image/webp"
+        assert r.headers["cache-control"].startswith("private, max-age=")
+        assert r.headers["etag"] == f'"{digest}_full"'
+        assert r.headers["last-modified"].endswith("GMT")
+        assert r.headers["accept-ranges"] == "bytes"
+
+    def test_conditional_requests_return_304(self, client, create_user, auth_headers):
+        _, token = create_user(email="ps3@test.com")
+        photo = _upload(client, token, auth_headers)
+        first = client.get(photo["thumbnail_url"], headers=auth_headers(token))
+
+        r = client.get(photo["thumbnail_url"], headers={**auth_headers(token), "If-None-Match": first.headers["etag"]})
+        assert r.status_code == 304
+        assert r.content == b""
+        assert r.headers["etag"] == first.headers["etag"]
+
+        r = client.get(photo["thumbnail_url"], headers={
+            **auth_headers(token), "If-Modified-Since": first.headers["last-modified"],
+        })
+        assert r.status_code == 304
+
+        r = client.get(photo["thumbnail_url"], headers={**auth_headers(token), "If-None-Match": '"other"'})
+        assert r.status_code == 200
+
+    def test_byte_ranges(self, client, create_user, auth_headers):
+        _, token = create_user(email="ps4@test.com")
+        photo = _upload(client, token, auth_headers)
+        full = client.get(photo["url"], headers=auth_headers(token)).content
+        size = len(full)
+
+        r = client.get(photo["url"], headers={**auth_headers(token), "Range": "bytes=0-9"})
+        assert r.status_code == 206
+        assert r.content == full[:10]
+        assert r.headers["content-range"] == f"bytes 0-9/{size}"
+
+        r = client.get(photo["url"], headers={**auth_headers(token), "Range": "bytes=-5"})
+        assert r.content == full[-5:]
+
+        r = client.get(photo["url"], headers={**auth_headers(token), "Range": f"bytes={size}-"})
+        assert r.status_code == 416
+        assert r.headers["content-range"] == f"bytes */{size}"
+
+        # A stale If-Range gets the whole file
+        r = client.get(photo["url"], headers={**auth_headers(token), "Range": "bytes=0-9", "If-Range": '"stale"'})
+        assert r.status_code == 200
+        assert r.content == full
+
+    def test_blocked_users_cannot_fetch(self, client, create_user, auth_headers):
+        owner, token = create_user(email="ps5@test.com")
+        viewer, viewer_token = create_user(email="ps6@test.com")
+        photo = _upload(client, token, auth_headers)
+        client.post("/api/v1/block", json={"blocked_user_id": viewer.id}, headers=auth_headers(token))
+
+        assert client.get(photo["url"], headers=auth_headers(viewer_token)).status_code == 404
+        assert client.get(photo["url"], headers=auth_headers(token)).status_code == 200
+
+    def test_deactivated_and_deleted_photos_not_served(self, client, create_user, auth_headers):
+        _, token = create_user(email="ps7@test.com")
+        _, viewer = create_user(email="ps8@test.com")
+        photo = _upload(client, token, auth_headers)
+
+        client.post("/api/v1/account/deactivate", headers=auth_headers(token))
+        assert client.get(photo["url"], headers=auth_headers(viewer)).status_code == 404
+        client.post("/api/v1/account/reactivate", headers=auth_headers(token))
+        assert client.get(photo["url"], headers=auth_headers(viewer)).status_code == 200
+
+        client.delete(f"/api/v1/profile/me/photos/{photo['id']}", headers=auth_headers(token))
+        assert client.get(photo["url"], headers=auth_headers(viewer)).status_code == 404
+
+    def test_requires_signature_or_auth_and_known_variant(self, client, create_user, auth_headers):
+        _, token = create_user(email="ps9@test.com")
+        photo = _upload(client, token, auth_headers)
+        unsigned = f"/api/v1/photos/{photo['id']}/full"
+        assert client.get(unsigned).status_code == 401
+        assert client.get(unsigned, headers=auth_headers(token)).status_code == 200
+        assert client.get(unsigned, headers=auth_headers("not-a-token")).status_code == 401
+        assert client.get(f"/api/v1/photos/{photo['id']}/original", headers=auth_headers(token)).status_code == 404
+
+    def test_signed_links_work_without_a_token(self, client, create_user, auth_headers):
+        _, token = create_user(email="ps11@test.com")
+        photo = _upload(client, token, auth_headers)
+        assert "sig=" in photo["url"] and "sig=" in photo["thumbnail_url"]
+
+        r = client.get(photo["url"])
+        assert r.status_code == 200
+        assert r.headers["content-type"] == "image/webp"
+
+        # Signed for one variant only, and not after it expires or is edited
+        assert client.get(photo["url"].replace("/full?", "/thumb?")).status_code == 401
+        assert client.get(photo["url"].replace("sig=", "sig=x")).status_code == 401
+        expired = f"/api/v1/photos/{photo['id']}/full?{photo_link_query(photo['id'], 'full', now=0)}"
+        assert client.get(expired).status_code == 401
+
+        client.post("/api/v1/account/deactivate", headers=auth_headers(token))
+        assert client.get(photo["url"]).status_code == 404
+
+    def test_signed_links_stable_within_a_window(self):
+        window = settings.PHOTO_URL_TTL
+        first = photo_link_query("p1", "full", now=10 * window)
+        assert photo_link_query("p1", "full", now=11 * window - 1) == first
+        assert photo_link_query("p1", "full", now=11 * window) != first
+
+    def test_legacy_uploads_redirect_to_signed_links(self, client, create_user, auth_headers, monkeypatch):
+        _, token = create_user(email="ps12@test.com")
+        photo = _upload(client, token, auth_headers)
+        thumb_key = photo["file_path"].replace("_full.", "_thumb.")
+
+        r = client.get(f"/uploads/{photo['file_path']}", follow_redirects=False)
+        assert r.status_code == 307
+        assert r.headers["location"].startswith(f"/api/v1/photos/{photo['id']}/full?")
+        r = client.get(f"/uploads/{thumb_key}")
+        assert r.status_code == 200
+        assert r.content == client.get(photo["thumbnail_url"]).content
+        assert client.get("/uploads/blobs/00/unknown_full.webp").status_code == 404
+
+        monkeypatch.setattr("app.routers.photos.settings.PHOTO_LEGACY_UPLOADS", False)
+        assert client.get(f"/uploads/{photo['file_path']}", follow_redirects=False).status_code == 404
+
+    def test_sendfile_offload(self, client, create_user, auth_headers, monkeypatch):
+        monkeypatch.setattr("app.routers.photos.settings.PHOTO_SENDFILE_HEADER", "X-Accel-Redirect")
+        _, token = create_user(email="ps10@test.com")
+        photo = _upload(client, token, auth_headers)
+        r = client.get(photo["url"], headers=auth_headers(token))
+        assert r.status_code == 200
+        assert r.content == b""
+        assert r.headers["x-accel-redirect"] == f"/protected-uploads/{photo['file_path']}"
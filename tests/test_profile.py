@@ -1,8 +1,11 @@
+import hashlib
 import io
 import json
 import struct
 import zlib
 
+import pytest
+
 
 def _make_png_bytes():
     """Minimal valid PNG (1x1 transparent pixel)."""
@@ -18,9 +21,13 @@ def _make_png_bytes():
     return sig + _chunk(b"IHDR", ihdr) + _chunk(b"IDAT", idat) + _chunk(b"IEND", b"")
 
 
-def _make_jpeg_bytes():
-    """Minimal JPEG-like header bytes."""
-    return b"\xff\xd8\xff\xe0" + b"\x00" * 100
+def _make_jpeg_bytes(size=(8, 8), exif=None):
+    """Small real JPEG; uploads are decoded, so header bytes alone are rejected."""
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", size, (200, 120, 40)).save(buf, "JPEG", exif=exif or b"")
+    return buf.getvalue()
 
 
 class TestUpdateProfile:
@@ -239,6 +246,274 @@ class TestPhotoUpload:
         assert r.json()["order_index"] == 1
 
 
+class TestStreamingUpload:
+    BOUNDARY = "test-boundary"
+    CHUNK = 64 * 1024
+
+    def _body(self, data, field="file", filename="photo.png", content_type="image/png"):
+        head = (
+            f"--{self.BOUNDARY}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        )
+        return head.encode() + data + f"\r\n--{self.BOUNDARY}--\r\n".encode()
+
+    def _request(self, body, content_length=True):
+        """Request whose body arrives in CHUNK-sized messages; returns it and the list of chunks read."""
+        from starlette.requests import Request
+
+        chunks = [body[i:i + self.CHUNK] for i in range(0, len(body), self.CHUNK)]
+        read = []
+
+        async def receive():
+            chunk = chunks.pop(0) if chunks else b""
+            read.append(chunk)
+            return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+        headers = [(b"content-type", f"multipart/form-data; boundary={self.BOUNDARY}".encode())]
+        if content_length:
+            headers.append((b"content-length", str(len(body)).encode()))
+        return Request({"type": "http", "method": "POST", "path": "/", "headers": headers}, receive), read
+
+    def _receive(self, request, dest):
+        import asyncio
+        from app.routers.profile import MAX_PHOTO_SIZE, _check_image_head
+        from app.utils.uploads import receive_file
+
+        return asyncio.run(receive_file(
+            request, "file", max_size=MAX_PHOTO_SIZE, too_large="too large",
+            accept=lambda filename, content_type: dest, check_head=_check_image_head,
+        ))
+
+    def test_streams_to_destination(self, tmp_path):
+        data = _make_png_bytes() + b"\x00" * (3 * self.CHUNK + 17)
+        request, read = self._request(self._body(data))
+        dest = tmp_path / "u1" / "photo.png"
+        received = self._receive(request, dest)
+        assert received.path == dest
+        assert dest.read_bytes() == data
+        assert received.sha256 == hashlib.sha256(data).hexdigest()
+        assert received.size == len(data)
+        assert [p.name for p in dest.parent.iterdir()] == ["photo.png"]
+
+    def test_oversized_upload_stops_reading(self, tmp_path):
+        from fastapi import HTTPException
+        from app.routers.profile import MAX_PHOTO_SIZE
+
+        body = self._body(_make_png_bytes() + b"\x00" * (2 * MAX_PHOTO_SIZE))
+        request, read = self._request(body, content_length=False)
+        with pytest.raises(HTTPException) as exc:
+            self._receive(request, tmp_path / "photo.png")
+        assert exc.value.status_code == 413
+        assert sum(map(len, read)) <= MAX_PHOTO_SIZE + 2 * self.CHUNK
+        assert list(tmp_path.iterdir()) == []
+
+    def test_content_length_rejected_before_reading(self, tmp_path):
+        from fastapi import HTTPException
+        from app.routers.profile import MAX_PHOTO_SIZE
+
+        request, read = self._request(self._body(_make_png_bytes() + b"\x00" * (2 * MAX_PHOTO_SIZE)))
+        with pytest.raises(HTTPException) as exc:
+            self._receive(request, tmp_path / "photo.png")
+        assert exc.value.status_code == 413
+        assert read == []
+
+    def test_bad_magic_bytes_rejected_before_writing(self, tmp_path):
+        from fastapi import HTTPException
+
+        request, read = self._request(self._body(b"this is not a png" * 10_000))
+        with pytest.raises(HTTPException) as exc:
+            self._receive(request, tmp_path / "photo.png")
+        assert exc.value.status_code == 400
+        assert len(read) == 1
+        assert list(tmp_path.iterdir()) == []
+
+    def test_missing_file_field(self, client, create_user, auth_headers):
+        _, token = create_user(email="su1@test.com")
+        r = client.post(
+            "/api/v1/profile/me/photos",
+            files={"other": ("photo.png", io.BytesIO(_make_png_bytes()), "image/png")},
+            headers=auth_headers(token),
+        )
+        assert r.status_code == 422
+
+    def test_non_multipart_rejected(self, client, create_user, auth_headers):
+        _, token = create_user(email="su2@test.com")
+        r = client.post("/api/v1/profile/me/photos", content=_make_png_bytes(), headers=auth_headers(token))
+        assert r.status_code == 400
+
+
+class TestPhotoVariants:
+    def _upload(self, client, token, auth_headers, content, name="photo.jpg", content_type="image/jpeg"):
+        return client.post(
+            "/api/v1/profile/me/photos",
+            files={"file": (name, io.BytesIO(content), content_type)},
+            headers=auth_headers(token),
+        )
+
+    def test_large_upload_is_resized_to_webp_variants(self, client, create_user, auth_headers, upload_root):
+        from PIL import Image
+
+        user, token = create_user(email="pv1@test.com")
+        r = self._upload(client, token, auth_headers, _make_jpeg_bytes(size=(2400, 1200)))
+        assert r.status_code == 201
+        data = r.json()
+        assert data["file_path"].endswith("_full.webp")
+        assert data["thumbnail_url"].startswith(f"/api/v1/photos/{data['id']}/thumb?exp=")
+
+        sizes = {}
+        for key in ("url", "medium_url", "thumbnail_url"):
+            served = client.get(data[key], headers=auth_headers(token))
+            assert served.headers["content-type"] == "image/webp"
+            with Image.open(io.BytesIO(served.content)) as img:
+                assert img.format == "WEBP"
+                sizes[key] = img.size
+        assert sizes == {"url": (1600, 800), "medium_url": (800, 400), "thumbnail_url": (320, 160)}
+        # Only the variants are kept, not the original upload
+        assert not list((upload_root / user.id).glob("*.jpg"))
+
+    def test_exif_is_stripped(self, client, create_user, auth_headers, upload_root):
+        from PIL import Image
+
+        exif = Image.Exif()
+        exif[0x010F] = "SecretCam"  # Make
+        _, token = create_user(email="pv2@test.com")
+        r = self._upload(client, token, auth_headers, _make_jpeg_bytes(exif=exif.tobytes()))
+        assert r.status_code == 201
+        with Image.open(upload_root / r.json()["file_path"]) as img:
+            assert not img.getexif()
+            assert "exif" not in img.info
+
+    def test_undecodable_image_rejected(self, client, create_user, auth_headers):
+        _, token = create_user(email="pv3@test.com")
+        truncated = _make_jpeg_bytes()[:20]
+        r = self._upload(client, token, auth_headers, truncated)
+        assert r.status_code == 400
+        assert "not a valid image" in r.json()["detail"]
+        r = client.get("/api/v1/profile/me", headers=auth_headers(token))
+        assert r.json()["photos"] == []
+
+    def test_variants_in_profile(self, client, create_user, auth_headers):
+        _, token = create_user(email="pv4@test.com")
+        self._upload(client, token, auth_headers, _make_png_bytes(), name="a.png", content_type="image/png")
+        r = client.get("/api/v1/profile/me", headers=auth_headers(token))
+        photo = r.json()["photos"][0]
+        assert photo["thumbnail_url"].split("?")[0].endswith("/thumb")
+        assert client.get(photo["thumbnail_url"], headers=auth_headers(token)).status_code == 200
+
+    def test_process_pool(self, tmp_path, monkeypatch):
+        from app.utils import images
+
+        monkeypatch.setattr("app.utils.images.settings.IMAGE_WORKERS", 1)
+        images.shutdown_image_pool()
+        source = tmp_path / "in.jpg"
+        source.write_bytes(_make_jpeg_bytes(size=(640, 480)))
+        try:
+            names = images.process_photo(source, tmp_path, "abc")
+        finally:
+            images.shutdown_image_pool()
+        assert names == {v: f"abc_{v}.webp" for v in images.VARIANTS}
+        assert all((tmp_path / name).exists() for name in names.values())
+
+    def test_render_timeout_cleans_up(self, tmp_path, monkeypatch):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from app.utils import images
+
+        release = threading.Event()
+
+        def slow_render(source, dest_dir, stem):
+            (tmp_path / f"{stem}_full.webp").write_bytes(b"partial")
+            release.wait(5)
+            (tmp_path / f"{stem}_thumb.webp").write_bytes(b"late")
+            return {}
+
+        pool = ThreadPoolExecutor(max_workers=1)
+        monkeypatch.setattr(images, "_pool", pool)
+        monkeypatch.setattr(images, "render_variants", slow_render)
+        monkeypatch.setattr("app.utils.images.settings.IMAGE_TIMEOUT", 0.05)
+        with pytest.raises(images.ImageProcessingUnavailable):
+            images.process_photo(tmp_path / "in.jpg", tmp_path, "abc")
+        release.set()
+        pool.shutdown(wait=True)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_crashed_worker_is_503_and_pool_replaced(self, client, create_user, auth_headers, monkeypatch):
+        from concurrent.futures import Executor, Future
+        from concurrent.futures.process import BrokenProcessPool
+        from app.services.photo_service import STAGING_DIR
+        from app.utils import images
+
+        class CrashedPool(Executor):
+            def submit(self, fn, /, *args, **kwargs):
+                future = Future()
+                future.set_exception(BrokenProcessPool("worker died"))
+                return future
+
+        monkeypatch.setattr(images, "_pool", CrashedPool())
+        _, token = create_user(email="pv5@test.com")
+        before = set(STAGING_DIR.iterdir()) if STAGING_DIR.exists() else set()
+        r = self._upload(client, token, auth_headers, _make_jpeg_bytes())
+        assert r.status_code == 503
+        assert r.headers["Retry-After"] == "5"
+        assert images._pool is None
+        assert set(STAGING_DIR.iterdir()) == before
+        assert client.get("/api/v1/profile/me", headers=auth_headers(token)).json()["photos"] == []
+
+
+class TestContentAddressedPhotos:
+    def _upload(self, client, token, auth_headers, content):
+        return client.post(
+            "/api/v1/profile/me/photos",
+            files={"file": ("photo.jpg", io.BytesIO(content), "image/jpeg")},
+            headers=auth_headers(token),
+        )
+
+    def _blob(self, db, digest):
+        from app.models.user import PhotoBlob
+
+        db.expire_all()
+        return db.get(PhotoBlob, digest)
+
+    def test_identical_uploads_share_one_blob(self, client, db, create_user, auth_headers):
+        jpeg = _make_jpeg_bytes(size=(40, 30))
+        digest = hashlib.sha256(jpeg).hexdigest()
+        _, token1 = create_user(email="ca1@test.com")
+        _, token2 = create_user(email="ca2@test.com")
+        r1 = self._upload(client, token1, auth_headers, jpeg)
+        r2 = self._upload(client, token2, auth_headers, jpeg)
+        assert r1.json()["file_path"] == r2.json()["file_path"] == f"blobs/{digest[:2]}/{digest}_full.webp"
+        assert self._blob(db, digest).refcount == 2
+
+    def test_blob_removed_with_last_reference(self, client, db, create_user, auth_headers, upload_root):
+        jpeg = _make_jpeg_bytes(size=(41, 30))
+        digest = hashlib.sha256(jpeg).hexdigest()
+        _, token1 = create_user(email="ca3@test.com")
+        _, token2 = create_user(email="ca4@test.com")
+        photo1 = self._upload(client, token1, auth_headers, jpeg).json()
+        photo2 = self._upload(client, token2, auth_headers, jpeg).json()
+        thumb = upload_root / "blobs" / digest[:2] / f"{digest}_thumb.webp"
+
+        client.delete(f"/api/v1/profile/me/photos/{photo1['id']}", headers=auth_headers(token1))
+        assert self._blob(db, digest).refcount == 1
+        assert thumb.exists()
+
+        client.delete(f"/api/v1/profile/me/photos/{photo2['id']}", headers=auth_headers(token2))
+        assert self._blob(db, digest) is None
+        assert not thumb.exists()
+
+    def test_account_deletion_releases_blobs(self, client, db, create_user, auth_headers):
+        jpeg = _make_jpeg_bytes(size=(42, 30))
+        digest = hashlib.sha256(jpeg).hexdigest()
+        _, token1 = create_user(email="ca5@test.com")
+        _, token2 = create_user(email="ca6@test.com")
+        self._upload(client, token1, auth_headers, jpeg)
+        self._upload(client, token2, auth_headers, jpeg)
+
+        assert client.delete("/api/v1/account", headers=auth_headers(token1)).status_code == 204
+        assert self._blob(db, digest).refcount == 1
+
+
 class TestPhotoDelete:
     def test_delete_own_photo(self, client, create_user, auth_headers):
         _, token = create_user(email="pd1@test.com")
@@ -352,6 +627,20 @@ class TestProfileDetailsUpdate:
         # interests should be preserved from fixture
         assert data["interests"] == ["hiking", "reading"]
 
+    def test_malformed_list_columns_are_normalized(self, client, create_user, auth_headers, db):
+        user, token = create_user(email="pdu5@test.com", interests='"hiking"', values='[1, "kind", null, ["x"]]')
+        user.profile.personality_traits = '{"calm": true}'
+        user.languages = "not json"
+        db.commit()
+
+        r = client.get("/api/v1/profile/me", headers=auth_headers(token))
+        assert r.status_code == 200
+        data = r.json()
+        assert data["profile"]["interests"] == ["hiking"]
+        assert data["profile"]["values"] == ["1", "kind"]
+        assert data["profile"]["personality_traits"] is None
+        assert data["languages"] is None
+
 
 class TestBlockedLikePass:
     def test_cannot_like_blocked_user(self, client, create_user, auth_headers):
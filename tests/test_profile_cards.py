@@ -0,0 +1,111 @@
+import io
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.models.user import User
+from app.services.card_service import card_cache
+from tests.test_profile import _make_png_bytes
+
+
+def _pair(create_user):
+    viewer, viewer_token = create_user(email="viewer@test.com", gender="male", gender_preference='["female"]')
+    shown, shown_token = create_user(email="shown@test.com", gender="female", gender_preference='["male"]')
+    return viewer, viewer_token, shown, shown_token
+
+
+def _card(client, token, user_id, auth_headers):
+    r = client.get("/api/v1/discover", headers=auth_headers(token))
+    assert r.status_code == 200
+    return next(u for u in r.json()["users"] if u["id"] == user_id)
+
+
+class TestProfileVersion:
+    def test_bumped_by_profile_and_photo_writes(self, client, db, create_user, auth_headers):
+        _, _, shown, token = _pair(create_user)
+
+        def version():
+            db.expire_all()
+            return db.get(User, shown.id).profile_version
+
+        start = version()
+        client.put("/api/v1/profile/me", json={"job_title": "Chef"}, headers=auth_headers(token))
+        assert version() == start + 1
+        client.put("/api/v1/profile/me/profile", json={"bio": "Hello"}, headers=auth_headers(token))
+        assert version() == start + 2
+        r = client.post(
+            "/api/v1/profile/me/photos",
+            files={"file": ("a.png", io.BytesIO(_make_png_bytes()), "image/png")},
+            headers=auth_headers(token),
+        )
+        assert version() == start + 3
+        client.delete(f"/api/v1/profile/me/photos/{r.json()['id']}", headers=auth_headers(token))
+        assert version() == start + 4
+
+
+class TestCardCache:
+    def test_second_page_skips_photo_query(self, client, db, create_user, auth_headers):
+        _, viewer_token, shown, _ = _pair(create_user)
+        photo_queries = []
+
+        def _count(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("SELECT") and "FROM user_photos" in statement:
+                photo_queries.append(statement)
+
+        event.listen(db.get_bind(), "before_cursor_execute", _count)
+        try:
+            _card(client, viewer_token, shown.id, auth_headers)
+            assert len(photo_queries) == 1
+            _card(client, viewer_token, shown.id, auth_headers)
+            assert len(photo_queries) == 1
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", _count)
+        assert len(card_cache) >= 1
+
+    def test_update_replaces_cached_card(self, client, create_user, auth_headers):
+        _, viewer_token, shown, shown_token = _pair(create_user)
+        assert _card(client, viewer_token, shown.id, auth_headers)["job_title"] != "Chef"
+
+        client.put("/api/v1/profile/me", json={"job_title": "Chef"}, headers=auth_headers(shown_token))
+        assert _card(client, viewer_token, shown.id, auth_headers)["job_title"] == "Chef"
+
+        r = client.post(
+            "/api/v1/profile/me/photos",
+            files={"file": ("a.png", io.BytesIO(_make_png_bytes()), "image/png")},
+            headers=auth_headers(shown_token),
+        )
+        photos = _card(client, viewer_token, shown.id, auth_headers)["photos"]
+        assert [p["id"] for p in photos] == [r.json()["id"]]
+
+    def test_hiding_a_field_replaces_cached_card(self, client, create_user, auth_headers):
+        _, viewer_token, shown, shown_token = _pair(create_user)
+        client.put("/api/v1/profile/me", json={"job_title": "Chef"}, headers=auth_headers(shown_token))
+        assert _card(client, viewer_token, shown.id, auth_headers)["job_title"] == "Chef"
+
+        client.put("/api/v1/profile/me", json={"hidden_fields": ["job_title"]}, headers=auth_headers(shown_token))
+        assert _card(client, viewer_token, shown.id, auth_headers)["job_title"] is None
+
+    def test_viewer_specific_fields_not_cached(self, client, create_user, auth_headers):
+        _, viewer_token, shown, _ = _pair(create_user)
+        _, other_token = create_user(
+            email="other@test.com", gender="male", gender_preference='["female"]', latitude=40.8, longitude=-74.0,
+        )
+        near = _card(client, viewer_token, shown.id, auth_headers)
+        far = _card(client, other_token, shown.id, auth_headers)
+        assert near["distance_km"] < 1 < far["distance_km"]
+
+    def test_photo_urls_resolved_per_response(self, client, create_user, auth_headers, monkeypatch):
+        _, viewer_token, shown, shown_token = _pair(create_user)
+        client.post(
+            "/api/v1/profile/me/photos",
+            files={"file": ("a.png", io.BytesIO(_make_png_bytes()), "image/png")},
+            headers=auth_headers(shown_token),
+        )
+        first = _card(client, viewer_token, shown.id, auth_headers)["photos"][0]
+
+        # A later signing window: the cached card must not hand out the old, expiring link
+        monkeypatch.setattr(settings, "PHOTO_URL_TTL", settings.PHOTO_URL_TTL + 1)
+        again = _card(client, viewer_token, shown.id, auth_headers)["photos"][0]
+        assert again["id"] == first["id"]
+        assert again["url"] != first["url"]
+        assert client.get(again["url"]).status_code == 200
@@ -0,0 +1,369 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.utils import rate_limiter as rl
+from app.utils.rate_limiter import (
+    AsyncRedisGCRARateLimiter, GCRARateLimiter, InMemoryRateLimiter, RedisGCRARateLimiter, check_rate_limits,
+)
+
+
+@pytest.fixture()
+def clock(rate_limit_clock, monkeypatch):
+    monkeypatch.setattr(rl, "_redis_down_until", 0.0)
+    return rate_limit_clock
+
+
+class TestGCRARateLimiter:
+    def test_allows_burst_up_to_limit(self, clock):
+        limiter = GCRARateLimiter(max_requests=5, window_seconds=60, name="t")
+        for _ in range(5):
+            limiter.check("a")
+        with pytest.raises(HTTPException) as exc:
+            limiter.check("a")
+        assert exc.value.status_code == 429
+        assert "rate limit" in exc.value.detail.lower()
+
+    def test_keys_are_independent(self, clock):
+        limiter = GCRARateLimiter(max_requests=1, window_seconds=60, name="t")
+        limiter.check("a")
+        limiter.check("b")
+        with pytest.raises(HTTPException):
+            limiter.check("a")
+
+    def test_refills_at_sustained_rate(self, clock):
+        limiter = GCRARateLimiter(max_requests=6, window_seconds=60, name="t")
+        for _ in range(6):
+            limiter.check("a")
+        # One request every 10 seconds at the sustained rate
+        clock.now += 9.9
+        with pytest.raises(HTTPException):
+            limiter.check("a")
+        clock.now += 0.1
+        limiter.check("a")
+        with pytest.raises(HTTPException):
+            limiter.check("a")
+
+    def test_full_window_restores_whole_burst(self, clock):
+        limiter = GCRARateLimiter(max_requests=3, window_seconds=60, name="t")
+        for _ in range(3):
+            limiter.check("a")
+        clock.now += 60
+        for _ in range(3):
+            limiter.check("a")
+
+    def test_rejected_requests_do_not_consume_quota(self, clock):
+        limiter = GCRARateLimiter(max_requests=2, window_seconds=60, name="t")
+        limiter.check("a")
+        limiter.check("a")
+        for _ in range(10):
+            with pytest.raises(HTTPException):
+                limiter.check("a")
+        clock.now += 30
+        limiter.check("a")
+
+    def test_cleanup_drops_idle_keys(self, clock):
+        limiter = GCRARateLimiter(max_requests=10, window_seconds=60, name="t")
+        for i in range(100):
+            limiter.check(f"user-{i}")
+        assert sum(len(tats) for _, tats in limiter._shards) == 100
+
+        # Once every bucket has refilled, each shard sheds its keys on next use
+        clock.now += limiter._cleanup_interval + 60
+        for i in range(1000):
+            limiter.check(f"other-{i}")
+        remaining = {key for _, tats in limiter._shards for key in tats}
+        assert not any(key.startswith("user-") for key in remaining)
+
+    def test_reset(self, clock):
+        limiter = GCRARateLimiter(max_requests=1, window_seconds=60, name="t")
+        limiter.check("a")
+        limiter.reset()
+        limiter.check("a")
+
+
+def test_default_limiters_use_gcra():
+    for limiter in (rl.chat_rate_limiter, rl.auth_rate_limiter, rl.auth_ip_rate_limiter, rl.message_rate_limiter):
+        assert isinstance(limiter, GCRARateLimiter)
+
+
+def _mock_redis(results, pipelined=()):
+    """Redis client whose registered script returns ``results`` in order.
+
+    ``pipelined`` are the successive replies of pipeline ``execute`` calls.
+    """
+    client = MagicMock()
+    script = MagicMock(side_effect=list(results))
+    client.register_script.return_value = script
+    client.pipeline.return_value.execute.side_effect = list(pipelined)
+    return client, script
+
+
+class TestRedisGCRARateLimiter:
+    def test_allowed_request_calls_script_once(self, clock):
+        client, script = _mock_redis([[0, "6.0"]])
+        limiter = RedisGCRARateLimiter(client, max_requests=10, window_seconds=60, name="t")
+        limiter.check("a")
+        script.assert_called_once()
+        kwargs = script.call_args.kwargs
+        assert kwargs["keys"] == ["ratelimit:gcra:t:{a}"]
+        # emission interval, burst tolerance; the script reads the time from Redis
+        assert kwargs["args"] == [6.0, 54.0]
+
+    def test_throttled_key_rejected_locally_until_retry_after(self, clock):
+        client, script = _mock_redis([[1, "59.0"], [0, "6.0"]])
+        limiter = RedisGCRARateLimiter(client, max_requests=10, window_seconds=60, name="t")
+        with pytest.raises(HTTPException) as exc:
+            limiter.check("a")
+        assert exc.value.status_code == 429
+
+        # Still throttled: no Redis round trip
+        clock.now += 4.9
+        with pytest.raises(HTTPException):
+            limiter.check("a")
+        assert script.call_count == 1
+
+        clock.now += 0.1
+        limiter.check("a")
+        assert script.call_count == 2
+
+    def test_check_rate_limits_one_round_trip_per_key(self, clock):
+        client, script = _mock_redis([[0, "2.0", "6.0"]])
+        minute = RedisGCRARateLimiter(client, max_requests=30, window_seconds=60, name="minute")
+        hour = RedisGCRARateLimiter(client, max_requests=600, window_seconds=3600, name="hour")
+        check_rate_limits((minute, "u1"), (hour, "u1"))
+        script.assert_called_once()
+        # One hash tag, so one Redis Cluster slot
+        assert script.call_args.kwargs["keys"] == ["ratelimit:gcra:minute:{u1}", "ratelimit:gcra:hour:{u1}"]
+
+    def test_check_rate_limits_pipelines_keys_across_slots(self, clock):
+        client, script = _mock_redis([], pipelined=[[[0, "2.0"], [0, "6.0"]]])
+        ip_limiter = RedisGCRARateLimiter(client, max_requests=30, window_seconds=60, name="ip")
+        email_limiter = RedisGCRARateLimiter(client, max_requests=10, window_seconds=60, name="email")
+        results = check_rate_limits((ip_limiter, "1.2.3.4"), (email_limiter, "a@example.com"))
+        assert [r.remaining for r in results] == [29, 9]
+
+        # One script call per slot, sent together
+        pipe = client.pipeline.return_value
+        pipe.execute.assert_called_once()
+        script.assert_not_called()
+        assert [c.args[1:3] for c in pipe.evalsha.call_args_list] == [
+            (1, "ratelimit:gcra:ip:{1.2.3.4}"),
+            (1, "ratelimit:gcra:email:{a@example.com}"),
+        ]
+
+    def test_check_rate_limits_reports_rejecting_limiter(self, clock):
+        client, script = _mock_redis([[0, "4.0"]], pipelined=[[[0, "2.0"], [1, "57.0"]]])
+        ip_limiter = RedisGCRARateLimiter(client, max_requests=30, window_seconds=60, name="ip")
+        email_limiter = RedisGCRARateLimiter(client, max_requests=10, window_seconds=60, name="email")
+        with pytest.raises(HTTPException) as exc:
+            check_rate_limits((ip_limiter, "1.2.3.4"), (email_limiter, "a@example.com"))
+        assert "10 requests" in exc.value.detail
+
+        # Only the email key is cached as throttled
+        ip_limiter.check("1.2.3.4")
+        assert script.call_count == 1
+
+    def test_pipelined_script_reloaded_after_flush(self, clock):
+        client, script = _mock_redis([[0, "6.0"]], pipelined=[[[0, "2.0"], rl._NoScriptError("NOSCRIPT")]])
+        ip_limiter = RedisGCRARateLimiter(client, max_requests=30, window_seconds=60, name="ip")
+        email_limiter = RedisGCRARateLimiter(client, max_requests=10, window_seconds=60, name="email")
+        check_rate_limits((ip_limiter, "1.2.3.4"), (email_limiter, "a@example.com"))
+        # Only the group that missed the script runs again
+        script.assert_called_once()
+        assert script.call_args.kwargs["keys"] == ["ratelimit:gcra:email:{a@example.com}"]
+
+
+    def test_connection_error_falls_back_to_memory_then_retries(self, clock):
+        client, script = _mock_redis([RedisConnectionError("down"), [0, "30.0"]])
+        limiter = RedisGCRARateLimiter(client, max_requests=2, window_seconds=60, name="t")
+        limiter.check("a")
+        # Redis is skipped during the back-off; the local fallback enforces the limit
+        limiter.check("a")
+        with pytest.raises(HTTPException):
+            limiter.check("a")
+        assert script.call_count == 1
+
+        clock.now += rl._REDIS_RETRY_INTERVAL
+        limiter.check("b")
+        assert script.call_count == 2
+
+
+class TestRedisGCRAScript:
+    """The Lua script itself, run by fakeredis's embedded Lua interpreter."""
+
+    @pytest.fixture()
+    def server(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        return fakeredis.FakeServer()
+
+    def test_burst_then_reject(self, clock, server):
+        import fakeredis
+
+        client = fakeredis.FakeRedis(server=server, decode_responses=True)
+        limiter = RedisGCRARateLimiter(client, max_requests=3, window_seconds=60, name="t")
+        assert [limiter.check("a").remaining for _ in range(3)] == [2, 1, 0]
+        with pytest.raises(HTTPException) as exc:
+            limiter.check("a")
+        assert exc.value.headers["Retry-After"] == "20"
+        limiter.check("b")
+        # The key expires once the bucket is full again
+        assert 0 < client.pttl("ratelimit:gcra:t:{a}") <= 60_000
+
+    def test_same_key_charged_all_or_nothing(self, clock, server):
+        import fakeredis
+
+        client = fakeredis.FakeRedis(server=server, decode_responses=True)
+        loose = RedisGCRARateLimiter(client, max_requests=30, window_seconds=60, name="loose")
+        tight = RedisGCRARateLimiter(client, max_requests=1, window_seconds=60, name="tight")
+        check_rate_limits((loose, "k"), (tight, "k"))
+        with pytest.raises(HTTPException):
+            check_rate_limits((loose, "k"), (tight, "k"))
+        # The rejected call charged neither key
+        assert loose.check("k").remaining == 28
+
+    def test_entities_in_one_pipeline(self, clock, server):
+        import fakeredis
+
+        client = fakeredis.FakeRedis(server=server, decode_responses=True)
+        ip_limiter = RedisGCRARateLimiter(client, max_requests=2, window_seconds=60, name="ip")
+        email_limiter = RedisGCRARateLimiter(client, max_requests=1, window_seconds=60, name="email")
+        results = check_rate_limits((ip_limiter, "1.2.3.4"), (email_limiter, "a@example.com"))
+        assert [r.remaining for r in results] == [1, 0]
+        with pytest.raises(HTTPException) as exc:
+            check_rate_limits((ip_limiter, "1.2.3.4"), (email_limiter, "a@example.com"))
+        assert "1 requests" in exc.value.detail
+
+        async def run():
+            aclient = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+            ip = AsyncRedisGCRARateLimiter(aclient, max_requests=5, window_seconds=60, name="aip")
+            email = AsyncRedisGCRARateLimiter(aclient, max_requests=5, window_seconds=60, name="aemail")
+            return await AsyncRedisGCRARateLimiter.acheck_many([(ip, "1.2.3.4"), (email, "b@example.com")])
+
+        assert [r.remaining for r in asyncio.run(run())] == [4, 4]
+
+    def test_async_client(self, clock, server):
+        import fakeredis
+
+        client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        limiter = AsyncRedisGCRARateLimiter(client, max_requests=1, window_seconds=60, name="t")
+
+        async def run():
+            await limiter.acheck("a")
+            with pytest.raises(HTTPException):
+                await limiter.acheck("a")
+
+        asyncio.run(run())
+
+
+class TestAsyncRedisGCRARateLimiter:
+    def _limiter(self, results):
+        client = MagicMock()
+        script = AsyncMock(side_effect=list(results))
+        client.register_script.return_value = script
+        return AsyncRedisGCRARateLimiter(client, max_requests=10, window_seconds=60, name="t"), script
+
+    def test_acheck_awaits_script(self, clock):
+        limiter, script = self._limiter([[0, "6.0"]])
+        asyncio.run(limiter.acheck("a"))
+        script.assert_awaited_once()
+
+    def test_acheck_rejects_and_caches(self, clock):
+        limiter, script = self._limiter([[1, "56.5"]])
+        for _ in range(3):
+            with pytest.raises(HTTPException):
+                asyncio.run(limiter.acheck("a"))
+        assert script.await_count == 1
+
+    def test_acheck_falls_back_when_redis_down(self, clock):
+        limiter, script = self._limiter([RedisConnectionError("down")])
+        asyncio.run(limiter.acheck("a"))
+        asyncio.run(limiter.acheck("a"))
+        assert script.await_count == 1
+
+
+def test_factory_does_not_latch_without_redis(monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://127.0.0.1:1/0")
+    monkeypatch.setattr(rl, "_redis_client", None)
+    limiter = rl.create_rate_limiter(max_requests=5, window_seconds=60, name="t")
+    # Redis is not contacted at construction time, so an outage at startup is not permanent
+    assert isinstance(limiter, RedisGCRARateLimiter)
+
+
+def test_check_rate_limits_in_memory_falls_back_to_sequential(clock):
+    first = GCRARateLimiter(max_requests=5, window_seconds=60, name="a")
+    second = GCRARateLimiter(max_requests=1, window_seconds=60, name="b")
+    check_rate_limits((first, "k"), (second, "k"))
+    with pytest.raises(HTTPException):
+        check_rate_limits((first, "k"), (second, "k"))
+
+
+class TestRateLimitResults:
+    def test_gcra_reports_remaining_and_reset(self, clock):
+        limiter = GCRARateLimiter(max_requests=5, window_seconds=60, name="t")
+        results = [limiter.check("a") for _ in range(5)]
+        assert [r.remaining for r in results] == [4, 3, 2, 1, 0]
+        assert results[0].reset_after == pytest.approx(12)
+        assert results[-1].reset_after == pytest.approx(60)
+
+        clock.now += 5
+        with pytest.raises(HTTPException) as exc:
+            limiter.check("a")
+        assert exc.value.headers["Retry-After"] == "7"
+        assert exc.value.headers["RateLimit-Remaining"] == "0"
+        assert exc.value.headers["RateLimit-Reset"] == "55"
+        assert "per minute" in exc.value.detail
+
+    def test_sliding_window_reports_remaining(self):
+        limiter = InMemoryRateLimiter(max_requests=3, window_seconds=30, name="t")
+        assert [limiter.check("a").remaining for _ in range(3)] == [2, 1, 0]
+        with pytest.raises(HTTPException) as exc:
+            limiter.check("a")
+        assert "per 30 seconds" in exc.value.detail
+        assert int(exc.value.headers["Retry-After"]) <= 30
+
+    def test_redis_gcra_reports_remaining(self, clock):
+        client, _ = _mock_redis([[0, "12.0"]])
+        limiter = RedisGCRARateLimiter(client, max_requests=10, window_seconds=60, name="t")
+        result = limiter.check("a")
+        assert result.remaining == 8
+        assert result.reset_after == 12.0
+
+    def test_track_rate_limits_collects_checks(self, clock):
+        loose = GCRARateLimiter(max_requests=30, window_seconds=60, name="loose")
+        tight = GCRARateLimiter(max_requests=2, window_seconds=60, name="tight")
+        with rl.track_rate_limits() as results:
+            check_rate_limits((loose, "k"), (tight, "k"))
+        assert len(results) == 2
+        assert rl.most_restrictive(results).limit == 2
+        # Outside the block nothing is recorded
+        tight.check("other")
+        assert len(results) == 2
+
+
+class TestRateLimitHeaders:
+    def test_headers_on_success(self, client, rate_limit_clock):
+        r = client.post("/api/v1/auth/login", json={"email": "hdr@example.com", "password": "wrong"})
+        assert r.status_code == 401
+        # The per-email limiter (10/min) is tighter than the per-IP one (30/min)
+        assert r.headers["RateLimit-Limit"] == "10"
+        assert r.headers["RateLimit-Remaining"] == "9"
+        assert r.headers["RateLimit-Reset"] == "6"
+        assert "Retry-After" not in r.headers
+
+    def test_retry_after_on_429(self, client, rate_limit_clock):
+        for _ in range(10):
+            client.post("/api/v1/auth/login", json={"email": "hdr2@example.com", "password": "wrong"})
+        r = client.post("/api/v1/auth/login", json={"email": "hdr2@example.com", "password": "wrong"})
+        assert r.status_code == 429
+        assert r.headers["Retry-After"] == "6"
+        assert r.headers["RateLimit-Remaining"] == "0"
+
+    def test_no_headers_on_unlimited_route(self, client):
+        r = client.get("/health")
+        assert "RateLimit-Limit" not in r.headers
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, ReplicaSet, pin_to_primary, pinned_to_primary
+from app.dependencies import ThreadedSession, _authenticate, get_async_read_db, get_read_db
+from app.main import app
+
+
+def _engine(tmp_path, name):
+    return create_engine(f"sqlite:///{tmp_path / name}")
+
+
+class TestReplicaSet:
+    def test_round_robin(self, tmp_path):
+        replicas = ReplicaSet([_engine(tmp_path, "a.db"), _engine(tmp_path, "b.db")], check_interval=60)
+        assert [replicas.pick() for _ in range(4)] == [0, 1, 0, 1]
+
+    def test_no_replicas(self):
+        assert ReplicaSet([], check_interval=60).pick() is None
+
+    def test_unhealthy_replica_is_skipped(self, tmp_path):
+        broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'c.db'}")
+        replicas = ReplicaSet([broken, _engine(tmp_path, "b.db")], check_interval=60)
+        assert [replicas.pick() for _ in range(4)] == [1, 1, 1, 1]
+
+    def test_all_unhealthy_falls_back_to_primary(self, tmp_path):
+        broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'c.db'}")
+        assert ReplicaSet([broken], check_interval=60).pick() is None
+
+    def test_recovered_replica_is_used_after_next_check(self, tmp_path, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("app.database.time.monotonic", lambda: now[0])
+        (tmp_path / "later").mkdir()
+        missing = tmp_path / "later" / "sub"
+        replicas = ReplicaSet([create_engine(f"sqlite:///{missing / 'r.db'}")], check_interval=10)
+        assert replicas.pick() is None
+
+        missing.mkdir()
+        assert replicas.pick() is None  # cached verdict until the next probe
+        now[0] += 11
+        assert replicas.pick() == 0
+
+    def test_apick_probes_off_the_event_loop(self, tmp_path, monkeypatch):
+        broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'c.db'}")
+        replicas = ReplicaSet([broken, _engine(tmp_path, "b.db")], check_interval=60)
+        probed_on = []
+        probe = replicas._probe
+        monkeypatch.setattr(replicas, "_probe", lambda index: probed_on.append(threading.get_ident()) or probe(index))
+
+        async def picks():
+            return [await replicas.apick() for _ in range(4)], threading.get_ident()
+
+        picked, loop_thread = asyncio.run(picks())
+        assert picked == [1, 1, 1, 1]
+        assert len(probed_on) == 2 and loop_thread not in probed_on
+
+
+class TestReaderAuthentication:
+    @pytest.fixture()
+    def lagging_replica(self, client):
+        """Read sessions on a replica that has not received any rows yet."""
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        Replica = sessionmaker(bind=engine)
+
+        def _read():
+            s = Replica()
+            s.info["read_only"] = True
+            try:
+                yield s
+            finally:
+                s.close()
+
+        async def _async_read():
+            s = Replica()
+            s.info["read_only"] = True
+            try:
+                yield ThreadedSession(s)
+            finally:
+                s.close()
+
+        app.dependency_overrides[get_read_db] = _read
+        app.dependency_overrides[get_async_read_db] = _async_read
+        return client
+
+    def test_new_account_not_rejected_by_lagging_replica(self, lagging_replica, create_user, auth_headers):
+        _, token = create_user(email="lag@test.com")
+        assert lagging_replica.get("/api/v1/matches", headers=auth_headers(token)).status_code == 200
+        assert lagging_replica.get("/api/v1/profile/me", headers=auth_headers(token)).status_code == 200
+
+    def test_deactivation_applies_before_replica_catches_up(self, lagging_replica, db, create_user, auth_headers):
+        user, token = create_user(email="lag2@test.com")
+        user.is_active = False
+        db.commit()
+        assert lagging_replica.get("/api/v1/matches", headers=auth_headers(token)).status_code == 403
+
+
+class TestReadYourWrites:
+    def test_pin_expires(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("app.database.time.monotonic", lambda: now[0])
+        pin_to_primary("u1")
+        assert pinned_to_primary("u1")
+        assert not pinned_to_primary("u2")
+        now[0] += 60
+        assert not pinned_to_primary("u1")
+
+    def test_authenticated_commit_pins_user(self, db, create_user):
+        user, token = create_user(email="pin@test.com")
+        assert not pinned_to_primary(user.id)
+
+        _authenticate(db, token, "/api/v1/profile/me")
+        db.commit()  # nothing written: no pin
+        assert not pinned_to_primary(user.id)
+
+        user.display_name = "Renamed"
+        db.commit()
+        assert pinned_to_primary(user.id)
+
+    def test_statement_write_pins_user(self, db, create_user):
+        from app.services.version_service import bump_chat_version
+
+        user, token = create_user(email="pin3@test.com")
+        _authenticate(db, token, "/api/v1/profile/me")
+        bump_chat_version(db, user.id)  # a Core UPDATE, not a flush
+        db.commit()
+        assert pinned_to_primary(user.id)
+
+    def test_write_through_api_pins_user(self, client, create_user, auth_headers):
+        user, token = create_user(email="pin2@test.com")
+        r = client.put("/api/v1/profile/me", json={"display_name": "New"}, headers=auth_headers(token))
+        assert r.status_code == 200
+        assert pinned_to_primary(user.id)
+
+
+class TestReadOnlySession:
+    def test_flush_is_rejected(self, db, create_user):
+        user, _ = create_user(email="ro@test.com")
+        db.info["read_only"] = True
+        user.display_name = "Nope"
+        with pytest.raises(RuntimeError, match="read-only"):
+            db.flush()
+        db.rollback()
+
+    def test_statement_write_is_rejected(self, db, create_user):
+        from app.services.version_service import bump_chat_version
+
+        user, _ = create_user(email="ro2@test.com")
+        db.info["read_only"] = True
+        with pytest.raises(RuntimeError, match="read-only"):
+            bump_chat_version(db, user.id)
+        db.rollback()
+
+    def test_read_endpoints_work_on_read_sessions(self, client, create_user, auth_headers):
+        _, token = create_user(email="reader@test.com")
+        for path in ("/api/v1/profile/me", "/api/v1/matches", "/api/v1/discover", "/api/v1/chat/history"):
+            assert client.get(path, headers=auth_headers(token)).status_code == 200, path
@@ -0,0 +1,127 @@
+import hashlib
+import io
+
+import pytest
+
+from app.storage import LocalStorage, set_storage
+from tests.test_profile import _make_jpeg_bytes
+
+
+def _write(path, data=b"bytes"):
+    path.write_bytes(data)
+    return path
+
+
+class TestLocalStorage:
+    def test_save_moves_file_under_key(self, tmp_path):
+        storage = LocalStorage(tmp_path / "root")
+        source = _write(tmp_path / "in.webp")
+        storage.save("blobs/ab/ab_full.webp", source, "image/webp")
+        assert (tmp_path / "root" / "blobs" / "ab" / "ab_full.webp").read_bytes() == b"bytes"
+        assert not source.exists()
+
+    def test_url_only_with_public_base(self, tmp_path):
+        assert LocalStorage(tmp_path).url("blobs/a.webp") is None
+        cdn = LocalStorage(tmp_path, "https://cdn.example.com/photos/")
+        assert cdn.url("blobs/a.webp") == "https://cdn.example.com/photos/blobs/a.webp"
+
+    def test_delete_and_delete_prefix(self, tmp_path):
+        storage = LocalStorage(tmp_path)
+        (tmp_path / "u1").mkdir()
+        _write(tmp_path / "u1" / "a.jpg")
+        _write(tmp_path / "b.jpg")
+        storage.delete("b.jpg")
+        storage.delete("missing.jpg")
+        storage.delete_prefix("u1/")
+        assert list(tmp_path.iterdir()) == []
+
+    def test_keys_cannot_escape_root(self, tmp_path):
+        root = tmp_path / "root"
+        root.mkdir()
+        outside = _write(tmp_path / "keep.jpg")
+        storage = LocalStorage(root)
+        storage.delete("../keep.jpg")
+        storage.delete_prefix("../")
+        assert outside.exists()
+        with pytest.raises(ValueError):
+            storage.save("../escape.jpg", _write(tmp_path / "in.jpg"), "image/jpeg")
+
+
+def test_incomplete_backend_fails_at_construction():
+    from app.storage import PhotoStorage
+
+    class NoURL(PhotoStorage):
+        def save(self, key, source, content_type, cache_control=None):
+            pass
+
+        def delete(self, key):
+            pass
+
+        def delete_prefix(self, prefix):
+            pass
+
+    with pytest.raises(TypeError, match="url"):
+        NoURL()
+
+
+@pytest.fixture()
+def s3_storage():
+    pytest.importorskip("boto3")
+    moto = pytest.importorskip("moto")
+    import boto3
+    from app.storage.s3 import S3Storage
+
+    with moto.mock_aws():
+        client = boto3.client(
+            "s3", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test"
+        )
+        client.create_bucket(Bucket="photos")
+        yield S3Storage(client, "photos")
+
+
+class TestS3Storage:
+    def test_save_sets_metadata(self, s3_storage, tmp_path):
+        source = _write(tmp_path / "in.webp")
+        s3_storage.save("blobs/ab/ab_full.webp", source, "image/webp", "public, max-age=31536000, immutable")
+        head = s3_storage._s3.head_object(Bucket="photos", Key="blobs/ab/ab_full.webp")
+        assert head["ContentType"] == "image/webp"
+        assert head["CacheControl"] == "public, max-age=31536000, immutable"
+        assert not source.exists()
+
+    def test_presigned_url_reused(self, s3_storage):
+        url = s3_storage.url("blobs/ab/ab_full.webp")
+        assert url.startswith("https://photos.s3.amazonaws.com/blobs/ab/ab_full.webp?")
+        assert "Signature=" in url
+        assert s3_storage.url("blobs/ab/ab_full.webp") == url
+
+    def test_cdn_url(self, s3_storage):
+        s3_storage.public_url = "https://cdn.example.com"
+        assert s3_storage.url("blobs/a.webp") == "https://cdn.example.com/blobs/a.webp"
+
+    def test_delete_prefix(self, s3_storage, tmp_path):
+        for key in ("u1/a.jpg", "u1/b.jpg", "u2/c.jpg"):
+            s3_storage.save(key, _write(tmp_path / "f"), "image/jpeg")
+        s3_storage.delete_prefix("u1/")
+        s3_storage.delete("u2/c.jpg")
+        assert s3_storage._s3.list_objects_v2(Bucket="photos").get("KeyCount") == 0
+
+    def test_upload_and_delete_photo_through_api(self, s3_storage, client, create_user, auth_headers):
+        set_storage(s3_storage)
+        try:
+            jpeg = _make_jpeg_bytes(size=(44, 30))
+            digest = hashlib.sha256(jpeg).hexdigest()
+            _, token = create_user(email="s3@test.com")
+            r = client.post(
+                "/api/v1/profile/me/photos",
+                files={"file": ("photo.jpg", io.BytesIO(jpeg), "image/jpeg")},
+                headers=auth_headers(token),
+            )
+            assert r.status_code == 201
+            assert "Signature=" in r.json()["thumbnail_url"]
+            keys = {o["Key"] for o in s3_storage._s3.list_objects_v2(Bucket="photos")["Contents"]}
+            assert keys == {f"blobs/{digest[:2]}/{digest}_{v}.webp" for v in ("full", "medium", "thumb")}
+
+            client.delete(f"/api/v1/profile/me/photos/{r.json()['id']}", headers=auth_headers(token))
+            assert s3_storage._s3.list_objects_v2(Bucket="photos").get("KeyCount") == 0
+        finally:
+            set_storage(None)